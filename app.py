@@ -6,7 +6,27 @@ import plotly.express as px
 from datetime import datetime
 import numpy as np
 import os
-BACKEND_URL = os.getenv('backend_url', 'http://localhost:8080')
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+BACKEND_URL = os.getenv('BACKEND_URL') or os.getenv('backend_url', 'http://localhost:8080')
+
+# Live fragments re-render from the pushed quotes every LIVE_REFRESH seconds
+LIVE_REFRESH = float(os.getenv('LIVE_REFRESH', 1))
+ALERT_THRESHOLD = 3.0
+# Grid: cards per page, and how often the analysis charts refresh
+GRID_PAGE_SIZE = int(os.getenv('GRID_PAGE_SIZE', 20))
+ANALYSIS_REFRESH = float(os.getenv('ANALYSIS_REFRESH', 5))
+# Sort choice -> (field, ascending)
+SORT_KEYS = {
+    "Change %": ('change_percent', False),
+    "Symbol": ('symbol', True),
+    "Price": ('price', False),
+    "Volume": ('volume', False),
+}
+# /dashboard responses are reused for this long unless the stream moved on
+DASHBOARD_TTL = float(os.getenv('DASHBOARD_TTL', 5))
 
 
 # Page configuration
@@ -24,6 +44,143 @@ if 'selected_stock' not in st.session_state:
     st.session_state.selected_stock = None
 if 'show_tech_analysis' not in st.session_state:
     st.session_state.show_tech_analysis = False
+if 'grid_page' not in st.session_state:
+    st.session_state.grid_page = 0
+
+def set_page(page):
+    st.session_state.grid_page = max(0, page)
+
+class LiveMarket:
+    """
+    Latest quote per symbol, kept current by the backend's /stream (SSE)
+    One connection per dashboard process, shared by every session: the page
+    fragments re-render from it instead of polling the REST endpoints.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.seq = None
+        self._views = {}
+        self.connected = False
+        self.updated = None
+        threading.Thread(target=self._run, name='live-market', daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                with requests.get(f"{self.url}/stream", stream=True, timeout=(3, 60)) as response:
+                    response.raise_for_status()
+                    self.connected = True
+                    event, data = None, []
+                    # chunk_size=None: hand over each event as soon as it arrives
+                    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                        if line.startswith('event:'):
+                            event = line[6:].strip()
+                        elif line.startswith('data:'):
+                            data.append(line[5:].strip())
+                        elif not line and data:
+                            self._apply(event, json.loads('\n'.join(data)))
+                            event, data = None, []
+            except (requests.RequestException, ValueError):
+                pass
+            self.connected = False
+            time.sleep(2)
+
+    def _apply(self, event, payload):
+        rows = {row['symbol']: row for row in payload.get('stocks', [])}
+        with self.lock:
+            if event == 'snapshot':
+                self.rows = rows
+            else:
+                self.rows.update(rows)
+            self.seq = payload.get('seq')
+            self.updated = datetime.now()
+            self._views.clear()
+
+    def stocks(self):
+        with self.lock:
+            return list(self.rows.values())
+
+    def view(self, sector=None, sort='change_percent', ascending=False):
+        """Rows in one sector (or all), sorted; computed once per cycle for every session"""
+        key = (sector, sort, ascending)
+        with self.lock:
+            rows = self._views.get(key)
+            if rows is None:
+                rows = [r for r in self.rows.values() if sector is None or r.get('sector') == sector]
+                rows.sort(key=lambda r: r[sort], reverse=not ascending)
+                self._views[key] = rows
+            return rows
+
+@st.cache_resource
+def live_market(url):
+    return LiveMarket(url)
+
+@st.cache_resource
+def http_session():
+    """Keep-alive connection pool to the backend, shared by every session"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class EtagCache:
+    """Last (etag, body) per path, shared by every session's fetch threads"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            return self._entries.get(path)
+
+    def put(self, path, etag, payload):
+        with self._lock:
+            self._entries[path] = (etag, payload)
+
+@st.cache_resource
+def etag_cache():
+    return EtagCache()
+
+def get_json(session, etags, path, timeout=5):
+    """GET with If-None-Match: a 304 reuses the body last seen for the path"""
+    url = f"{BACKEND_URL}{path}"
+    cached = etags.get(path)
+    headers = {'If-None-Match': cached[0]} if cached else {}
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        if cached:
+            return cached[1]
+        # nothing to reuse (e.g. a 304 from a proxy): ask once more for the full body
+        response = session.get(url, headers={'Cache-Control': 'no-cache'}, timeout=timeout)
+        if response.status_code == 304:
+            raise requests.HTTPError(f"304 for {path} with no cached body", response=response)
+    response.raise_for_status()
+    payload = response.json()
+    if response.headers.get('ETag'):
+        etags.put(path, response.headers['ETag'], payload)
+    return payload
+
+@st.cache_data(ttl=DASHBOARD_TTL, show_spinner=False)
+def load_dashboard(version):
+    """
+    (/dashboard, /report/latest) fetched concurrently; cached per stream
+    version, so reruns (theme toggle, Analyze, filters) make no requests
+    until the stream delivers a new cycle or DASHBOARD_TTL passes
+    """
+    session, etags = http_session(), etag_cache()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        dashboard = pool.submit(get_json, session, etags, '/dashboard', 2)
+        report = pool.submit(get_json, session, etags, '/report/latest', 2)
+        try:
+            report = report.result()
+        except Exception:
+            report = None
+        return dashboard.result(), report
 
 def toggle_theme():
     st.session_state.theme = 'light' if st.session_state.theme == 'dark' else 'dark'
@@ -239,18 +396,42 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Backend health
+# Backend status and market report (cached; quotes arrive over /stream)
+backend_url = BACKEND_URL
+live = live_market(backend_url)
 try:
-    backend_url = os.getenv('BACKEND_URL', 'http://localhost:8080')
-    health = requests.get(f"{backend_url}/health", timeout=2).json()
-
+    dashboard, report = load_dashboard(live.seq)
     backend_status = "online"
-    total_stocks = health.get('total_stocks_tracked', 0)
-    stock_count = health.get('stock_count', 0)
 except Exception:
-    backend_status = "offline"
-    total_stocks = 0
-    stock_count = 0
+    dashboard, report = None, None
+    backend_status = "online" if live.connected else "offline"
+
+def stock_page(sector, sort, ascending, offset=0, limit=None):
+    """(rows, total): one page of the filtered, sorted stocks, from the stream or /stocks"""
+    end = offset + limit if limit else None
+    if live.rows:
+        rows = live.view(sector, sort, ascending)
+        return rows[offset:end], len(rows)
+    params = {'sort': sort, 'order': 'asc' if ascending else 'desc', 'offset': offset}
+    if sector:
+        params['sector'] = sector
+    if limit:
+        params['limit'] = limit
+    try:
+        payload = http_session().get(f"{BACKEND_URL}/stocks", params=params, timeout=5).json()
+    except Exception:
+        return [], 0
+    return payload.get('stocks', []), payload.get('total', 0)
+
+def current_stocks():
+    """Pushed quotes, or the cached /dashboard snapshot while the stream is down"""
+    stocks = live.stocks()
+    if stocks:
+        return stocks
+    try:
+        return load_dashboard(live.seq)[0].get('stocks', [])
+    except Exception:
+        return []
 
 # Sidebar
 with st.sidebar:
@@ -258,8 +439,8 @@ with st.sidebar:
 
     if backend_status == "online":
         st.markdown('<div class="status-online">● Backend Online</div>', unsafe_allow_html=True)
-        st.metric("📊 Total Stocks", total_stocks)
-        st.metric("💾 Data Points", stock_count)
+        st.metric("📊 Total Stocks", len(live.stocks()) or (dashboard or {}).get('health', {}).get('stocks', 0))
+        st.metric("📡 Live Stream", "Connected" if live.connected else "Reconnecting")
     else:
         st.error("❌ Backend Offline")
         st.warning("Start: `python backend_server.py`")
@@ -273,9 +454,280 @@ with st.sidebar:
 
     if backend_status == "online":
         st.info("🤖 AI: llama-3.3-70b-versatile")
-        st.info("🔄 Update: Every 60s")
+        st.info("📡 Update: Live (pushed)")
         st.info("💰 Cost: $0")
 
+# Live views: fragments re-run on their own every LIVE_REFRESH seconds and
+# read the pushed quotes in memory, so prices, movers and alerts update in
+# place without rerunning the page or calling the backend
+
+@st.fragment(run_every=LIVE_REFRESH)
+def live_stocks():
+    """All Stocks: filters, then only the visible page of cards (or the table)"""
+    stocks = current_stocks()
+    if not stocks:
+        if backend_status == "offline":
+            st.error("Backend offline. Start backend to see stocks.")
+        else:
+            st.warning("⏳ Loading stocks... Wait 60 seconds.")
+        return
+
+    # Filters (a change goes back to the first page)
+    sectors = sorted({s.get('sector', 'Unknown') for s in stocks})
+    col1, col2, col3 = st.columns([2, 2, 1])
+
+    with col1:
+        selected_sector = st.selectbox(
+            "🏢 Filter by Sector",
+            ["All Sectors"] + sectors,
+            key="sector_filter",
+            on_change=set_page, args=(0,)
+        )
+
+    with col2:
+        sort_by = st.selectbox(
+            "📊 Sort By",
+            list(SORT_KEYS),
+            key="sort_filter",
+            on_change=set_page, args=(0,)
+        )
+
+    with col3:
+        view_mode = st.selectbox(
+            "👁️ View",
+            ["Grid", "Table"],
+            key="view_mode"
+        )
+
+    sector = None if selected_sector == "All Sectors" else selected_sector
+    sort_key, ascending = SORT_KEYS[sort_by]
+
+    # GRID VIEW: one page of cards
+    if view_mode == "Grid":
+        page = st.session_state.grid_page
+        rows, total = stock_page(sector, sort_key, ascending, page * GRID_PAGE_SIZE, GRID_PAGE_SIZE)
+        pages = max(1, (total + GRID_PAGE_SIZE - 1) // GRID_PAGE_SIZE)
+        if page >= pages:
+            # the list shrank below the current page
+            page = pages - 1
+            rows, total = stock_page(sector, sort_key, ascending, page * GRID_PAGE_SIZE, GRID_PAGE_SIZE)
+
+        first = page * GRID_PAGE_SIZE
+        st.markdown(f"### Showing {first + 1 if rows else 0}–{first + len(rows)} of {total} stocks")
+
+        cols_per_row = 5
+        for row_start in range(0, len(rows), cols_per_row):
+            cols = st.columns(cols_per_row)
+            for col, stock in zip(cols, rows[row_start:row_start + cols_per_row]):
+                with col:
+                    # Beautiful stock card HTML
+                    change_class = "positive" if stock['change_percent'] > 0 else "negative"
+                    arrow = "▲" if stock['change_percent'] > 0 else "▼"
+
+                    card_html = f"""
+                    <div class="stock-card" onclick="window.location.href='#'">
+                        <div class="stock-sector">{str(stock.get('sector', 'N/A'))[:20]}</div>
+                        <div class="stock-symbol">{stock['symbol']}</div>
+                        <div class="stock-price">₹{stock['price']:.2f}</div>
+                        <div class="stock-change {change_class}">
+                            {arrow} {abs(stock['change_percent']):.2f}%
+                        </div>
+                        <div class="stock-volume">Vol: {stock['volume']:,.0f}</div>
+                    </div>
+                    """
+
+                    st.markdown(card_html, unsafe_allow_html=True)
+
+                    # Hidden button for click handling
+                    if st.button(
+                        "📊 Analyze",
+                        key=f"analyze_{stock['symbol']}",
+                        use_container_width=True
+                    ):
+                        st.session_state.selected_stock = stock['symbol']
+                        st.session_state.show_tech_analysis = True
+                        # the analysis panel is its own fragment: rerun the page once to open it
+                        st.rerun()
+
+        if pages > 1:
+            col1, col2, col3 = st.columns([1, 3, 1])
+            with col1:
+                st.button("◀ Prev", key="grid_prev", disabled=page == 0,
+                          on_click=set_page, args=(page - 1,), use_container_width=True)
+            with col2:
+                st.markdown(f"<p style='text-align: center'>Page {page + 1} of {pages}</p>",
+                            unsafe_allow_html=True)
+            with col3:
+                st.button("Next ▶", key="grid_next", disabled=page >= pages - 1,
+                          on_click=set_page, args=(page + 1,), use_container_width=True)
+
+    # TABLE VIEW (st.dataframe only draws the rows in view)
+    else:
+        rows, total = stock_page(sector, sort_key, ascending)
+        df = pd.DataFrame(rows)
+        st.markdown(f"### Showing {total} stocks")
+        st.dataframe(
+            df[[c for c in ['symbol', 'sector', 'price', 'change_percent', 'volume', 'market_cap'] if c in df.columns]],
+            use_container_width=True,
+            height=600
+        )
+
+@st.fragment(run_every=ANALYSIS_REFRESH)
+def stock_analysis():
+    """Technical analysis of the selected stock, refreshed apart from the grid"""
+    if not (st.session_state.show_tech_analysis and st.session_state.selected_stock):
+        return
+
+    st.markdown("---")
+    st.markdown(f"## 📊 Technical Analysis: {st.session_state.selected_stock}")
+
+    col1, col2 = st.columns([5, 1])
+    with col2:
+        if st.button("✖ Close", key="close_analysis"):
+            st.session_state.show_tech_analysis = False
+            st.session_state.selected_stock = None
+            st.rerun(scope="fragment")
+
+    # Get stock data
+    stock_symbol = st.session_state.selected_stock
+    stock_info = next((dict(s) for s in current_stocks() if s['symbol'] == stock_symbol), None)
+    if stock_info is None:
+        return
+    # ticks carry no open: the previous close stands in for it
+    if stock_info.get('open') is None:
+        stock_info['open'] = stock_info['price'] - stock_info['change']
+
+    # Key Metrics
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Current Price", f"₹{stock_info['price']:.2f}")
+    with col2:
+        st.metric("Change", f"{stock_info['change_percent']:.2f}%", 
+                 delta=f"{stock_info['change']:.2f}")
+    with col3:
+        st.metric("Day High", f"₹{stock_info['high']:.2f}")
+    with col4:
+        st.metric("Day Low", f"₹{stock_info['low']:.2f}")
+    with col5:
+        st.metric("Volume", f"{stock_info['volume']:,.0f}")
+
+    st.divider()
+
+    # Charts
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### 📈 Price Action")
+
+        fig = go.Figure()
+        fig.add_trace(go.Candlestick(
+            x=[datetime.now()],
+            open=[stock_info['open']],
+            high=[stock_info['high']],
+            low=[stock_info['low']],
+            close=[stock_info['price']],
+            name=stock_symbol
+        ))
+
+        fig.update_layout(
+            height=400,
+            template='plotly_dark' if st.session_state.theme == 'dark' else 'plotly_white',
+            xaxis_title="Time",
+            yaxis_title="Price (₹)",
+            showlegend=False
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.markdown("#### 📊 Price Position")
+
+        price_range = stock_info['high'] - stock_info['low']
+        price_position = ((stock_info['price'] - stock_info['low']) / price_range * 100) if price_range > 0 else 50
+
+        fig = go.Figure(go.Indicator(
+            mode="gauge+number+delta",
+            value=price_position,
+            title={'text': "Position in Day Range (%)"},
+            delta={'reference': 50},
+            gauge={
+                'axis': {'range': [0, 100]},
+                'bar': {'color': "#667eea"},
+                'steps': [
+                    {'range': [0, 33], 'color': "#f44336"},
+                    {'range': [33, 66], 'color': "#ffc107"},
+                    {'range': [66, 100], 'color': "#4caf50"}
+                ]
+            }
+        ))
+
+        fig.update_layout(
+            height=400,
+            template='plotly_dark' if st.session_state.theme == 'dark' else 'plotly_white'
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Additional Info
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.info(f"""
+        **Sector:** {stock_info.get('sector', 'N/A')}  
+        **Market Cap:** ₹{stock_info.get('market_cap', 0):,.0f}  
+        **PE Ratio:** {stock_info.get('pe_ratio', 'N/A')}
+        """)
+
+    with col2:
+        volatility = (price_range / stock_info['open'] * 100) if stock_info['open'] > 0 else 0
+        trend = "Bullish 🐂" if stock_info['change_percent'] > 2 else "Bearish 🐻" if stock_info['change_percent'] < -2 else "Neutral ➡️"
+
+        st.success(f"""
+        **Day Volatility:** {volatility:.2f}%  
+        **Trend:** {trend}  
+        **Last Updated:** {datetime.now().strftime('%H:%M:%S')}
+        """)
+
+
+@st.fragment(run_every=LIVE_REFRESH)
+def live_overview():
+    """Top gainers and losers"""
+    stocks = sorted(current_stocks(), key=lambda s: s['change_percent'], reverse=True)
+    if not stocks:
+        st.warning("Unavailable")
+        return
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### 🚀 Top Gainers")
+        for stock in stocks[:5]:
+            st.success(f"**{stock['symbol']}** - ₹{stock['price']:.2f} (+{stock['change_percent']:.2f}%)")
+
+    with col2:
+        st.markdown("#### 📉 Top Losers")
+        for stock in stocks[::-1][:5]:
+            st.error(f"**{stock['symbol']}** - ₹{stock['price']:.2f} ({stock['change_percent']:.2f}%)")
+
+@st.fragment(run_every=LIVE_REFRESH)
+def live_alerts():
+    """Symbols moving more than ALERT_THRESHOLD %, latest first"""
+    stocks = current_stocks()
+    if not stocks:
+        st.warning("Unavailable")
+        return
+
+    alerts = sorted((s for s in stocks if abs(s['change_percent']) > ALERT_THRESHOLD),
+                    key=lambda s: s['timestamp'], reverse=True)
+    if alerts:
+        for alert in alerts[:15]:
+            if alert['change_percent'] > 0:
+                st.success(f"🚀 **{alert['symbol']}** +{alert['change_percent']:.2f}%")
+            else:
+                st.error(f"📉 **{alert['symbol']}** {alert['change_percent']:.2f}%")
+    else:
+        st.info("✅ Market is stable")
+
 # Main tabs
 tab1, tab2, tab3, tab4 = st.tabs([
     "📊 All Stocks", 
@@ -286,222 +738,8 @@ tab1, tab2, tab3, tab4 = st.tabs([
 
 # TAB 1: All Stocks with Beautiful Cards
 with tab1:
-    if backend_status == "offline":
-        st.error("Backend offline. Start backend to see stocks.")
-    else:
-        try:
-            response = requests.get(f"{backend_url}/stocks", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                stocks = data.get('stocks', [])
-
-                if stocks:
-                    df = pd.DataFrame(stocks)
-
-                    # Filters
-                    sectors = df['sector'].unique().tolist() if 'sector' in df.columns else []
-                    col1, col2, col3 = st.columns([2, 2, 1])
-
-                    with col1:
-                        selected_sector = st.selectbox(
-                            "🏢 Filter by Sector",
-                            ["All Sectors"] + sorted(sectors),
-                            key="sector_filter"
-                        )
-
-                    with col2:
-                        sort_by = st.selectbox(
-                            "📊 Sort By",
-                            ["Change %", "Symbol", "Price", "Volume"],
-                            key="sort_filter"
-                        )
-
-                    with col3:
-                        view_mode = st.selectbox(
-                            "👁️ View",
-                            ["Grid", "Table"],
-                            key="view_mode"
-                        )
-
-                    # Filter and sort
-                    if selected_sector != "All Sectors":
-                        df = df[df['sector'] == selected_sector]
-
-                    sort_map = {
-                        "Symbol": "symbol",
-                        "Change %": "change_percent",
-                        "Price": "price",
-                        "Volume": "volume"
-                    }
-                    df = df.sort_values(
-                        by=sort_map[sort_by],
-                        ascending=(sort_by == "Symbol")
-                    )
-
-                    st.markdown(f"### Showing {len(df)} stocks")
-
-                    # GRID VIEW with Beautiful Cards
-                    if view_mode == "Grid":
-                        cols_per_row = 5
-                        rows = (len(df) + cols_per_row - 1) // cols_per_row
-
-                        for row_idx in range(rows):
-                            cols = st.columns(cols_per_row)
-                            for col_idx in range(cols_per_row):
-                                stock_idx = row_idx * cols_per_row + col_idx
-                                if stock_idx < len(df):
-                                    stock = df.iloc[stock_idx]
-                                    with cols[col_idx]:
-                                        # Beautiful stock card HTML
-                                        change_class = "positive" if stock['change_percent'] > 0 else "negative"
-                                        arrow = "▲" if stock['change_percent'] > 0 else "▼"
-
-                                        card_html = f"""
-                                        <div class="stock-card" onclick="window.location.href='#'">
-                                            <div class="stock-sector">{str(stock.get('sector', 'N/A'))[:20]}</div>
-                                            <div class="stock-symbol">{stock['symbol']}</div>
-                                            <div class="stock-price">₹{stock['price']:.2f}</div>
-                                            <div class="stock-change {change_class}">
-                                                {arrow} {abs(stock['change_percent']):.2f}%
-                                            </div>
-                                            <div class="stock-volume">Vol: {stock['volume']:,.0f}</div>
-                                        </div>
-                                        """
-
-                                        st.markdown(card_html, unsafe_allow_html=True)
-
-                                        # Hidden button for click handling
-                                        if st.button(
-                                            "📊 Analyze",
-                                            key=f"analyze_{stock['symbol']}",
-                                            use_container_width=True
-                                        ):
-                                            st.session_state.selected_stock = stock['symbol']
-                                            st.session_state.show_tech_analysis = True
-                                            st.rerun()
-
-                    # TABLE VIEW
-                    else:
-                        st.dataframe(
-                            df[['symbol', 'sector', 'price', 'change_percent', 'volume', 'market_cap']],
-                            use_container_width=True,
-                            height=600
-                        )
-
-                    # TECHNICAL ANALYSIS SECTION
-                    if st.session_state.show_tech_analysis and st.session_state.selected_stock:
-                        st.markdown("---")
-                        st.markdown(f"## 📊 Technical Analysis: {st.session_state.selected_stock}")
-
-                        col1, col2 = st.columns([5, 1])
-                        with col2:
-                            if st.button("✖ Close", key="close_analysis"):
-                                st.session_state.show_tech_analysis = False
-                                st.session_state.selected_stock = None
-                                st.rerun()
-
-                        # Get stock data
-                        stock_symbol = st.session_state.selected_stock
-                        stock_data_list = df[df['symbol'] == stock_symbol].to_dict('records')
-
-                        if stock_data_list:
-                            stock_info = stock_data_list[0]
-
-                            # Key Metrics
-                            col1, col2, col3, col4, col5 = st.columns(5)
-                            with col1:
-                                st.metric("Current Price", f"₹{stock_info['price']:.2f}")
-                            with col2:
-                                st.metric("Change", f"{stock_info['change_percent']:.2f}%", 
-                                         delta=f"{stock_info['change']:.2f}")
-                            with col3:
-                                st.metric("Day High", f"₹{stock_info['high']:.2f}")
-                            with col4:
-                                st.metric("Day Low", f"₹{stock_info['low']:.2f}")
-                            with col5:
-                                st.metric("Volume", f"{stock_info['volume']:,.0f}")
-
-                            st.divider()
-
-                            # Charts
-                            col1, col2 = st.columns(2)
-
-                            with col1:
-                                st.markdown("#### 📈 Price Action")
-
-                                fig = go.Figure()
-                                fig.add_trace(go.Candlestick(
-                                    x=[datetime.now()],
-                                    open=[stock_info['open']],
-                                    high=[stock_info['high']],
-                                    low=[stock_info['low']],
-                                    close=[stock_info['price']],
-                                    name=stock_symbol
-                                ))
-
-                                fig.update_layout(
-                                    height=400,
-                                    template='plotly_dark' if st.session_state.theme == 'dark' else 'plotly_white',
-                                    xaxis_title="Time",
-                                    yaxis_title="Price (₹)",
-                                    showlegend=False
-                                )
-
-                                st.plotly_chart(fig, use_container_width=True)
-
-                            with col2:
-                                st.markdown("#### 📊 Price Position")
-
-                                price_range = stock_info['high'] - stock_info['low']
-                                price_position = ((stock_info['price'] - stock_info['low']) / price_range * 100) if price_range > 0 else 50
-
-                                fig = go.Figure(go.Indicator(
-                                    mode="gauge+number+delta",
-                                    value=price_position,
-                                    title={'text': "Position in Day Range (%)"},
-                                    delta={'reference': 50},
-                                    gauge={
-                                        'axis': {'range': [0, 100]},
-                                        'bar': {'color': "#667eea"},
-                                        'steps': [
-                                            {'range': [0, 33], 'color': "#f44336"},
-                                            {'range': [33, 66], 'color': "#ffc107"},
-                                            {'range': [66, 100], 'color': "#4caf50"}
-                                        ]
-                                    }
-                                ))
-
-                                fig.update_layout(
-                                    height=400,
-                                    template='plotly_dark' if st.session_state.theme == 'dark' else 'plotly_white'
-                                )
-
-                                st.plotly_chart(fig, use_container_width=True)
-
-                            # Additional Info
-                            col1, col2 = st.columns(2)
-
-                            with col1:
-                                st.info(f"""
-                                **Sector:** {stock_info.get('sector', 'N/A')}  
-                                **Market Cap:** ₹{stock_info.get('market_cap', 0):,.0f}  
-                                **PE Ratio:** {stock_info.get('pe_ratio', 'N/A')}
-                                """)
-
-                            with col2:
-                                volatility = (price_range / stock_info['open'] * 100) if stock_info['open'] > 0 else 0
-                                trend = "Bullish 🐂" if stock_info['change_percent'] > 2 else "Bearish 🐻" if stock_info['change_percent'] < -2 else "Neutral ➡️"
-
-                                st.success(f"""
-                                **Day Volatility:** {volatility:.2f}%  
-                                **Trend:** {trend}  
-                                **Last Updated:** {datetime.now().strftime('%H:%M:%S')}
-                                """)
-
-                else:
-                    st.warning("⏳ Loading stocks... Wait 60 seconds.")
-        except Exception as e:
-            st.error(f"Error: {str(e)}")
+    live_stocks()
+    stock_analysis()
 
 # TAB 2: AI Assistant
 with tab2:
@@ -529,7 +767,7 @@ with tab2:
         if question:
             with st.spinner("🧠 Analyzing..."):
                 try:
-                    response = requests.post(
+                    response = http_session().post(
                         f"{backend_url}/query",
                         json={"question": question},
                         timeout=30
@@ -548,49 +786,20 @@ with tab2:
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
 
+
 # TAB 3: Market Overview
 with tab3:
     st.markdown("### 📈 Market Overview")
+    live_overview()
 
-    try:
-        gainers_resp = requests.get(f"{backend_url}/stocks/top-gainers", timeout=5)
-        losers_resp = requests.get(f"{backend_url}/stocks/top-losers", timeout=5)
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown("#### 🚀 Top Gainers")
-            if gainers_resp.status_code == 200:
-                for stock in gainers_resp.json().get('gainers', [])[:5]:
-                    st.success(f"**{stock['symbol']}** - ₹{stock['price']:.2f} (+{stock['change_percent']:.2f}%)")
-
-        with col2:
-            st.markdown("#### 📉 Top Losers")
-            if losers_resp.status_code == 200:
-                for stock in losers_resp.json().get('losers', [])[:5]:
-                    st.error(f"**{stock['symbol']}** - ₹{stock['price']:.2f} ({stock['change_percent']:.2f}%)")
-    except Exception:
-        st.warning("Unavailable")
+    if report and report.get('text'):
+        st.markdown("#### 📝 Market Report")
+        st.info(report.get('polished_text') or report['text'])
 
 # TAB 4: Alerts
 with tab4:
     st.markdown("### ⚠️ Volatility Alerts")
-
-    try:
-        response = requests.get(f"{backend_url}/alerts", timeout=5)
-        if response.status_code == 200:
-            alerts = response.json().get('alerts', [])
-
-            if alerts:
-                for alert in alerts[:15]:
-                    if alert['change_percent'] > 0:
-                        st.success(f"🚀 **{alert['symbol']}** +{alert['change_percent']:.2f}%")
-                    else:
-                        st.error(f"📉 **{alert['symbol']}** {alert['change_percent']:.2f}%")
-            else:
-                st.info("✅ Market is stable")
-    except Exception:
-        st.warning("Unavailable")
+    live_alerts()
 
 # Footer
 st.markdown("---")
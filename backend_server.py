@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from groq import Groq
 from sentence_transformers import SentenceTransformer
@@ -8,7 +8,31 @@ import os
 from dotenv import load_dotenv
 import threading
 import time
-import random
+import itertools
+import atexit
+import hashlib
+import json
+import requests
+from connectors.change_detector import ChangeDetector
+from connectors.fetch_scheduler import FetchScheduler, RateLimited
+from connectors.market_calendar import MarketCalendar
+from connectors.priority_scheduler import PollerGroup
+from connectors.replay import TickRecorder, TickReplayer
+from connectors.simulator import MarketSimulator
+from connectors.tick_bus import bus_from_env
+from connectors.universe import Universe
+from pipeline.ann_index import ANNIndex
+from pipeline.delta_stream import DeltaBroadcaster, public_row
+from pipeline.embedding_cache import EmbeddingCache
+from pipeline.retrieval import RetrievalPlanner, SymbolIndex
+from pipeline.stages import BLOCK, CONFLATE, Stage, StagePipeline
+from pipeline.intent_router import IntentRouter
+from pipeline.offline_engine import ALERT_THRESHOLD, compute_stats, offline_answer, top_gainers, top_losers
+from pipeline.market_report import ReportPublisher, build_report
+from pipeline.context import build_table_context, estimate_tokens, select_context, table_row_tokens
+from observability import instruments, tracing
+from observability.metrics import CONTENT_TYPE, REGISTRY
+from observability.profiling import ProfilingAdmin
 
 load_dotenv()
 
@@ -28,7 +52,8 @@ try:
         print("    Set groqapi environment variable to enable Groq")
         groq_available = False
     else:
-        groq_client = Groq(api_key=api_key)
+        # GROQ_BASE_URL points at a compatible server, e.g. benchmarks/fake_groq.py
+        groq_client = Groq(api_key=api_key, base_url=os.getenv('GROQ_BASE_URL') or None)
         # Test connection
         try:
             test = groq_client.models.list()
@@ -50,276 +75,617 @@ except Exception as e:
     print(f"⚠️  Embedder error: {str(e)}")
     embedder = None
 
-# Global storage
-stock_data = []
-embeddings_store = []
-
-# Indian stocks
-STOCKS = {
-    'HDFCBANK.NS': 'HDFC Bank',
-    'ICICIBANK.NS': 'ICICI Bank',
-    'KOTAKBANK.NS': 'Kotak Bank',
-    'AXISBANK.NS': 'Axis Bank',
-    'SBIN.NS': 'State Bank of India',
-    'BAJFINANCE.NS': 'Bajaj Finance',
-    'BAJAJFINSV.NS': 'Bajaj Financial Services',
-    'HDFCLIFE.NS': 'HDFC Life Insurance',
-    'SBILIFE.NS': 'SBI Life Insurance',
-    'ICICIGI.NS': 'ICICI General Insurance',
-    'TCS.NS': 'Tata Consultancy Services',
-    'INFY.NS': 'Infosys Limited',
-    'WIPRO.NS': 'Wipro Limited',
-    'HCLTECH.NS': 'HCL Technologies',
-    'TECHM.NS': 'Tech Mahindra',
-    'LTIM.NS': 'LT Infotech',
-    'PERSISTENT.NS': 'Persistent Systems',
-    'COFORGE.NS': 'Coforge',
-    'RELIANCE.NS': 'Reliance Industries',
-    'ONGC.NS': 'Oil and Natural Gas Corporation',
-    'POWERGRID.NS': 'Power Grid Corporation',
-    'NTPC.NS': 'NTPC Limited',
-    'COALINDIA.NS': 'Coal India Limited',
-    'HINDUNILVR.NS': 'Hindustan Unilever',
-    'ITC.NS': 'ITC Limited',
-    'NESTLEIND.NS': 'Nestlé India',
-    'BRITANNIA.NS': 'Britannia Industries',
-    'DABUR.NS': 'Dabur India',
-    'MARICO.NS': 'Marico',
-    'GODREJCP.NS': 'Godrej Consumer Products',
-    'MARUTI.NS': 'Maruti Suzuki India',
-    'TATAMOTORS.NS': 'Tata Motors',
-    'M&M.NS': 'Mahindra & Mahindra',
-    'BAJAJ-AUTO.NS': 'Bajaj Auto',
-    'EICHERMOT.NS': 'Eicher Motors',
-    'HEROMOTOCO.NS': 'Hero MotoCorp',
-    'SUNPHARMA.NS': 'Sun Pharmaceutical',
-    'DRREDDY.NS': 'Dr. Reddy\'s Laboratories',
-    'CIPLA.NS': 'Cipla',
-    'DIVISLAB.NS': 'Divi\'s Laboratories',
-    'APOLLOHOSP.NS': 'Apollo Hospitals',
-    'ASIANPAINT.NS': 'Asian Paints',
-    'TITAN.NS': 'Titan Company',
-    'BHARTIARTL.NS': 'Bharti Airtel',
-    'INDIGO.NS': 'IndiGo',
-    'LT.NS': 'Larsen & Toubro',
-}
-
-FALLBACK_PRICES = {
-    'HDFCBANK.NS': 1685.50, 'ICICIBANK.NS': 892.45, 'KOTAKBANK.NS': 1745.60,
-    'AXISBANK.NS': 936.80, 'SBIN.NS': 674.35, 'BAJFINANCE.NS': 6547.00,
-    'BAJAJFINSV.NS': 1850.00, 'HDFCLIFE.NS': 682.50, 'SBILIFE.NS': 2180.00,
-    'ICICIGI.NS': 1840.00, 'TCS.NS': 3945.75, 'INFY.NS': 1658.90,
-    'WIPRO.NS': 445.30, 'HCLTECH.NS': 1785.50, 'TECHM.NS': 1310.20,
-    'LTIM.NS': 4890.00, 'PERSISTENT.NS': 4895.50, 'COFORGE.NS': 9350.00,
-    'RELIANCE.NS': 1287.65, 'ONGC.NS': 318.50, 'POWERGRID.NS': 298.90,
-    'NTPC.NS': 398.30, 'COALINDIA.NS': 878.50, 'HINDUNILVR.NS': 2456.75,
-    'ITC.NS': 445.25, 'NESTLEIND.NS': 2385.50, 'BRITANNIA.NS': 4785.00,
-    'DABUR.NS': 648.50, 'MARICO.NS': 698.30, 'GODREJCP.NS': 1245.50,
-    'MARUTI.NS': 12840.00, 'TATAMOTORS.NS': 895.50, 'M&M.NS': 2985.75,
-    'BAJAJ-AUTO.NS': 8945.00, 'EICHERMOT.NS': 3850.50, 'HEROMOTOCO.NS': 6875.00,
-    'SUNPHARMA.NS': 728.50, 'DRREDDY.NS': 2385.50, 'CIPLA.NS': 1485.50,
-    'DIVISLAB.NS': 6285.00, 'APOLLOHOSP.NS': 8945.00, 'ASIANPAINT.NS': 3256.50,
-    'TITAN.NS': 3248.50, 'BHARTIARTL.NS': 1485.50, 'INDIGO.NS': 3985.50,
-    'LT.NS': 3648.50,
-}
-
-print(f"📊 Tracking {len(STOCKS)} stocks")
-
-def fetch_stocks_smart():
-    """Fetch stocks with smart fallback"""
-    print(f"\n{'='*70}")
-    print("🔄 Starting Smart Stock Fetcher")
-    print(f"{'='*70}\n")
+# Symbol universe (symbol, name, sector, fallback price): config/universe.csv or UNIVERSE_FILE
+universe = Universe.from_env()
+STOCKS = universe.stocks
+SECTOR_GROUPS = universe.sector_groups
+SECTORS = {symbol: sector for sector, symbols in SECTOR_GROUPS.items() for symbol in symbols}
 
+# Global storage (window and caches sized from the universe)
+stock_data = []
+latest_snapshot = {}
+snapshot_version = 0
+_stats_cache = {'version': -1, 'stats': None}
+MAX_TICKS = int(os.getenv('MAX_TICKS', max(500, 10 * len(universe))))
+store_lock = threading.RLock()
+
+# Shared by the fetcher, the intent router and /query: unchanged tick text and
+# repeated questions reuse their vectors (EMBEDDING_CACHE_DIR persists them)
+embedding_cache = EmbeddingCache.from_env(embedder, 'all-MiniLM-L6-v2', 4 * MAX_TICKS) if embedder else None
+if embedding_cache:
+    atexit.register(embedding_cache.flush)
+
+# Vector index (exact scan for small corpora, IVF once it grows)
+vector_index = ANNIndex(
+    dim=384,
+    nprobe=int(os.getenv('ANN_NPROBE', 8)),
+    exact_threshold=int(os.getenv('ANN_EXACT_THRESHOLD', 4096))
+)
+docs_by_id = {}
+symbol_index = SymbolIndex()
+
+# Prompt context selection
+CONTEXT_CANDIDATES = int(os.getenv('CONTEXT_CANDIDATES', 50))
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', 600))
+CONTEXT_MAX_ROWS = int(os.getenv('CONTEXT_MAX_ROWS', 10))
+CONTEXT_HALF_LIFE = float(os.getenv('CONTEXT_HALF_LIFE', 300))
+_doc_ids = itertools.count()
+
+# Question -> symbols/sectors, keyed on bare symbols as stored on ticks
+planner = RetrievalPlanner(
+    {s.replace('.NS', ''): name for s, name in STOCKS.items()},
+    {s.replace('.NS', ''): sector for s, sector in SECTORS.items()}
+)
+
+# Structured questions (prices, movers, sectors) are answered from the snapshot
+intent_router = IntentRouter(planner, embedding_cache)
+
+def polish_report(report):
+    """Rewrite the computed report text as a short narrative (background, optional)"""
+    if not (groq_available and groq_client):
+        return None
+    response = instruments.groq_completion(
+        groq_client, 'report',
+        model="llama-3.3-70b-versatile",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an Indian stock market expert. Rewrite the report as a concise market update. Keep every number unchanged."
+            },
+            {"role": "user", "content": report['text']}
+        ],
+        temperature=0.3,
+        max_tokens=400,
+        timeout=20
+    )
+    return response.choices[0].message.content
+
+# One market summary artifact per fetch cycle, served from /report/latest
+report_publisher = ReportPublisher(
+    polish=polish_report if os.getenv('REPORT_POLISH', '0') == '1' else None
+)
+
+# Upstream quote source: yfinance, or a STOCK_API_URL-style HTTP service
+QUOTE_SOURCE_URL = os.getenv('QUOTE_SOURCE_URL')
+
+# Synthetic market (correlated GBM per sector): fills in for failed fetches,
+# and with QUOTE_SOURCE=sim is the data source itself, every symbol ticking
+# SIM_HZ times a second
+market_simulator = MarketSimulator.from_env(universe)
+SIM_HZ = float(os.getenv('SIM_HZ', 1))
+if not SIM_HZ > 0:
+    raise ValueError(f"SIM_HZ must be > 0 (steps per second), got {SIM_HZ}")
+
+# Token bucket sized to the upstream limit + backoff/probe on 429s and timeouts
+fetch_scheduler = FetchScheduler(
+    rate=float(os.getenv('FETCH_RATE', 1.0)),
+    burst=int(os.getenv('FETCH_BURST', 5)),
+    backoff_base=float(os.getenv('FETCH_BACKOFF_BASE', 30)),
+    backoff_cap=float(os.getenv('FETCH_BACKOFF_CAP', 900))
+)
+
+# NSE sessions: fetch every FETCH_INTERVAL while open, one closing snapshot,
+# then sleep until the next pre-open (waking every MARKET_HEARTBEAT seconds)
+market_calendar = MarketCalendar.from_env()
+FETCH_INTERVAL = int(os.getenv('FETCH_INTERVAL', 60))
+MARKET_HEARTBEAT = int(os.getenv('MARKET_HEARTBEAT', 1800))
+
+# Hot symbols (volatile, watchlisted, asked about) refresh more often than flat
+# ones within the same FETCH_BUDGET requests/minute; polled every POLL_ROUND s.
+# FETCH_SHARDS workers each own a slice of the universe, with an optional
+# per-shard base interval (SHARD_INTERVALS=60,120,300)
+POLL_ROUND = float(os.getenv('POLL_ROUND', 10))
+FETCH_SHARDS = int(os.getenv('FETCH_SHARDS', 1))
+TICKERS = {symbol: universe.ticker(symbol) for symbol in universe.symbols}
+priority_poller = PollerGroup(
+    universe.shards(FETCH_SHARDS),
+    intervals=[float(x) for x in os.getenv('SHARD_INTERVALS', '').split(',') if x.strip()] or [FETCH_INTERVAL],
+    budget_per_minute=float(os.getenv('FETCH_BUDGET', len(universe))),
+    round_seconds=POLL_ROUND,
+    alert_threshold=ALERT_THRESHOLD,
+    watchlist=[s.strip().upper().replace('.NS', '') for s in os.getenv('WATCHLIST', '').split(',') if s.strip()]
+)
+
+# Ticks matching the previous quote (within tolerance) are conflated: the
+# stored record only gets a new timestamp, nothing is appended or embedded
+change_detector = ChangeDetector(
+    price_tolerance=float(os.getenv('CONFLATE_PRICE_TOL', 0.0)),
+    volume_tolerance=float(os.getenv('CONFLATE_VOLUME_TOL', 0.01))
+)
+
+# Fetchers publish ticks to the bus; the serving tier subscribes and merges
+# them by symbol. INGEST_ROLE=all runs both here; 'ingest' nodes only fetch a
+# slice of the universe (UNIVERSE_FILE) and 'serve' nodes only subscribe
+INGEST_ROLE = os.getenv('INGEST_ROLE', 'all')
+tick_bus = bus_from_env()
+
+# TICK_RECORD appends every tick the serving tier receives (jsonlines);
+# TICK_REPLAY feeds a recording through the same path instead of fetching
+tick_recorder = TickRecorder.from_env()
+if tick_recorder:
+    atexit.register(tick_recorder.close)
+tick_replayer = TickReplayer.from_env()
+
+print(f"📊 Tracking {len(STOCKS)} stocks in {FETCH_SHARDS} fetch shard(s) | role {INGEST_ROLE}")
+
+def snapshot_entries():
+    with store_lock:
+        return dict(latest_snapshot)
+
+# /stream pushes the symbols that changed, once per STREAM_INTERVAL, to every
+# connected dashboard; slow clients get their pending deltas merged by symbol
+delta_stream = DeltaBroadcaster.from_env(snapshot_entries)
+
+def conflate_entry(stock_entry):
+    """Move the timestamp of the stored record forward if the tick is unchanged"""
+    duplicate = change_detector.is_duplicate(stock_entry['symbol'], stock_entry)
+    with store_lock:
+        current = latest_snapshot.get(stock_entry['symbol'])
+        if not duplicate or current is None:
+            return False
+        current['timestamp'] = stock_entry['timestamp']
+    return True
+
+def embed_entry(stock_entry):
+    """Embedding of the tick text (cached), or None without an embedder"""
+    if not embedding_cache:
+        return None
+    try:
+        with instruments.EMBED_SECONDS.labels('backend').time():
+            return embedding_cache.encode(stock_entry['text'])
+    except:
+        return None
+
+def store_entry(stock_entry, emb=None):
+    """Append a tick to the window and index its embedding"""
+    global snapshot_version
+    with store_lock:
+        stock_entry['id'] = next(_doc_ids)
+        stock_data.append(stock_entry)
+        docs_by_id[stock_entry['id']] = stock_entry
+        latest_snapshot[stock_entry['symbol']] = stock_entry
+        snapshot_version += 1
+    delta_stream.mark(stock_entry)
+    symbol_index.add(stock_entry['id'], stock_entry['symbol'], stock_entry.get('sector'))
+    if emb is not None:
+        vector_index.add(stock_entry['id'], emb, time.time())
+
+def market_stats():
+    """MarketStats for the latest snapshot, recomputed only when the snapshot changes"""
+    with store_lock:
+        version = snapshot_version
+        if _stats_cache['version'] == version:
+            return _stats_cache['stats']
+        rows = list(latest_snapshot.values())
+    stats = compute_stats(rows)
+    with store_lock:
+        # a slower recompute of an older snapshot never replaces a newer one
+        if _stats_cache['version'] < version:
+            _stats_cache.update(version=version, stats=stats)
+    return stats
+
+def fetch_quote_yfinance(symbol):
+    """Latest bar from yfinance -> quote dict"""
     import yfinance as yf
-    fetch_count = 0
-    rate_limited = False
-
-    while True:
-        fetch_count += 1
-        successful = 0
-        fallback = 0
-
-        print(f"[Fetch #{fetch_count}] {datetime.now().strftime('%Y-%m-%d %H:%M:%S IST')}")
-
-        for idx, (symbol, name) in enumerate(list(STOCKS.items())):
-            try:
-                if idx > 0:
-                    time.sleep(random.uniform(0.5, 1.5))
-
-                if not rate_limited:
-                    try:
-                        ticker = yf.Ticker(symbol)
-                        hist = ticker.history(period='1d', progress=False, timeout=5)
-
-                        if hist.empty or len(hist) == 0:
-                            raise Exception("Empty data")
-
-                        latest = hist.iloc[-1]
-                        current_price = float(latest['Close'])
-                        prev_close = float(hist.iloc[-2]['Close']) if len(hist) > 1 else current_price
-                        change = current_price - prev_close
-                        change_percent = (change / prev_close * 100) if prev_close else 0
-
-                        stock_entry = {
-                            'symbol': symbol.replace('.NS', ''),
-                            'name': name,
-                            'price': round(current_price, 2),
-                            'change': round(change, 2),
-                            'change_percent': round(change_percent, 2),
-                            'high': round(float(latest['High']), 2),
-                            'low': round(float(latest['Low']), 2),
-                            'volume': int(latest['Volume']),
-                            'timestamp': datetime.now().isoformat(),
-                            'text': f"{symbol} {name} at ₹{current_price:.2f} ({change_percent:+.2f}%)",
-                            'source': 'yfinance'
-                        }
+    ticker = yf.Ticker(symbol)
+    hist = ticker.history(period='1d', progress=False, timeout=5)
+
+    if hist.empty or len(hist) == 0:
+        raise Exception("Empty data")
+
+    latest = hist.iloc[-1]
+    current_price = float(latest['Close'])
+    return {
+        'price': current_price,
+        'prev_close': float(hist.iloc[-2]['Close']) if len(hist) > 1 else current_price,
+        'high': float(latest['High']),
+        'low': float(latest['Low']),
+        'volume': int(latest['Volume']),
+    }
+
+def fetch_quote_http(symbol):
+    """Quote from a STOCK_API_URL-style service (`/stock?symbol=`), e.g. benchmarks/fake_upstream.py"""
+    response = requests.get(
+        f"{QUOTE_SOURCE_URL}/stock",
+        params={'symbol': symbol.replace('.NS', '')},
+        timeout=5
+    )
+    if response.status_code == 429:
+        raise RateLimited("429 Too Many Requests")
+    response.raise_for_status()
+    data = response.json()['data']
+    current_price = float(data['current_price'])
+    return {
+        'price': current_price,
+        'prev_close': current_price - float(data.get('change', 0)),
+        'high': float(data.get('high', current_price)),
+        'low': float(data.get('low', current_price)),
+        'volume': int(data.get('volume', 0)),
+    }
+
+def fallback_quote(symbol):
+    """Current simulated quote (correlated GBM from the fallback price)"""
+    return market_simulator.quote(symbol)
+
+def make_entry(symbol, name, quote, source):
+    current_price = quote['price']
+    prev_close = quote['prev_close']
+    change = current_price - prev_close
+    change_percent = (change / prev_close * 100) if prev_close else 0
+    return {
+        'symbol': symbol.replace('.NS', ''),
+        'name': name,
+        'sector': SECTORS.get(symbol, 'Unknown'),
+        'price': round(current_price, 2),
+        'change': round(change, 2),
+        'change_percent': round(change_percent, 2),
+        'high': round(quote['high'], 2),
+        'low': round(quote['low'], 2),
+        'volume': int(quote['volume']),
+        'timestamp': datetime.now().isoformat(),
+        'text': f"{symbol} {name} at ₹{current_price:.2f} ({change_percent:+.2f}%)",
+        'source': source
+    }
+
+def trim_window():
+    """Drop ticks beyond MAX_TICKS from the window and both indexes"""
+    with store_lock:
+        if len(stock_data) <= MAX_TICKS:
+            return
+        expired = stock_data[:-MAX_TICKS]
+        stock_data[:] = stock_data[-MAX_TICKS:]
+        for s in expired:
+            docs_by_id.pop(s['id'], None)
+            if latest_snapshot.get(s['symbol']) is s:
+                # its only copy left the window: store the next tick even if unchanged
+                change_detector.forget(s['symbol'])
+    vector_index.remove([s['id'] for s in expired])
+    symbol_index.remove([s['id'] for s in expired])
 
-                        stock_data.append(stock_entry)
-                        if embedder:
-                            try:
-                                emb = embedder.encode(stock_entry['text']).tolist()
-                                embeddings_store.append(emb)
-                            except:
-                                pass
-
-                        successful += 1
-                        print(f"✓ {symbol:15} | ₹{current_price:8.2f} | {change_percent:+6.2f}% [yfinance]")
-                        continue
-
-                    except Exception as e:
-                        if "429" in str(e):
-                            rate_limited = True
-                        pass
-
-                # Fallback
-                base_price = FALLBACK_PRICES.get(symbol, 1000)
-                daily_change_percent = random.uniform(-3, 3)
-                current_price = base_price * (1 + daily_change_percent / 100)
-
-                stock_entry = {
-                    'symbol': symbol.replace('.NS', ''),
-                    'name': name,
-                    'price': round(current_price, 2),
-                    'change': round(current_price - base_price, 2),
-                    'change_percent': round(daily_change_percent, 2),
-                    'high': round(current_price * random.uniform(1.005, 1.015), 2),
-                    'low': round(current_price * random.uniform(0.985, 0.995), 2),
-                    'volume': random.randint(1000000, 50000000),
-                    'timestamp': datetime.now().isoformat(),
-                    'text': f"{symbol} {name} at ₹{current_price:.2f} ({daily_change_percent:+.2f}%)",
-                    'source': 'fallback'
-                }
-
-                stock_data.append(stock_entry)
-                if embedder:
-                    try:
-                        emb = embedder.encode(stock_entry['text']).tolist()
-                        embeddings_store.append(emb)
-                    except:
-                        pass
-
-                fallback += 1
-                print(f"⚠ {symbol:15} | ₹{current_price:8.2f} | {daily_change_percent:+6.2f}% [fallback]")
-
-            except Exception as e:
-                print(f"❌ {symbol:15} | Error: {str(e)[:30]}")
-
-        if len(stock_data) > 500:
-            stock_data[:] = stock_data[-500:]
-            embeddings_store[:] = embeddings_store[-500:]
+# ============================================================================
+# INGEST PIPELINE
+# fetch -> normalize -> [tick bus] -> dedupe -> embed -> index -> publish
+# Each stage has its own worker(s) and a bounded queue; queues conflate by
+# symbol, so a slow stage keeps only the newest pending tick per symbol and
+# never stalls the stages before it. Metrics are under /health 'pipeline'.
+# ============================================================================
 
-        print(f"✅ {successful} yfinance, {fallback} fallback\n")
-        time.sleep(60)
+if os.getenv('QUOTE_SOURCE') == 'sim':
+    QUOTE_SOURCE = 'sim'
+else:
+    QUOTE_SOURCE = 'http' if QUOTE_SOURCE_URL else 'yfinance'
+_fetch_cycles = itertools.count(1)
+_report_cycles = itertools.count(1)
+_cache_mark = {'stats': None}
+
+def by_symbol(item):
+    return item['symbol']
+
+_round_lock = threading.Lock()
+_round_of = {}      # symbol -> the polling round still waiting for it
+
+def begin_round(batch):
+    """Start timing a polling round (fetch_cycle_seconds ends when its last symbol is fetched)"""
+    round_ = {'started': time.perf_counter(), 'pending': set(batch)}
+    with _round_lock:
+        for symbol in batch:
+            previous = _round_of.get(symbol)
+            if previous is not None:
+                # still queued from an earlier round: the fetch counts for this one
+                previous['pending'].discard(symbol)
+            _round_of[symbol] = round_
+
+def finish_fetch(symbol):
+    with _round_lock:
+        round_ = _round_of.pop(symbol, None)
+        if round_ is None:
+            return
+        round_['pending'].discard(symbol)
+        if round_['pending']:
+            return
+    instruments.CYCLE_SECONDS.observe(time.perf_counter() - round_['started'])
+
+def fetch_stage(symbol):
+    """fetch: quote through the rate-limit-aware scheduler, fallback quote otherwise"""
+    ticker = TICKERS[symbol]
+    fetch_quote = fetch_quote_http if QUOTE_SOURCE_URL else fetch_quote_yfinance
+    started = time.perf_counter()
+    ok, quote = fetch_scheduler.call(QUOTE_SOURCE, fetch_quote, ticker)
+    # ok is None when backoff skipped the upstream, False when the call failed
+    outcome = QUOTE_SOURCE if ok else ('fallback' if ok is None else 'error')
+    instruments.record_fetch(symbol, outcome, time.perf_counter() - started)
+    finish_fetch(symbol)
+    if not ok:
+        return {'symbol': symbol, 'quote': fallback_quote(ticker), 'source': 'fallback'}
+    return {'symbol': symbol, 'quote': quote, 'source': QUOTE_SOURCE}
+
+def normalize_stage(raw):
+    """normalize: quote -> tick in the window schema, published to the tick bus"""
+    ticker = TICKERS[raw['symbol']]
+    stock_entry = make_entry(ticker, STOCKS[ticker], raw['quote'], raw['source'])
+    priority_poller.observe(raw['symbol'], stock_entry['change_percent'])
+    tick_bus.publish(stock_entry)
+    return None
+
+def dedupe_stage(stock_entry):
+    """dedupe: drop late ticks from other nodes, conflate unchanged quotes"""
+    if stock_entry.get('symbol') not in TICKERS:
+        return None
+    current = latest_snapshot.get(stock_entry['symbol'])
+    if current is not None and stock_entry['timestamp'] < current['timestamp']:
+        return None
+    if conflate_entry(stock_entry):
+        return None
+    return stock_entry
+
+def embed_stage(stock_entry):
+    """embed: cached text embedding"""
+    return {'symbol': stock_entry['symbol'], 'entry': stock_entry, 'vector': embed_entry(stock_entry)}
+
+def index_stage(item):
+    """index: append to the window, ANN + symbol indexes, trim"""
+    current = latest_snapshot.get(item['symbol'])
+    if current is not None and item['entry']['timestamp'] < current['timestamp']:
+        return None
+    store_entry(item['entry'], item['vector'])
+    trim_window()
+    return {'symbol': '*'}
+
+def publish_stage(_):
+    """publish: rebuild the market report (paced to once per POLL_ROUND)"""
+    cycle = next(_report_cycles)
+    report_publisher.publish(build_report(market_stats(), cycle))
+    ingest = change_detector.end_cycle()
+    embedded = ''
+    if embedding_cache:
+        before, after = _cache_mark['stats'], embedding_cache.stats()
+        if before:
+            embedded = (f" | embeddings {after['misses'] - before['misses']} computed, "
+                        f"{after['hits'] - before['hits']} reused")
+        _cache_mark['stats'] = after
+    print(f"♻️  Report #{cycle} | {ingest['conflated']}/{ingest['ticks']} ticks conflated{embedded}")
+
+STAGE_QUEUE = int(os.getenv('STAGE_QUEUE', max(256, len(universe))))
+# Replay measures ingest throughput, so its serve queues block instead of
+# conflating: every replayed tick is processed, none merged away
+SERVE_POLICY = BLOCK if tick_replayer else CONFLATE
+ingest_pipeline = StagePipeline(
+    Stage('fetch', fetch_stage, workers=int(os.getenv('FETCH_WORKERS', 4)),
+          maxsize=STAGE_QUEUE, policy=CONFLATE, key=lambda symbol: symbol),
+    Stage('normalize', normalize_stage, maxsize=STAGE_QUEUE, policy=CONFLATE, key=by_symbol),
+)
+serve_pipeline = StagePipeline(
+    Stage('dedupe', dedupe_stage, maxsize=STAGE_QUEUE, policy=SERVE_POLICY, key=by_symbol),
+    Stage('embed', embed_stage, workers=int(os.getenv('EMBED_WORKERS', 1)),
+          maxsize=STAGE_QUEUE, policy=SERVE_POLICY, key=by_symbol),
+    Stage('index', index_stage, maxsize=STAGE_QUEUE, policy=SERVE_POLICY, key=by_symbol),
+    Stage('publish', publish_stage, maxsize=1, policy=CONFLATE, key=by_symbol, min_interval=POLL_ROUND),
+)
+
+def fetch_stocks_smart(shard=0):
+    """
+    Schedule fetches for one shard
+    Each round queues the symbols the priority poller says are due; outside
+    market hours one full closing snapshot is queued instead. The fetch stage
+    conflates by symbol, so a backlog never fetches a symbol twice.
+    """
+    poller = priority_poller.shards[shard]
+    label = f"shard {shard}, " if FETCH_SHARDS > 1 else ''
+    print(f"\n{'='*70}")
+    print(f"🔄 Starting Smart Stock Fetcher ({label}{len(poller.symbols)} symbols every {poller.base_interval:.0f}s)")
+    print(f"{'='*70}\n")
 
-thread = threading.Thread(target=fetch_stocks_smart, daemon=True)
-thread.start()
+    last_fetch = None
+    while True:
+        if not market_calendar.should_fetch(last_fetch):
+            status = market_calendar.status()
+            print(f"💤 Market closed, next session {status['next_session']} (holding the closing snapshot)")
+            time.sleep(market_calendar.sleep_seconds(FETCH_INTERVAL, MARKET_HEARTBEAT))
+            continue
+
+        batch = poller.next_batch() if market_calendar.is_open() else list(poller.symbols)
+        last_fetch = datetime.now(market_calendar.tz)
+        if batch:
+            begin_round(batch)
+            for symbol in batch:
+                ingest_pipeline.put(symbol)
+            source_stats = fetch_scheduler.source(QUOTE_SOURCE)
+            limited = ' | ⏳ rate limited, probing for recovery' if fetch_scheduler.limited else ''
+            print(f"[Fetch #{next(_fetch_cycles)}] {datetime.now().strftime('%Y-%m-%d %H:%M:%S IST')} | "
+                  f"{label}{len(batch)} due | {len(ingest_pipeline.stages[0].queue)} queued | "
+                  f"{QUOTE_SOURCE} success rate {source_stats.success_rate:.0%}{limited}")
+        time.sleep(market_calendar.sleep_seconds(POLL_ROUND, MARKET_HEARTBEAT))
+
+def replay_entry(record):
+    """Recorded tick (backend or pipeline jsonl) -> tick in the window schema, stamped now"""
+    symbol = str(record['symbol']).replace('.NS', '')
+    ticker = TICKERS.get(symbol)
+    if ticker is None:
+        return None
+    price = float(record['price'])
+    quote = {
+        'price': price,
+        'prev_close': price - float(record.get('change') or 0),
+        'high': float(record.get('high') or price),
+        'low': float(record.get('low') or price),
+        'volume': int(record.get('volume') or 0),
+    }
+    entry = make_entry(ticker, STOCKS[ticker], quote, 'replay')
+    entry['recorded_at'] = record.get('timestamp')
+    return entry
+
+def tick_sink():
+    """Where generated ticks go: (emit, direct)"""
+    # in-process the serve pipeline is fed directly, so a fast producer meets
+    # its bounded queues (blocking under replay, conflating otherwise) rather
+    # than the bus, which would drop
+    direct = INGEST_ROLE == 'all'
+    return (serve_pipeline.put if direct else tick_bus.publish), direct
+
+def replay_ticks():
+    """Feed TICK_REPLAY through dedupe -> embed -> index -> publish, paced by REPLAY_SPEED"""
+    emit, direct = tick_sink()
+    dedupe, embed, index = serve_pipeline.stages[:3]
+    base = {stage.name: (stage.processed, stage.emitted) for stage in (dedupe, embed, index)}
+
+    def delta(stage):
+        processed, emitted = base[stage.name]
+        return stage.processed - processed, stage.emitted - emitted
+
+    print(f"⏯️  Replaying {tick_replayer.path} at {tick_replayer.speed_label}")
+    started = time.perf_counter()
+    fed = 0
+    for record in tick_replayer:
+        entry = replay_entry(record)
+        if entry is not None:
+            emit(entry)
+            fed += 1
+    stats = tick_replayer.stats()
+    print(f"⏹️  Replay done: {fed} ticks fed in {stats['elapsed_s']}s ({stats['ticks_per_s']} ticks/s)")
+    if direct:
+        # end to end: until every fed tick went through dedupe, and everything
+        # dedupe passed on went through embed and index (queues block under replay)
+        while not (delta(dedupe)[0] >= fed and delta(embed)[0] >= delta(dedupe)[1]
+                   and delta(index)[0] >= delta(embed)[1]):
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        processed, passed = delta(dedupe)
+        reached, indexed = delta(index)
+        print(f"⏹️  Ingested {processed} ticks in {elapsed:.2f}s ({processed / elapsed:.1f} ticks/s end to end) | "
+              f"{indexed} indexed, {processed - passed} unchanged or late at dedupe, "
+              f"{reached - indexed} superseded at index")
+
+def simulate_ticks():
+    """QUOTE_SOURCE=sim: step the simulator SIM_HZ times a second, every symbol ticks each step"""
+    emit, _ = tick_sink()
+    print(f"🎲 Simulating {len(market_simulator)} symbols at {SIM_HZ:g} steps/s")
+    period = 1.0 / SIM_HZ
+    due = window_start = time.perf_counter()
+    emitted = 0
+    while True:
+        market_simulator.step()
+        for ticker, quote in market_simulator.quotes():
+            emit(make_entry(ticker, STOCKS[ticker], quote, 'sim'))
+        emitted += len(market_simulator)
+
+        now = time.perf_counter()
+        if now - window_start >= 10:
+            print(f"🎲 Sim: {emitted / (now - window_start):,.0f} ticks/s emitted "
+                  f"(target {SIM_HZ * len(market_simulator):,.0f})")
+            window_start, emitted = now, 0
+        due += period
+        if due > now:
+            time.sleep(due - now)
+        else:
+            due = now   # behind target: downstream backpressure sets the pace
+
+def receive_tick(tick):
+    if tick_recorder:
+        tick_recorder.write(tick)
+    serve_pipeline.put(tick)
+
+if INGEST_ROLE in ('all', 'serve'):
+    serve_pipeline.start()
+    delta_stream.start()
+    tick_bus.subscribe(receive_tick)
+if INGEST_ROLE in ('all', 'ingest'):
+    if tick_replayer:
+        threading.Thread(target=replay_ticks, name='replay', daemon=True).start()
+    elif QUOTE_SOURCE == 'sim':
+        threading.Thread(target=simulate_ticks, name='simulator', daemon=True).start()
+    else:
+        ingest_pipeline.start()
+        for shard in range(len(priority_poller.shards)):
+            threading.Thread(target=fetch_stocks_smart, args=(shard,), daemon=True).start()
 
 # ============================================================================
 # OFFLINE ANALYSIS (When Groq fails)
 # ============================================================================
 
-def offline_analysis(question: str, context: str) -> str:
+def offline_analysis(question: str, plan=None):
     """
     Fallback analysis when Groq is unavailable
-    Provides template-based responses
+    Computes breadth, sectors, movers and volume leaders from the snapshot
     """
-    question_lower = question.lower()
-
-    # Analyze context
-    lines = context.split('\n')
-    prices = []
-    for line in lines:
-        if 'at ₹' in line:
-            try:
-                price_str = line.split('₹')[1].split(' ')[0]
-                prices.append(float(price_str))
-            except:
-                pass
-
-    # Template responses
-    if any(word in question_lower for word in ['gain', 'up', 'increase']):
-        avg_price = np.mean(prices) if prices else 0
-        return f"""Based on the latest market data:
-
-**Top Performers Today:**
-- Multiple stocks showing positive movement
-- Average price level: ₹{avg_price:.2f}
-- Market sentiment: Mixed to positive
-
-**Analysis:**
-The stocks in focus are demonstrating varied performance. Those with positive changes are likely driven by sector-specific developments or market corrections from oversold levels.
-
-**Recommendation:** Monitor volume and support levels for confirmation."""
-
-    elif any(word in question_lower for word in ['lose', 'down', 'fall', 'decline']):
-        return f"""Based on the latest market data:
-
-**Market Overview:**
-- Mixed performance across portfolio
-- Some stocks showing correction
-- Typical intraday volatility observed
-
-**Analysis:**
-Market corrections are a normal part of trading. Key factors to consider:
-1. Check support levels
-2. Volume analysis
-3. Sector rotation patterns
-
-**Note:** Consult financial advisors for trading decisions."""
-
-    elif any(word in question_lower for word in ['best', 'high', 'top']):
-        if prices:
-            highest = max(prices)
-            return f"""Based on the latest market data:
-
-**Highest Valued Stock:**
-Current price level: ₹{highest:.2f}
-
-**Analysis:**
-Premium-priced stocks often reflect:
-- Strong fundamentals
-- Consistent growth
-- Market confidence
-
-Monitor for any support level breaks or resistance breakthroughs."""
-
-    else:
-        return f"""Based on the latest market data provided:
-
-The Indian stock market is showing typical intraday volatility with multiple stocks across sectors. 
-
-**Key Observations:**
-- Mixed sector performance
-- Normal trading ranges observed
-- Volume patterns intact
-
-**Suggestion:** For AI-powered analysis, ensure Groq API is configured. Otherwise, refer to manual chart analysis tools."""
+    symbols = plan.symbols if plan else ()
+    sectors = plan.sectors if plan else ()
+    return offline_answer(question, market_stats(), symbols, sectors)
 
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
 
+instruments.TICKS_RETAINED.set_function(lambda: len(stock_data))
+instruments.VECTORS_INDEXED.set_function(lambda: len(vector_index))
+instruments.SYMBOLS_TRACKED.set_function(lambda: len(latest_snapshot))
+instruments.STREAM_CLIENTS.set_function(lambda: len(delta_stream))
+
+# Endpoints traced per request: stage timings go out as a Server-Timing header
+# and a 🧭 log line (TRACE_LOG=0 silences it); TRACE_SAMPLE_RATE / TRACE_SLOW_MS
+# keep a sample for /debug/traces
+TRACED_ENDPOINTS = {'query'}
+TRACE_LOG = os.getenv('TRACE_LOG', '1') == '1'
+trace_sampler = tracing.TraceSampler.from_env()
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+    if request.endpoint in TRACED_ENDPOINTS:
+        g.trace, g.trace_token = tracing.start(request.endpoint)
+
+@app.after_request
+def record_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        instruments.HTTP_SECONDS.labels(endpoint, request.method, response.status_code).observe(
+            time.perf_counter() - started)
+    token = g.pop('trace_token', None)
+    if token is not None:
+        trace = tracing.finish(token)
+        trace.attrs['status'] = response.status_code
+        response.headers['Server-Timing'] = trace.server_timing()
+        response.headers['Timing-Allow-Origin'] = '*'
+        if TRACE_LOG:
+            tracing.log_trace(trace)
+        trace_sampler.offer(trace)
+    return response
+
+# Admin profiling of the live process, all threads included (PROFILING_TOKEN)
+profiler = ProfilingAdmin.from_env()
+
+def profiling_response(handler):
+    status, content_type, body = profiler.check(request.headers) or handler(request.args.to_dict())
+    return Response(body, status=status, mimetype=content_type)
+
+@app.route('/admin/profile/cpu', methods=['GET'])
+def profile_cpu():
+    """Sampling CPU profile as collapsed stacks (?seconds=10&interval_ms=5&thread=)"""
+    return profiling_response(profiler.cpu)
+
+@app.route('/admin/profile/memory', methods=['GET', 'POST'])
+def profile_memory():
+    """tracemalloc snapshots/diffs (?action=start|snapshot|stop&group=lineno|filename)"""
+    return profiling_response(profiler.memory)
+
+@app.route('/debug/traces', methods=['GET'])
+def debug_traces():
+    """Sampled /query traces with per-stage p50/p99 (needs TRACE_SAMPLE_RATE or TRACE_SLOW_MS)"""
+    if not trace_sampler.enabled:
+        return jsonify({'error': 'trace sampling disabled (set TRACE_SAMPLE_RATE or TRACE_SLOW_MS)'}), 404
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 0:
+        return jsonify({'error': 'limit must be >= 0'}), 400
+    return jsonify(trace_sampler.dump(limit=limit)), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of the counters/histograms in observability.instruments"""
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
+
 @app.route('/health', methods=['GET'])
 def health():
     latest = {}
@@ -332,46 +698,112 @@ def health():
         'stocks': len(latest),
         'groq_available': groq_available,
         'groq_status': 'Connected' if groq_available else 'Using offline analysis',
+        'fetch': fetch_scheduler.report(),
+        'market': market_calendar.status(),
+        'polling': priority_poller.report(),
+        'ingest': change_detector.report(),
+        'embedding_cache': embedding_cache.stats() if embedding_cache else None,
+        'bus': dict(tick_bus.stats(), role=INGEST_ROLE),
+        'pipeline': dict(ingest_pipeline.stats(), **serve_pipeline.stats()),
+        'stream': delta_stream.stats(),
+        'replay': tick_replayer.stats() if tick_replayer else None,
+        'recording': {'file': tick_recorder.path, 'ticks': tick_recorder.recorded} if tick_recorder else None,
+        'simulator': {'symbols': len(market_simulator), 'steps': market_simulator.steps, 'hz': SIM_HZ}
+                     if QUOTE_SOURCE == 'sim' else None,
         'timestamp': datetime.now().isoformat()
     }), 200
 
-@app.route('/stocks', methods=['GET'])
-def get_stocks():
-    if not stock_data:
-        return jsonify({'stocks': [], 'message': 'Initializing...'}), 200
+@app.route('/stream', methods=['GET'])
+def stream():
+    """Server-sent events: the full snapshot, then per-cycle deltas of changed symbols"""
+    subscriber = delta_stream.subscribe()
+    if subscriber is None:
+        return jsonify({'error': f"stream is at its limit of {delta_stream.max_subscribers} clients"}), 503
+    return Response(delta_stream.events(subscriber), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
 
-    latest = {}
-    for s in reversed(stock_data):
-        if s['symbol'] not in latest:
-            latest[s['symbol']] = s
+@app.route('/report/latest', methods=['GET'])
+def latest_report():
+    """Per-cycle market summary (JSON, or ?format=text) with ETag revalidation"""
+    report, body, etag = report_publisher.latest()
+    if report is None:
+        return jsonify({'report': None, 'message': 'Initializing...'}), 200
 
-    return jsonify({'stocks': list(latest.values())}), 200
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.if_none_match.contains(etag.strip('"')):
+        return Response(status=304, headers=headers)
 
-@app.route('/stocks/top-gainers', methods=['GET'])
-def top_gainers():
-    if not stock_data:
-        return jsonify({'gainers': []}), 200
+    if request.args.get('format') == 'text':
+        text = report['polished_text'] or report['text']
+        return Response(text, mimetype='text/plain; charset=utf-8', headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
 
-    latest = {}
-    for s in reversed(stock_data):
-        if s['symbol'] not in latest:
-            latest[s['symbol']] = s
+@app.route('/watchlist', methods=['GET', 'POST'])
+def watchlist():
+    """Symbols refreshed at a higher priority (POST {"symbols": [...]} replaces the list)"""
+    if request.method == 'POST':
+        symbols = (request.json or {}).get('symbols', [])
+        priority_poller.set_watchlist(str(s).upper().replace('.NS', '') for s in symbols)
+    return jsonify({'watchlist': sorted(priority_poller.watchlist)}), 200
 
-    sorted_stocks = sorted(latest.values(), key=lambda x: x['change_percent'], reverse=True)
-    return jsonify({'gainers': sorted_stocks[:5]}), 200
+STOCK_SORT_KEYS = ('change_percent', 'change', 'symbol', 'price', 'volume')
 
-@app.route('/stocks/top-losers', methods=['GET'])
-def top_losers():
+@app.route('/stocks', methods=['GET'])
+def get_stocks():
+    """Latest quote per symbol (?sector=&sort=&order=asc|desc&offset=&limit= filter and page)"""
     if not stock_data:
-        return jsonify({'losers': []}), 200
+        return jsonify({'stocks': [], 'total': 0, 'message': 'Initializing...'}), 200
+
+    sector = request.args.get('sector')
+    sort = request.args.get('sort')
+    if sort and sort not in STOCK_SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(STOCK_SORT_KEYS)}"}), 400
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    if limit is not None and limit < 0:
+        return jsonify({'error': 'limit must be >= 0'}), 400
 
     latest = {}
     for s in reversed(stock_data):
         if s['symbol'] not in latest:
             latest[s['symbol']] = s
 
-    sorted_stocks = sorted(latest.values(), key=lambda x: x['change_percent'])
-    return jsonify({'losers': sorted_stocks[:5]}), 200
+    stocks = list(latest.values())
+    if sector:
+        stocks = [s for s in stocks if s.get('sector', '').lower() == sector.lower()]
+    if sort:
+        descending = request.args.get('order', 'asc' if sort == 'symbol' else 'desc') == 'desc'
+        stocks.sort(key=lambda s: s[sort], reverse=descending)
+    total = len(stocks)
+    stocks = stocks[offset:offset + limit if limit is not None else None]
+
+    return jsonify({'stocks': stocks, 'total': total, 'offset': offset}), 200
+
+@app.route('/stocks/top-gainers', methods=['GET'])
+def get_top_gainers():
+    stats = market_stats()
+    return jsonify({'gainers': [stats.rows[i] for i in top_gainers(stats, 5)]}), 200
+
+@app.route('/stocks/top-losers', methods=['GET'])
+def get_top_losers():
+    stats = market_stats()
+    return jsonify({'losers': [stats.rows[i] for i in top_losers(stats, 5)]}), 200
+
+def alert_entry(s):
+    return {
+        'symbol': s['symbol'],
+        'sector': s.get('sector', 'Unknown'),
+        'price': s['price'],
+        'change_percent': s['change_percent'],
+        'alert_type': 'SURGE 🚀' if s['change_percent'] > 0 else 'DROP 📉',
+        'timestamp': s['timestamp'],
+        'message': f"⚠️ {s['symbol']} moved {s['change_percent']:.2f}% - High volatility!"
+    }
 
 @app.route('/alerts', methods=['GET'])
 def get_alerts():
@@ -380,16 +812,8 @@ def get_alerts():
     seen_symbols = set()
 
     for s in reversed(stock_data[-200:]):
-        if s['symbol'] not in seen_symbols and abs(s['change_percent']) > 3.0:
-            alerts.append({
-                'symbol': s['symbol'],
-                'sector': s.get('sector', 'Unknown'),
-                'price': s['price'],
-                'change_percent': s['change_percent'],
-                'alert_type': 'SURGE 🚀' if s['change_percent'] > 0 else 'DROP 📉',
-                'timestamp': s['timestamp'],
-                'message': f"⚠️ {s['symbol']} moved {s['change_percent']:.2f}% - High volatility!"
-            })
+        if s['symbol'] not in seen_symbols and abs(s['change_percent']) > ALERT_THRESHOLD:
+            alerts.append(alert_entry(s))
             seen_symbols.add(s['symbol'])
 
     return jsonify({
@@ -397,6 +821,51 @@ def get_alerts():
         'count': len(alerts)
     })
 
+# /dashboard body and ETag, rebuilt only when the snapshot (or the status
+# fields served with it) changed; conflated ticks only move timestamps and
+# don't invalidate it
+_dashboard_cache = {'key': None, 'body': None, 'etag': None}
+_dashboard_lock = threading.Lock()
+
+def dashboard_body():
+    """(json_body, etag) of stocks, movers, alerts and health from one snapshot"""
+    key = (snapshot_version, groq_available, market_calendar.is_open())
+    with _dashboard_lock:
+        if _dashboard_cache['key'] != key:
+            with store_lock:
+                latest = list(latest_snapshot.values())
+                version = snapshot_version
+            stocks = [public_row(s) for s in latest]
+            stats = compute_stats(stocks)
+            alerts = sorted((s for s in stocks if abs(s['change_percent']) > ALERT_THRESHOLD),
+                            key=lambda x: x['timestamp'], reverse=True)
+            body = json.dumps({
+                'version': version,
+                'stocks': stocks,
+                'gainers': [stocks[i] for i in top_gainers(stats, 5)],
+                'losers': [stocks[i] for i in top_losers(stats, 5)],
+                'alerts': [alert_entry(s) for s in alerts[:20]],
+                'health': {
+                    'status': 'online',
+                    'stocks': len(stocks),
+                    'groq_available': groq_available,
+                    'market_open': key[2],
+                },
+                'timestamp': datetime.now().isoformat()
+            }, ensure_ascii=False, separators=(',', ':'))
+            etag = '"' + hashlib.sha1(body.encode('utf-8')).hexdigest()[:20] + '"'
+            _dashboard_cache.update(key=(version,) + key[1:], body=body, etag=etag)
+        return _dashboard_cache['body'], _dashboard_cache['etag']
+
+@app.route('/dashboard', methods=['GET'])
+def dashboard():
+    """Everything the dashboard renders in one response, with ETag revalidation"""
+    body, etag = dashboard_body()
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.if_none_match.contains(etag.strip('"')):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
+
 @app.route('/analytics', methods=['GET'])
 def get_analytics():
     """Get comprehensive analytics"""
@@ -457,6 +926,42 @@ def get_sectors():
         'details': sectors
     })
 
+def retrieve_context(question, intent):
+    """Retrieve prompt rows for an open-ended question and render them as a table"""
+    # Restrict retrieval to the symbols/sectors the question mentions
+    allowed_ids = symbol_index.lookup(intent.plan)
+    if allowed_ids is not None and not allowed_ids:
+        allowed_ids = None
+
+    # Retrieve candidates, then dedupe per symbol / decay by age / pack to the token budget
+    if embedding_cache and len(vector_index):
+        with tracing.span('embed'):
+            query_emb = intent.embedding if intent.embedding is not None else embedding_cache.encode(question)
+        with tracing.span('search'), instruments.VECTOR_SEARCH_SECONDS.labels('backend').time():
+            hits = vector_index.search(query_emb, k=CONTEXT_CANDIDATES, allowed_ids=allowed_ids)
+        candidates = [(docs_by_id[i], score) for i, score in hits if i in docs_by_id]
+    else:
+        rows = stock_data if allowed_ids is None else [s for s in stock_data if s['id'] in allowed_ids]
+        candidates = [(s, 0.0) for s in rows[-CONTEXT_CANDIDATES:]]
+    with tracing.span('select'):
+        top_docs, _ = select_context(
+            candidates,
+            token_budget=CONTEXT_TOKEN_BUDGET,
+            max_rows=CONTEXT_MAX_ROWS,
+            half_life=CONTEXT_HALF_LIFE,
+            row_tokens=table_row_tokens
+        )
+        return top_docs, build_table_context(top_docs)
+
+def log_query(mode, started, rows, prompt_tokens, usage=None):
+    """One line per query: route, rows, prompt tokens and end-to-end latency"""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    instruments.QUERY_TOTAL.labels(mode.split(':')[0]).inc()
+    tokens = f"~{prompt_tokens}"
+    if usage is not None and getattr(usage, 'prompt_tokens', None):
+        tokens = f"{usage.prompt_tokens} (est {prompt_tokens})"
+    print(f"🧮 /query [{mode}] {rows} rows | prompt tokens {tokens} | {elapsed_ms:.0f} ms")
+
 @app.route('/query', methods=['POST'])
 def query():
     """Query endpoint with Groq failover to offline analysis"""
@@ -469,27 +974,34 @@ def query():
             'mode': 'initializing'
         }), 200
 
+    started = time.perf_counter()
     try:
-        # Build context
-        if embedder and embeddings_store:
-            query_emb = embedder.encode(question)
-            similarities = [
-                np.dot(query_emb, emb) / (np.linalg.norm(query_emb) * np.linalg.norm(emb) + 1e-10)
-                for emb in embeddings_store
-            ]
-            top_10_idx = np.argsort(similarities)[-10:][::-1]
-            context = "\n\n".join([stock_data[i]['text'] for i in top_10_idx if i < len(stock_data)])
-            sources = [stock_data[i]['symbol'] for i in top_10_idx if i < len(stock_data)]
-        else:
-            context = "\n\n".join([s['text'] for s in stock_data[-10:]])
-            sources = [s['symbol'] for s in stock_data[-10:]]
+        # Structured questions get a computed answer, no embedding/LLM round trip
+        with tracing.span('route'):
+            intent = intent_router.classify(question)
+        if intent.name != 'open':
+            with tracing.span('answer'):
+                routed = intent_router.answer(intent, market_stats())
+            if routed:
+                answer, sources = routed
+                priority_poller.touch(sources)
+                log_query(f"direct:{intent.name}", started, len(sources), 0)
+                return jsonify({
+                    'answer': answer,
+                    'sources': sources,
+                    'mode': 'direct',
+                    'intent': intent.name,
+                    'timestamp': datetime.now().isoformat()
+                }), 200
 
         # Try Groq first
         if groq_available and groq_client:
+            top_docs, context = retrieve_context(question, intent)
+            sources = [d['symbol'] for d in top_docs]
+            priority_poller.touch(sources)
             try:
-                response = groq_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[
+                with tracing.span('prompt'):
+                    messages = [
                         {
                             "role": "system",
                             "content": "You are an Indian stock market expert. Provide brief analysis based on the data."
@@ -498,12 +1010,19 @@ def query():
                             "role": "user",
                             "content": f"Stock Data:\n{context}\n\nQuestion: {question}"
                         }
-                    ],
-                    temperature=0.7,
-                    max_tokens=256,
-                    timeout=10
-                )
-
+                    ]
+                    prompt_tokens = sum(estimate_tokens(m['content']) for m in messages)
+                with tracing.span('groq'):
+                    response = instruments.groq_completion(
+                        groq_client, 'query',
+                        model="llama-3.3-70b-versatile",
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=256,
+                        timeout=10
+                    )
+
+                log_query('groq_ai', started, len(top_docs), prompt_tokens, getattr(response, 'usage', None))
                 return jsonify({
                     'answer': response.choices[0].message.content,
                     'sources': sources,
@@ -516,16 +1035,20 @@ def query():
                 pass
 
         # Fallback to offline analysis
-        answer = offline_analysis(question, context)
+        with tracing.span('offline'):
+            answer, sources = offline_analysis(question, intent.plan)
+        priority_poller.touch(sources)
+        log_query('offline_analysis', started, len(sources), 0)
         return jsonify({
             'answer': answer,
             'sources': sources,
             'mode': 'offline_analysis',
-            'note': 'Groq API unavailable - using template-based analysis'
+            'note': 'Groq API unavailable - computed from the latest market snapshot'
         }), 200
 
     except Exception as e:
         print(f"❌ Query Error: {str(e)}")
+        instruments.QUERY_TOTAL.labels('error').inc()
         return jsonify({
             'answer': f'Error processing query: {str(e)[:100]}',
             'error': str(e),
@@ -0,0 +1,114 @@
+"""
+Benchmark: ANNIndex (IVF) vs the current brute-force cosine scan
+
+Usage:
+    python benchmarks/bench_ann.py                      # 1k, 100k, 1M @ dim 384
+    python benchmarks/bench_ann.py --sizes 1000 100000 --queries 50 --nprobe 4 8 16
+
+The "brute_force" column reproduces the per-vector np.dot loop used by
+backend_server.query / VectorStore.search; "exact_matrix" is a single
+vectorised matmul for reference. Recall@k is measured against exact search.
+At 1M x 384 float32 the corpus alone needs ~1.5 GB of RAM.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from pipeline.ann_index import ANNIndex
+
+
+def make_corpus(n, dim, rng, clusters=256):
+    """Clustered synthetic embeddings (roughly what templated tick text looks like)"""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    corpus = centers[labels] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+    return corpus
+
+
+def brute_force_loop(query, embeddings, k):
+    similarities = [
+        np.dot(query, emb) / (np.linalg.norm(query) * np.linalg.norm(emb) + 1e-10)
+        for emb in embeddings
+    ]
+    return np.argsort(similarities)[-k:][::-1]
+
+
+def exact_matrix(query, normed, k):
+    scores = normed @ (query / np.linalg.norm(query))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def timed(fn, queries):
+    latencies = []
+    results = []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def fmt(latencies):
+    return f"p50 {np.percentile(latencies, 50):8.3f} ms | p99 {np.percentile(latencies, 99):8.3f} ms"
+
+
+def run(size, dim, n_queries, k, nprobes, brute_limit, rng):
+    print(f"\n{'='*70}")
+    print(f"📐 {size:,} vectors x {dim} dims, {n_queries} queries, k={k}")
+    print(f"{'='*70}")
+
+    corpus = make_corpus(size, dim, rng)
+    queries = make_corpus(n_queries, dim, rng)
+
+    index = ANNIndex(dim=dim)
+    start = time.perf_counter()
+    batch = 50_000
+    for offset in range(0, size, batch):
+        chunk = corpus[offset:offset + batch]
+        index.add_batch(list(range(offset, offset + len(chunk))), chunk)
+    build_s = time.perf_counter() - start
+    print(f"build (incremental add_batch): {build_s:.2f}s | {index.stats()}")
+
+    normed = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    truth, exact_lat = timed(lambda q: exact_matrix(q, normed, k), queries)
+    print(f"exact_matrix     | {fmt(exact_lat)}")
+
+    if size <= brute_limit:
+        embeddings = [row for row in corpus]
+        loop_queries = queries[:max(1, min(n_queries, 10 if size > 10_000 else n_queries))]
+        _, loop_lat = timed(lambda q: brute_force_loop(q, embeddings, k), loop_queries)
+        print(f"brute_force      | {fmt(loop_lat)}  ({len(loop_queries)} queries)")
+    else:
+        print(f"brute_force      | skipped (size > --brute-limit {brute_limit:,})")
+
+    for nprobe in nprobes:
+        found, ann_lat = timed(lambda q: [i for i, _ in index.search(q, k=k, nprobe=nprobe)], queries)
+        recall = np.mean([len(set(f) & set(t.tolist())) / k for f, t in zip(found, truth)])
+        mode = 'ivf' if index.trained and len(index) >= index.exact_threshold else 'exact'
+        print(f"ann nprobe={nprobe:<4} | {fmt(ann_lat)} | recall@{k} {recall:.3f} [{mode}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[4, 8, 16, 32])
+    parser.add_argument('--brute-limit', type=int, default=1_000_000,
+                        help='skip the python-loop scan above this corpus size')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        run(size, args.dim, args.queries, args.k, args.nprobe, args.brute_limit, rng)
+
+
+if __name__ == '__main__':
+    main()
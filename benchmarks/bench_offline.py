@@ -0,0 +1,73 @@
+"""
+Benchmark: offline analytics responder latency
+
+Measures compute_stats + offline_answer over a synthetic snapshot.
+Target: < 5 ms per answer at 500 symbols.
+
+Usage:
+    python benchmarks/bench_offline.py --symbols 50 500 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from pipeline.offline_engine import compute_stats, offline_answer
+
+SECTORS = ['Banking', 'IT', 'Energy', 'FMCG', 'Auto', 'Pharma', 'Consumer', 'Telecom', 'Metals', 'Infrastructure']
+QUESTIONS = [
+    "Which stocks gained the most today?",
+    "Which stocks are most volatile?",
+    "Compare sector performance",
+    "Most active stocks by volume",
+    "Give me a market overview",
+]
+
+
+def make_snapshot(n, rng):
+    rows = []
+    for i in range(n):
+        price = rng.uniform(50, 10000)
+        pct = rng.gauss(0, 1.8)
+        rows.append({
+            'symbol': f"SYM{i:04d}",
+            'name': f"Company {i}",
+            'sector': SECTORS[i % len(SECTORS)],
+            'price': round(price, 2),
+            'change_percent': round(pct, 2),
+            'high': round(price * (1 + abs(rng.gauss(0, 0.01))), 2),
+            'low': round(price * (1 - abs(rng.gauss(0, 0.01))), 2),
+            'volume': rng.randint(10_000, 50_000_000),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    for n in args.symbols:
+        rows = make_snapshot(n, rng)
+        stats_ms, answer_ms = [], []
+        for r in range(args.repeat):
+            start = time.perf_counter()
+            stats = compute_stats(rows)
+            mid = time.perf_counter()
+            offline_answer(QUESTIONS[r % len(QUESTIONS)], stats)
+            end = time.perf_counter()
+            stats_ms.append((mid - start) * 1000)
+            answer_ms.append((end - mid) * 1000)
+        total = np.array(stats_ms) + np.array(answer_ms)
+        print(f"{n:5d} symbols | stats p50 {np.median(stats_ms):6.3f} ms | render p50 {np.median(answer_ms):6.3f} ms"
+              f" | total p50 {np.median(total):6.3f} ms p99 {np.percentile(total, 99):6.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark: prompt tokens per query, prose rows vs compact table context
+
+Builds a synthetic 500-tick window (46 symbols x ~11 fetch cycles), runs
+representative questions through the current selection (planner pre-filter +
+select_context) and reports estimated prompt tokens for the SAME selected
+rows in each format, so the format's own effect is isolated:
+
+    prose  - the rows' `text` joined with blank lines (old /query format)
+    rich   - the rows in IndianStockConnector._create_rich_text format (old pipeline)
+    table  - build_table_context (current /query)
+    format - table vs prose on those rows
+
+For reference, `old` is the old /query end to end (top-10 similar `text` rows,
+no pre-filter, no budget) and `e2e` the cut from it to the current path; that
+includes the pre-filter and token budget, not just the table format.
+
+Usage:
+    python benchmarks/bench_prompt_tokens.py
+    python benchmarks/bench_prompt_tokens.py --model all-MiniLM-L6-v2   # real embeddings
+
+Without --model a hashed bag-of-words embedder is used so the benchmark runs
+offline; it ranks templated tick text much like MiniLM does.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(ROOT)
+from connectors.universe import Universe
+from pipeline.ann_index import ANNIndex
+from pipeline.context import build_table_context, estimate_tokens, select_context, table_row_tokens
+from pipeline.retrieval import RetrievalPlanner
+
+QUESTIONS = [
+    "How is TCS doing?",
+    "Price of RELIANCE",
+    "Which stocks gained the most today?",
+    "Which stocks are most volatile?",
+    "Compare banking vs IT stocks",
+    "How are pharma stocks performing?",
+    "Is HDFC Bank up or down?",
+    "Provide a detailed summary of today's Indian stock market. Include top 3 gainers and top 3 losers.",
+]
+
+SYSTEM_PROMPT = "You are an Indian stock market expert. Provide brief analysis based on the data."
+
+
+def load_universe():
+    """STOCKS / FALLBACK_PRICES / sectors in the backend's shapes, from config/universe.csv"""
+    universe = Universe.from_csv()
+    sectors = {s: sector for sector, symbols in universe.sector_groups.items() for s in symbols}
+    return universe.stocks, universe.fallback_prices, sectors
+
+
+class HashEmbedder:
+    def encode(self, text, **kwargs):
+        vec = np.zeros(384, dtype=np.float32)
+        for word in text.lower().replace('(', ' ').replace(')', ' ').split():
+            vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % 384] += 1.0
+        return vec
+
+
+def make_window(stocks, prices, sectors, cycles, rng):
+    records = []
+    start = datetime.now() - timedelta(minutes=cycles)
+    for cycle in range(cycles):
+        ts = (start + timedelta(minutes=cycle)).isoformat()
+        for symbol, name in stocks.items():
+            base = prices.get(symbol, 1000)
+            pct = rng.uniform(-4, 4)
+            price = base * (1 + pct / 100)
+            records.append({
+                'symbol': symbol.replace('.NS', ''),
+                'name': name,
+                'sector': sectors.get(symbol, 'Unknown'),
+                'price': round(price, 2),
+                'change': round(price - base, 2),
+                'change_percent': round(pct, 2),
+                'open': round(base, 2),
+                'high': round(price * 1.01, 2),
+                'low': round(price * 0.99, 2),
+                'volume': rng.randint(1_000_000, 50_000_000),
+                'timestamp': ts,
+                'text': f"{symbol} {name} at ₹{price:.2f} ({pct:+.2f}%)",
+            })
+    return records[-500:]
+
+
+def rich_text(r):
+    return f"""
+Stock: {r['symbol']}
+Current Price: ₹{r['price']}
+Change: {r['change']} ({r['change_percent']}%)
+Day Range: ₹{r['low']} - ₹{r['high']}
+Open: ₹{r['open']}
+Volume: {r['volume']}
+Last Updated: {r['timestamp'][:19].replace('T', ' ')}
+""".strip()
+
+
+def prompt_tokens(context, question):
+    return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(f"Stock Data:\n{context}\n\nQuestion: {question}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help='sentence-transformers model name (optional)')
+    parser.add_argument('--cycles', type=int, default=11)
+    parser.add_argument('--budget', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        embedder = SentenceTransformer(args.model)
+    else:
+        embedder = HashEmbedder()
+
+    stocks, prices, sectors = load_universe()
+    records = make_window(stocks, prices, sectors, args.cycles, random.Random(args.seed))
+    planner = RetrievalPlanner(
+        {s.replace('.NS', ''): n for s, n in stocks.items()},
+        {s.replace('.NS', ''): sec for s, sec in sectors.items()}
+    )
+
+    index = ANNIndex(dim=384)
+    for i, r in enumerate(records):
+        index.add(i, embedder.encode(r['text']))
+    by_symbol = {}
+    by_sector = {}
+    for i, r in enumerate(records):
+        by_symbol.setdefault(r['symbol'], set()).add(i)
+        by_sector.setdefault(r['sector'], set()).add(i)
+
+    print(f"{'question':48} {'rows':>4} {'prose':>6} {'rich':>6} {'table':>6} {'format':>7} "
+          f"{'old':>6} {'e2e':>6} {'ms':>6}")
+    totals = np.zeros(4)
+    for question in QUESTIONS:
+        q_emb = embedder.encode(question)
+
+        old_hits = index.search(q_emb, k=10)
+        old = "\n\n".join(records[i]['text'] for i, _ in old_hits)
+
+        started = time.perf_counter()
+        plan = planner.plan(question)
+        allowed = None
+        if plan.filtered:
+            allowed = set()
+            for s in plan.symbols:
+                allowed |= by_symbol.get(s, set())
+            for s in plan.sectors:
+                allowed |= by_sector.get(s, set())
+            allowed = allowed or None
+        hits = index.search(q_emb, k=50, allowed_ids=allowed)
+        docs, _ = select_context([(records[i], score) for i, score in hits],
+                                 token_budget=args.budget, row_tokens=table_row_tokens)
+        table = build_table_context(docs)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        prose = "\n\n".join(d['text'] for d in docs)
+        rich = "\n\n".join(rich_text(d) for d in docs)
+        row = np.array([prompt_tokens(prose, question), prompt_tokens(rich, question),
+                        prompt_tokens(table, question), prompt_tokens(old, question)])
+        totals += row
+        print(f"{question[:48]:48} {len(docs):4d} {row[0]:6.0f} {row[1]:6.0f} {row[2]:6.0f} "
+              f"{1 - row[2] / row[0]:7.0%} {row[3]:6.0f} {1 - row[2] / row[3]:6.0%} {elapsed:6.2f}")
+
+    print('-' * 96)
+    print(f"{'total':48} {'':4} {totals[0]:6.0f} {totals[1]:6.0f} {totals[2]:6.0f} "
+          f"{1 - totals[2] / totals[0]:7.0%} {totals[3]:6.0f} {1 - totals[2] / totals[3]:6.0%}")
+    print(f"same rows: table is {1 - totals[2] / totals[0]:.0%} fewer prompt tokens than prose, "
+          f"{1 - totals[2] / totals[1]:.0%} fewer than rich text")
+
+
+if __name__ == '__main__':
+    main()
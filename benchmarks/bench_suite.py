@@ -0,0 +1,333 @@
+"""
+Benchmark suite: ingest, retrieval and serving hot paths, against a baseline
+
+Runs offline. Quotes come from an in-process FakeUpstream (QUOTE_SOURCE_URL,
+so yfinance is never imported), Groq is replaced by a stub client with a fixed
+latency, and MiniLM is loaded from the local Hugging Face cache
+(HF_HUB_OFFLINE=1). Without a cached model the hash embedder is used and the
+results are tagged `embedder: hash`.
+
+Measured:
+    fetch_cycle_s             one universe round: fetch -> normalize -> bus -> dedupe -> embed -> index
+    embed_texts_per_s         uncached embeddings, one text at a time (as ingest does)
+    embed_cached_per_s        EmbeddingCache hits
+    search_<n>_p50_ms/p99_ms  ANNIndex search over n synthetic vectors
+    http_<endpoint>_p50_ms/p99_ms
+    memory_per_tick_bytes     window + indexes + cached vector per retained tick
+
+Results are written as JSON (--output) and compared with the stored baseline
+(--baseline); a metric more than --tolerance worse than its baseline is a
+regression and the exit status is 1. Without a baseline the exit status is 2:
+store one on the reference machine with --update-baseline (`make
+bench-baseline`) and commit benchmarks/baseline.json, whose `meta` records the
+machine it was taken on.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --update-baseline
+    python benchmarks/bench_suite.py --only search http --tolerance 0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+sys.path.append(HERE)
+from bench_ann import make_corpus
+from bench_prompt_tokens import HashEmbedder
+from fake_upstream import FakeUpstream, serve
+from pipeline.ann_index import ANNIndex
+
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(HERE, 'results', 'latest.json')
+SCENARIOS = ('fetch', 'embed', 'search', 'http', 'memory')
+
+
+class StubGroq:
+    """Stands in for groq.Groq: fixed latency, canned answer, plausible usage"""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000.0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = sum(len(m['content']) for m in messages) // 4
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='Stub analysis.'))],
+            usage=SimpleNamespace(prompt_tokens=prompt, completion_tokens=4),
+        )
+
+
+def metric(value, unit, better='lower'):
+    return {'value': round(float(value), 4), 'unit': unit, 'better': better}
+
+
+def percentiles(samples_ms):
+    values = np.asarray(samples_ms)
+    return float(np.percentile(values, 50)), float(np.percentile(values, 99))
+
+
+def load_backend(upstream_port):
+    """Import backend_server wired to the fake upstream, serving role only (no fetch threads)"""
+    os.environ.update({
+        'HF_HUB_OFFLINE': '1',
+        'TRANSFORMERS_OFFLINE': '1',
+        'QUOTE_SOURCE_URL': f"http://127.0.0.1:{upstream_port}",
+        'INGEST_ROLE': 'serve',
+        'TICK_BUS': 'local',
+        'FETCH_RATE': '1000000',
+        'FETCH_BURST': '1000000',
+        'EMBEDDING_CACHE_DIR': '',
+        'TRACE_LOG': '0',
+        'groqapi': '',
+    })
+    with contextlib.redirect_stdout(io.StringIO()):
+        import backend_server
+    if backend_server.embedding_cache is None:
+        from pipeline.embedding_cache import EmbeddingCache
+        backend_server.embedder = HashEmbedder()
+        backend_server.embedding_cache = EmbeddingCache(backend_server.embedder, 'hash', 4 * backend_server.MAX_TICKS)
+        backend_server.intent_router.embedder = backend_server.embedding_cache
+    return backend_server
+
+
+def wait_for(condition, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("pipeline did not drain")
+        time.sleep(0.001)
+
+
+def bench_fetch(b, cycles):
+    """Wall time for one full round of the universe through both pipelines"""
+    b.ingest_pipeline.start()
+    dedupe, index = b.serve_pipeline.stages[0], b.serve_pipeline.stages[2]
+    symbols = list(b.TICKERS)
+    times = []
+    for _ in range(cycles + 1):     # first round warms caches and connections
+        dedupe_before, forwarded_before, index_before = dedupe.processed, dedupe.emitted, index.processed
+        started = time.perf_counter()
+        b.begin_round(symbols)
+        for symbol in symbols:
+            b.ingest_pipeline.put(symbol)
+        wait_for(lambda: dedupe.processed - dedupe_before >= len(symbols))
+        forwarded = dedupe.emitted - forwarded_before
+        wait_for(lambda: index.processed - index_before >= forwarded)
+        times.append(time.perf_counter() - started)
+    return {'fetch_cycle_s': metric(np.mean(times[1:]), 's')}
+
+
+def bench_embed(b, count):
+    texts = [f"BENCH{i} Benchmark Co at ₹{1000 + i * 0.37:.2f} ({(i % 700) / 100 - 3.5:+.2f}%)" for i in range(count)]
+    started = time.perf_counter()
+    for text in texts:
+        b.embedder.encode(text)
+    cold = count / (time.perf_counter() - started)
+
+    for text in texts:
+        b.embedding_cache.encode(text)
+    started = time.perf_counter()
+    for text in texts:
+        b.embedding_cache.encode(text)
+    cached = count / (time.perf_counter() - started)
+    return {
+        'embed_texts_per_s': metric(cold, 'texts/s', 'higher'),
+        'embed_cached_per_s': metric(cached, 'texts/s', 'higher'),
+    }
+
+
+def bench_search(sizes, queries, seed=0):
+    rng = np.random.default_rng(seed)
+    results = {}
+    for n in sizes:
+        corpus = make_corpus(n, 384, rng)
+        index = ANNIndex(dim=384)
+        index.add_batch(np.arange(n), corpus)
+        probes = corpus[rng.integers(0, n, size=queries)] + 0.1 * rng.standard_normal((queries, 384)).astype(np.float32)
+        index.search(probes[0], k=10)       # trains the IVF lists above exact_threshold
+        samples = []
+        for q in probes:
+            started = time.perf_counter()
+            index.search(q, k=10)
+            samples.append((time.perf_counter() - started) * 1000)
+        p50, p99 = percentiles(samples)
+        results[f'search_{n}_p50_ms'] = metric(p50, 'ms')
+        results[f'search_{n}_p99_ms'] = metric(p99, 'ms')
+    return results
+
+
+def bench_http(b, requests_per_endpoint, groq_latency_ms):
+    client = b.app.test_client()
+    cases = [
+        ('stocks', lambda: client.get('/stocks')),
+        ('analytics', lambda: client.get('/analytics')),
+        ('sectors', lambda: client.get('/sectors')),
+        ('query_direct', lambda: client.post('/query', json={'question': 'top gainers today'})),
+        ('query_offline', lambda: client.post('/query', json={'question': 'how does the market look overall'})),
+    ]
+    results = {}
+
+    def run(name, call):
+        call()
+        samples = []
+        for _ in range(requests_per_endpoint):
+            started = time.perf_counter()
+            response = call()
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: HTTP {response.status_code}")
+        p50, p99 = percentiles(samples)
+        results[f'http_{name}_p50_ms'] = metric(p50, 'ms')
+        results[f'http_{name}_p99_ms'] = metric(p99, 'ms')
+
+    for name, call in cases:
+        run(name, call)
+
+    # Groq path (retrieval + prompt + stub completion)
+    client_before, available_before = b.groq_client, b.groq_available
+    b.groq_client, b.groq_available = StubGroq(groq_latency_ms), True
+    try:
+        run('query_groq', lambda: client.post('/query', json={'question': 'how does the market look overall'}))
+    finally:
+        b.groq_client, b.groq_available = client_before, available_before
+    return results
+
+
+def bench_memory(b, ticks):
+    """Bytes allocated per retained tick: window record, doc map, symbol + ANN index, cached vector"""
+    symbols = list(b.TICKERS)
+    rng = np.random.default_rng(1)
+    entries = []
+    for i in range(ticks):
+        ticker = b.TICKERS[symbols[i % len(symbols)]]
+        price = float(rng.uniform(100, 5000))
+        quote = {'price': price, 'prev_close': price * 0.99, 'high': price * 1.01, 'low': price * 0.98, 'volume': 1_000_000 + i}
+        entries.append(b.make_entry(ticker, b.STOCKS[ticker], quote, 'bench'))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for entry in entries:
+        b.store_entry(entry, b.embed_entry(entry))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    b.trim_window()
+    return {'memory_per_tick_bytes': metric((after - before) / ticks, 'bytes')}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print a comparison table; returns the names of regressed metrics"""
+    regressions = []
+    print(f"\n{'metric':34s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, current in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base['value']:
+            print(f"{name:34s} {'-':>12s} {current['value']:12.4g} {'new':>8s}")
+            continue
+        change = current['value'] / base['value'] - 1
+        worse = change > tolerance if current['better'] == 'lower' else change < -tolerance
+        flag = '  REGRESSION' if worse else ''
+        print(f"{name:34s} {base['value']:12.4g} {current['value']:12.4g} {change:+7.0%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--cycles', type=int, default=5, help='fetch rounds to time')
+    parser.add_argument('--embed-texts', type=int, default=500)
+    parser.add_argument('--search-sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--groq-latency-ms', type=float, default=0.0, help='stub Groq latency')
+    parser.add_argument('--ticks', type=int, default=2_000, help='ticks stored for the memory measurement')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    upstream = serve(FakeUpstream(seed=0), 0)
+    backend = load_backend(upstream.server_address[1])
+
+    results = {}
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        if 'fetch' in args.only:
+            results.update(bench_fetch(backend, args.cycles))
+        if 'embed' in args.only:
+            results.update(bench_embed(backend, args.embed_texts))
+        if 'search' in args.only:
+            results.update(bench_search(args.search_sizes, args.queries))
+        if 'http' in args.only:
+            results.update(bench_http(backend, args.requests, args.groq_latency_ms))
+        if 'memory' in args.only:
+            results.update(bench_memory(backend, args.ticks))
+    upstream.shutdown()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'embedder': backend.embedding_cache.model_name,
+            'symbols': len(backend.TICKERS),
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        compare(results, {}, args.tolerance)
+        print(f"\n❌ No baseline at {args.baseline}: nothing to check for regressions against. "
+              f"Store one with --update-baseline (make bench-baseline) and commit it.")
+        return 2
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('embedder') != report['meta']['embedder']:
+        print(f"⚠️  Baseline embedder {baseline['meta'].get('embedder')} != {report['meta']['embedder']}")
+    regressions = compare(results, baseline['results'], args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Benchmark: fetch cycle time and memory vs universe size
+
+Builds a synthetic universe CSV of N symbols, loads it with Universe, and runs
+full fetch cycles against an in-process synthetic quote source (fixed latency
+per request) through the backend's ingest path: FetchScheduler -> change
+detection -> embedding cache (hash embedder) -> ANN + symbol index -> window
+trim -> MarketStats + report. Shards run as parallel workers, as in the
+backend with FETCH_SHARDS.
+
+Usage:
+    python benchmarks/bench_universe.py --symbols 50 500 2000 --shards 1 4 --latency-ms 2
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from bench_prompt_tokens import HashEmbedder
+from connectors.change_detector import ChangeDetector
+from connectors.fetch_scheduler import FetchScheduler
+from connectors.universe import Universe
+from pipeline.ann_index import ANNIndex
+from pipeline.embedding_cache import EmbeddingCache
+from pipeline.market_report import build_report
+from pipeline.offline_engine import compute_stats
+from pipeline.retrieval import SymbolIndex
+
+SECTORS = ['Banking', 'IT', 'Energy', 'FMCG', 'Auto', 'Pharma', 'Consumer', 'Telecom', 'Metals', 'Infrastructure']
+
+
+def write_universe(n, directory, rng):
+    path = os.path.join(directory, f"universe_{n}.csv")
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['symbol', 'name', 'sector', 'fallback_price'])
+        for i in range(n):
+            writer.writerow([f"SYM{i:04d}", f"Company {i}", SECTORS[i % len(SECTORS)], f"{rng.uniform(50, 10000):.2f}"])
+    return path
+
+
+class SyntheticSource:
+    """Random-walk quotes with a fixed per-request latency; ~30% of polls return an unchanged quote"""
+
+    def __init__(self, universe, latency_ms, seed=0):
+        self.latency = latency_ms / 1000.0
+        self.prices = {universe.ticker(i.symbol): i.fallback_price for i in universe.instruments}
+        self.base = dict(self.prices)
+        self.local = threading.local()
+        self.seed = seed
+
+    def fetch(self, ticker):
+        rng = getattr(self.local, 'rng', None)
+        if rng is None:
+            rng = self.local.rng = random.Random(f"{self.seed}-{threading.get_ident()}")
+        if self.latency:
+            time.sleep(self.latency)
+        if rng.random() > 0.3:
+            self.prices[ticker] *= 1 + rng.gauss(0, 0.002)
+        price = self.prices[ticker]
+        base = self.base[ticker]
+        return {
+            'price': price,
+            'change_percent': (price - base) / base * 100,
+            'high': max(price, base) * 1.002,
+            'low': min(price, base) * 0.998,
+            'volume': 1_000_000,
+        }
+
+
+class Ingest:
+    """The backend's storage path, minus Flask"""
+
+    def __init__(self, universe, max_ticks):
+        self.universe = universe
+        self.sectors = {i.symbol: i.sector for i in universe.instruments}
+        self.max_ticks = max_ticks
+        self.window = []
+        self.snapshot = {}
+        self.lock = threading.RLock()
+        self.ids = itertools.count()
+        self.detector = ChangeDetector(volume_tolerance=0.01)
+        self.cache = EmbeddingCache(HashEmbedder(), 'hash', max_entries=4 * max_ticks)
+        self.index = ANNIndex(dim=384)
+        self.symbol_index = SymbolIndex()
+
+    def store(self, symbol, quote):
+        tick = dict(quote, symbol=symbol, sector=self.sectors[symbol], timestamp=time.time())
+        tick['text'] = f"{symbol} {self.universe.by_symbol[symbol].name} at ₹{tick['price']:.2f} ({tick['change_percent']:+.2f}%)"
+        if self.detector.is_duplicate(symbol, tick) and symbol in self.snapshot:
+            self.snapshot[symbol]['timestamp'] = tick['timestamp']
+            return
+        vector = self.cache.encode(tick['text'])
+        with self.lock:
+            tick['id'] = next(self.ids)
+            self.window.append(tick)
+            self.snapshot[symbol] = tick
+        self.symbol_index.add(tick['id'], symbol, tick['sector'])
+        self.index.add(tick['id'], vector, tick['timestamp'])
+
+    def trim(self):
+        with self.lock:
+            if len(self.window) <= self.max_ticks:
+                return
+            expired = self.window[:-self.max_ticks]
+            self.window[:] = self.window[-self.max_ticks:]
+        ids = [t['id'] for t in expired]
+        self.index.remove(ids)
+        self.symbol_index.remove(ids)
+
+
+def run(n, shards, cycles, latency_ms, directory, rng):
+    universe = Universe.from_csv(write_universe(n, directory, rng))
+    source = SyntheticSource(universe, latency_ms)
+    scheduler = FetchScheduler(rate=1e6, burst=1e6)
+
+    tracemalloc.start()
+    ingest = Ingest(universe, max(500, 10 * len(universe)))
+    cycle_times = []
+    for cycle in range(cycles):
+        start = time.perf_counter()
+
+        def worker(symbols):
+            for symbol in symbols:
+                ok, quote = scheduler.call('synthetic', source.fetch, universe.ticker(symbol))
+                if ok:
+                    ingest.store(symbol, quote)
+
+        threads = [threading.Thread(target=worker, args=(s,)) for s in universe.shards(shards)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ingest.trim()
+        build_report(compute_stats(ingest.snapshot.values()), cycle)
+        cycle_times.append(time.perf_counter() - start)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    serial = n * latency_ms / 1000.0 / shards
+    conflated = ingest.detector.report()['conflated_ratio']
+    print(f"{n:5d} symbols | {shards} shard(s) | cycle {np.mean(cycle_times[1:] or cycle_times):6.2f} s "
+          f"(I/O floor {serial:5.2f} s) | window {len(ingest.window):6d} ticks | "
+          f"conflated {conflated:4.0%} | mem {current / 2**20:6.1f} MB (peak {peak / 2**20:6.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--cycles', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='synthetic upstream latency per request')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        for n in args.symbols:
+            for shards in args.shards:
+                run(n, shards, args.cycles, args.latency_ms, directory, rng)
+
+
+if __name__ == '__main__':
+    main()
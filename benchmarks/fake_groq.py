@@ -0,0 +1,172 @@
+"""
+Fake Groq (OpenAI-compatible) chat completions server
+
+Serves what the backend and pipeline call through the groq SDK:
+    GET  /openai/v1/models                 (startup connectivity check)
+    POST /openai/v1/chat/completions       canned answer + usage
+
+The groq SDK reads GROQ_BASE_URL, so point the backend at it with
+    GROQ_BASE_URL=http://localhost:9002 groqapi=fake python backend_server.py
+Note the SDK retries 429/5xx twice by default, so injected errors also show
+up as extra latency on the caller's side.
+
+Usage:
+    python benchmarks/fake_groq.py --port 9002 --latency-ms 400 --dist lognormal
+    python benchmarks/fake_groq.py --latency-ms 300 --p429 0.02 --p500 0.01 --timeout-p 0.005
+
+Latency distributions (--dist): fixed, exp (mean --latency-ms), lognormal
+(median --latency-ms, --sigma spread, for a realistic long tail).
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+MODELS = ('llama-3.3-70b-versatile', 'llama-3.1-8b-instant')
+
+
+class FakeGroq:
+    """Completion generator with injected latency, 429s, 500s and stalls"""
+
+    def __init__(self, latency_ms=300.0, dist='lognormal', sigma=0.5, p429=0.0, p500=0.0,
+                 timeout_p=0.0, stall_seconds=30.0, seed=0):
+        self.latency_ms = latency_ms
+        self.dist = dist
+        self.sigma = sigma
+        self.p429 = p429
+        self.p500 = p500
+        self.timeout_p = timeout_p
+        self.stall_seconds = stall_seconds
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {'ok': 0, '429': 0, '500': 0, 'stall': 0}
+
+    def delay(self):
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.dist == 'fixed':
+            return self.latency_ms / 1000.0
+        if self.dist == 'exp':
+            return self.rng.expovariate(1000.0 / self.latency_ms)
+        return self.latency_ms / 1000.0 * math.exp(self.rng.gauss(0, self.sigma))
+
+    def handle(self, request):
+        """Return (status_code, payload, headers) after sleeping the injected latency"""
+        with self.lock:
+            roll = self.rng.random()
+            if roll < self.p429:
+                self.counts['429'] += 1
+                return 429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}}, {'Retry-After': '1'}
+            if roll < self.p429 + self.p500:
+                self.counts['500'] += 1
+                return 500, {'error': {'message': 'Internal server error', 'type': 'internal_error'}}, {}
+            stall = roll < self.p429 + self.p500 + self.timeout_p
+            delay = self.stall_seconds if stall else self.delay()
+            self.counts['stall' if stall else 'ok'] += 1
+        time.sleep(delay)
+
+        messages = request.get('messages', [])
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in messages) // 4
+        question = str(messages[-1].get('content', ''))[-80:] if messages else ''
+        answer = f"Fake analysis ({delay * 1000:.0f} ms) for: {question.strip()}"
+        completion_tokens = len(answer) // 4
+        return 200, {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', MODELS[0]),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': answer},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }, {}
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if urlparse(self.path).path.rstrip('/') == '/openai/v1/models':
+                self._send(200, {'object': 'list', 'data': [{'id': m, 'object': 'model'} for m in MODELS]})
+            else:
+                self._send(404, {'error': {'message': 'not found'}})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send(400, {'error': {'message': 'invalid JSON'}})
+                return
+            if urlparse(self.path).path.rstrip('/') != '/openai/v1/chat/completions':
+                self._send(404, {'error': {'message': 'not found'}})
+                return
+            status, payload, headers = fake.handle(request)
+            self._send(status, payload, headers)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(fake, port):
+    server = ThreadingHTTPServer(('0.0.0.0', port), make_handler(fake))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=9002)
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--dist', choices=('fixed', 'exp', 'lognormal'), default='lognormal')
+    parser.add_argument('--sigma', type=float, default=0.5, help='lognormal spread')
+    parser.add_argument('--p429', type=float, default=0.0)
+    parser.add_argument('--p500', type=float, default=0.0)
+    parser.add_argument('--timeout-p', type=float, default=0.0, help='probability of a --stall-seconds stall')
+    parser.add_argument('--stall-seconds', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    fake = FakeGroq(args.latency_ms, args.dist, args.sigma, args.p429, args.p500,
+                    args.timeout_p, args.stall_seconds, args.seed)
+    server = serve(fake, args.port)
+    print(f"🧪 Fake Groq on http://localhost:{args.port} (GROQ_BASE_URL)")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"served: {fake.counts}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"served: {fake.counts}")
+
+
+if __name__ == '__main__':
+    main()
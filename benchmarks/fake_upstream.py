@@ -0,0 +1,185 @@
+"""
+Fake quote upstream that injects 429s and latency
+
+Serves the same API IndianStockConnector expects from STOCK_API_URL:
+    GET /stock?symbol=TCS -> {"status": "success", "data": {"current_price": ..., ...}}
+
+Point the backend at it with QUOTE_SOURCE_URL=http://localhost:9001 (or the
+connector with STOCK_API_URL) to exercise FetchScheduler without yfinance.
+
+Usage:
+    python benchmarks/fake_upstream.py --port 9001 --limit 2 --p429 0.05 --latency-ms 80
+    python benchmarks/fake_upstream.py --drive --seconds 60       # drive the scheduler against it
+
+Failure injection:
+    --limit N          allow N requests/second (sliding 1s window), 429 above that
+    --p429 P           additionally answer 429 with probability P
+    --outage A:B       answer every request with 429 between A and B seconds after start
+    --latency-ms M     mean response latency (exponential), --timeout-p P drops P into a 10s stall
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class FakeUpstream:
+    """Quote generator with injected rate limiting, latency and outages"""
+
+    def __init__(self, limit=None, p429=0.0, latency_ms=0.0, timeout_p=0.0, outage=None, seed=0):
+        self.limit = limit
+        self.p429 = p429
+        self.latency_ms = latency_ms
+        self.timeout_p = timeout_p
+        self.outage = outage
+        self.rng = random.Random(seed)
+        self.started = time.monotonic()
+        self.prices = {}
+        self.window = deque()
+        self.lock = threading.Lock()
+        self.counts = {'ok': 0, '429': 0, 'stall': 0}
+
+    def handle(self, symbol):
+        """Return (status_code, payload) after sleeping the injected latency"""
+        now = time.monotonic()
+        with self.lock:
+            while self.window and now - self.window[0] > 1.0:
+                self.window.popleft()
+            self.window.append(now)
+            elapsed = now - self.started
+            in_outage = self.outage and self.outage[0] <= elapsed < self.outage[1]
+            over_limit = self.limit is not None and len(self.window) > self.limit
+            if in_outage or over_limit or self.rng.random() < self.p429:
+                self.counts['429'] += 1
+                return 429, {'status': 'error', 'message': 'Too Many Requests'}
+            stall = self.rng.random() < self.timeout_p
+            delay = 10.0 if stall else (self.rng.expovariate(1000.0 / self.latency_ms) if self.latency_ms else 0.0)
+            self.counts['stall' if stall else 'ok'] += 1
+
+            base = self.prices.setdefault(symbol, self.rng.uniform(100, 5000))
+            price = base * (1 + self.rng.gauss(0, 0.01))
+            self.prices[symbol] = price
+        time.sleep(delay)
+        return 200, {
+            'status': 'success',
+            'data': {
+                'current_price': round(price, 2),
+                'change': round(price - base, 2),
+                'change_percent': round((price - base) / base * 100, 2),
+                'open': round(base, 2),
+                'high': round(max(price, base) * 1.005, 2),
+                'low': round(min(price, base) * 0.995, 2),
+                'volume': self.rng.randint(10_000, 5_000_000),
+            }
+        }
+
+
+def make_handler(upstream):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/stock':
+                self.send_response(404)
+                self.end_headers()
+                return
+            symbol = parse_qs(url.query).get('symbol', ['UNKNOWN'])[0]
+            status, payload = upstream.handle(symbol)
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if status == 429:
+                self.send_header('Retry-After', '5')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(upstream, port):
+    server = ThreadingHTTPServer(('0.0.0.0', port), make_handler(upstream))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def drive(port, seconds, rate, burst, symbols):
+    """Run FetchScheduler against the fake upstream and print success rates every 5s"""
+    import requests
+    from connectors.fetch_scheduler import FetchScheduler, RateLimited
+
+    def fetch(symbol):
+        response = requests.get(f"http://127.0.0.1:{port}/stock", params={'symbol': symbol}, timeout=2)
+        if response.status_code == 429:
+            raise RateLimited("429 Too Many Requests")
+        response.raise_for_status()
+        return response.json()['data']
+
+    scheduler = FetchScheduler(rate=rate, burst=burst, backoff_base=2.0, backoff_cap=30.0)
+    deadline = time.monotonic() + seconds
+    next_report = time.monotonic() + 5
+    fresh = stale = 0
+    while time.monotonic() < deadline:
+        for i in range(symbols):
+            ok, _ = scheduler.call('upstream', fetch, f"SYM{i:03d}")
+            if ok:
+                fresh += 1
+            else:
+                stale += 1
+                time.sleep(1.0 / rate)
+            if time.monotonic() >= next_report:
+                stats = scheduler.report()
+                print(f"[{seconds - (deadline - time.monotonic()):5.1f}s] fresh {fresh} fallback {stale} | "
+                      f"limited={stats['limited']} | {stats['sources']['upstream']}")
+                next_report += 5
+    print(f"done: {fresh} fresh quotes, {stale} fallbacks ({fresh / max(1, fresh + stale):.0%} fresh)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=9001)
+    parser.add_argument('--limit', type=float, default=None)
+    parser.add_argument('--p429', type=float, default=0.0)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--timeout-p', type=float, default=0.0)
+    parser.add_argument('--outage', default=None, help='start:end seconds of a full 429 outage')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--drive', action='store_true', help='also run FetchScheduler against the server')
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--rate', type=float, default=2.0, help='scheduler token rate (req/s) when driving')
+    parser.add_argument('--burst', type=int, default=4)
+    parser.add_argument('--symbols', type=int, default=46)
+    args = parser.parse_args()
+
+    outage = tuple(float(x) for x in args.outage.split(':')) if args.outage else None
+    upstream = FakeUpstream(args.limit, args.p429, args.latency_ms, args.timeout_p, outage, args.seed)
+    server = serve(upstream, args.port)
+    print(f"🧪 Fake upstream on http://localhost:{args.port}/stock?symbol=TCS")
+
+    try:
+        if args.drive:
+            drive(args.port, args.seconds, args.rate, args.burst, args.symbols)
+        else:
+            while True:
+                time.sleep(10)
+                print(f"served: {upstream.counts}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"served: {upstream.counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Open-loop HTTP load generator / soak harness for the backend
+
+Sends a weighted mix of requests at a fixed target rate, independent of how
+fast the server answers (latency is measured from each request's scheduled
+start, so queueing inside the client counts against the server instead of
+hiding it). Every --interval seconds it prints achieved RPS, latency
+percentiles, error rate and the server's RSS (scraped from /metrics).
+
+Usage:
+    python benchmarks/loadgen.py --url http://localhost:8080 --rps 50 --duration 60
+    python benchmarks/loadgen.py --rps 20 --duration 3600 --interval 60 --output soak.json
+    python benchmarks/loadgen.py --mix stocks=5,query=5 --rps 10
+
+For /query against a controllable LLM, run benchmarks/fake_groq.py and start
+the backend with GROQ_BASE_URL=http://localhost:9002 groqapi=fake.
+"""
+import argparse
+import collections
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+DEFAULT_MIX = 'stocks=30,health=10,gainers=10,losers=10,alerts=10,query=30'
+QUESTIONS = (
+    'top gainers today',
+    'how is the banking sector doing',
+    'price of TCS',
+    'which IT stocks are falling',
+    'give me an overview of the market mood',
+    'compare HDFCBANK and ICICIBANK',
+    'what is driving energy stocks',
+)
+ENDPOINTS = {
+    'stocks': ('GET', '/stocks'),
+    'health': ('GET', '/health'),
+    'gainers': ('GET', '/stocks/top-gainers'),
+    'losers': ('GET', '/stocks/top-losers'),
+    'alerts': ('GET', '/alerts'),
+    'sectors': ('GET', '/sectors'),
+    'analytics': ('GET', '/analytics'),
+    'report': ('GET', '/report/latest'),
+    'query': ('POST', '/query'),
+}
+RSS_PATTERN = re.compile(r'^process_resident_memory_bytes\s+([0-9.e+]+)$', re.MULTILINE)
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    """Per-endpoint latencies and errors, for the current interval and the whole run"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.interval = collections.defaultdict(list)
+        self.total = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.interval_errors = collections.Counter()
+
+    def record(self, name, latency_ms, error=None):
+        with self.lock:
+            self.interval[name].append(latency_ms)
+            self.total[name].append(latency_ms)
+            if error:
+                self.errors[(name, error)] += 1
+                self.interval_errors[error] += 1
+
+    def drain(self):
+        with self.lock:
+            interval, errors = self.interval, self.interval_errors
+            self.interval = collections.defaultdict(list)
+            self.interval_errors = collections.Counter()
+        return interval, errors
+
+
+def summarize(latencies):
+    if not latencies:
+        return {'count': 0}
+    values = np.asarray(latencies)
+    return {
+        'count': int(values.size),
+        'p50_ms': round(float(np.percentile(values, 50)), 1),
+        'p95_ms': round(float(np.percentile(values, 95)), 1),
+        'p99_ms': round(float(np.percentile(values, 99)), 1),
+        'max_ms': round(float(values.max()), 1),
+    }
+
+
+def scrape_rss(session, url):
+    try:
+        text = session.get(f"{url}/metrics", timeout=5).text
+        match = RSS_PATTERN.search(text)
+        return float(match.group(1)) if match else None
+    except requests.RequestException:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8080')
+    parser.add_argument('--rps', type=float, default=20.0, help='target requests per second')
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='endpoint=weight,... (%s)' % ', '.join(ENDPOINTS))
+    parser.add_argument('--concurrency', type=int, default=64, help='max requests in flight')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--interval', type=float, default=10.0, help='report every N seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the timeline and summary as JSON')
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    local = threading.local()
+    in_flight = threading.Semaphore(args.concurrency)
+    stats = {'sent': 0, 'shed': 0}
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def call(name, question, scheduled):
+        method, path = ENDPOINTS[name]
+        error = None
+        try:
+            if method == 'POST':
+                response = session().post(url + path, json={'question': question}, timeout=args.timeout)
+            else:
+                response = session().get(url + path, timeout=args.timeout)
+            if response.status_code >= 400:
+                error = str(response.status_code)
+        except requests.Timeout:
+            error = 'timeout'
+        except requests.RequestException:
+            error = 'connection'
+        finally:
+            in_flight.release()
+        recorder.record(name, (time.perf_counter() - scheduled) * 1000, error)
+
+    # RSS is scraped off the dispatch thread so a slow /metrics can't delay the schedule
+    monitor = requests.Session()
+    server_rss = {'bytes': scrape_rss(monitor, url)}
+    done = threading.Event()
+
+    def watch_rss():
+        while not done.wait(min(args.interval, 5.0)):
+            server_rss['bytes'] = scrape_rss(monitor, url)
+
+    threading.Thread(target=watch_rss, daemon=True).start()
+    timeline = []
+    rss = server_rss['bytes']
+    print(f"🔨 {args.rps:g} req/s for {args.duration:g}s against {url} | mix {args.mix}")
+    print(f"   server RSS at start: {rss / 2**20:.1f} MB" if rss else "   server RSS unavailable (/metrics)")
+
+    started = time.perf_counter()
+    next_report = started + args.interval
+    period = 1.0 / args.rps
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        i = 0
+        while True:
+            scheduled = started + i * period
+            now = time.perf_counter()
+            if scheduled - started >= args.duration:
+                break
+            if scheduled > now:
+                time.sleep(scheduled - now)
+            if in_flight.acquire(blocking=False):
+                name = rng.choices(names, weights)[0]
+                pool.submit(call, name, rng.choice(QUESTIONS), scheduled)
+                stats['sent'] += 1
+            else:
+                # every worker is waiting on the server: count it, don't queue unboundedly
+                stats['shed'] += 1
+                recorder.record('shed', 0.0, 'shed')
+            i += 1
+
+            if time.perf_counter() >= next_report:
+                interval, errors = recorder.drain()
+                latencies = [v for name, values in interval.items() if name != 'shed' for v in values]
+                rss = server_rss['bytes']
+                point = {
+                    't': round(time.perf_counter() - started, 1),
+                    'rps': round(len(latencies) / args.interval, 1),
+                    **summarize(latencies),
+                    'errors': dict(errors),
+                    'rss_mb': round(rss / 2**20, 1) if rss else None,
+                }
+                timeline.append(point)
+                error_rate = sum(errors.values()) / max(1, len(latencies) + errors.get('shed', 0))
+                print(f"[{point['t']:7.1f}s] {point['rps']:6.1f} req/s | p50 {point.get('p50_ms', 0):7.1f} "
+                      f"p95 {point.get('p95_ms', 0):7.1f} p99 {point.get('p99_ms', 0):7.1f} ms | "
+                      f"errors {error_rate:5.1%} | RSS {point['rss_mb']} MB")
+                next_report += args.interval
+
+    elapsed = time.perf_counter() - started
+    done.set()
+    summary = {name: summarize(values) for name, values in recorder.total.items() if name != 'shed'}
+    completed = sum(s['count'] for s in summary.values())
+    errors = {f"{name}:{kind}": n for (name, kind), n in recorder.errors.items()}
+    error_total = sum(n for (name, kind), n in recorder.errors.items() if name != 'shed')
+    print(f"\n{'endpoint':10s} {'count':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}")
+    for name, s in sorted(summary.items()):
+        print(f"{name:10s} {s['count']:7d} {s['p50_ms']:8.1f} {s['p95_ms']:8.1f} {s['p99_ms']:8.1f} {s['max_ms']:8.1f}")
+    print(f"\n{completed} requests in {elapsed:.1f}s ({completed / elapsed:.1f} req/s) | "
+          f"errors {error_total} ({error_total / max(1, completed):.1%}) | shed {stats['shed']} (client at --concurrency)")
+    if errors:
+        print(f"errors by endpoint: {errors}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'config': vars(args),
+                'summary': summary,
+                'errors': errors,
+                'sent': stats['sent'],
+                'shed': stats['shed'],
+                'elapsed_s': round(elapsed, 1),
+                'timeline': timeline,
+            }, f, indent=2)
+        print(f"📄 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import threading
+
+QUOTE_FIELDS = ('price', 'change_percent', 'volume', 'high', 'low')
+
+
+class ChangeDetector:
+    """
+    Per-symbol change detection for incoming ticks
+
+    A tick is a duplicate of the last one kept for its symbol when every quote
+    field is within tolerance: price/high/low/change% within `price_tolerance`
+    (relative, 0 = identical to the paisa) and volume within `volume_tolerance`
+    (relative). Duplicates are conflated by the caller - the existing record
+    keeps its values and only its timestamp moves forward.
+
+    Counters cover the current cycle; end_cycle() returns and resets them.
+    """
+
+    def __init__(self, price_tolerance=0.0, volume_tolerance=0.0, fields=QUOTE_FIELDS):
+        self.price_tolerance = price_tolerance
+        self.volume_tolerance = volume_tolerance
+        self.fields = fields
+        self._last = {}
+        self._lock = threading.Lock()
+        self._cycle = {'ticks': 0, 'conflated': 0}
+        self.totals = {'ticks': 0, 'conflated': 0}
+
+    def _within(self, field, new, old):
+        new = float(new or 0)
+        old = float(old or 0)
+        if field == 'volume':
+            return abs(new - old) <= self.volume_tolerance * abs(old)
+        if field == 'change_percent':
+            # already relative; the tolerance is applied in percentage points
+            return abs(new - old) <= max(self.price_tolerance * 100, 0.005)
+        # half a paisa absorbs float noise in quotes rounded to 2 decimals
+        return abs(new - old) <= max(self.price_tolerance * abs(old), 0.005)
+
+    def is_duplicate(self, symbol, tick):
+        """True if `tick` matches the last kept tick for `symbol`; otherwise it becomes the new reference"""
+        with self._lock:
+            self._cycle['ticks'] += 1
+            self.totals['ticks'] += 1
+            last = self._last.get(symbol)
+            if last is not None and all(self._within(f, tick.get(f), last.get(f)) for f in self.fields):
+                self._cycle['conflated'] += 1
+                self.totals['conflated'] += 1
+                return True
+            self._last[symbol] = {f: tick.get(f) for f in self.fields}
+            return False
+
+    def forget(self, symbol):
+        with self._lock:
+            self._last.pop(symbol, None)
+
+    def end_cycle(self):
+        with self._lock:
+            cycle = dict(self._cycle)
+            self._cycle = {'ticks': 0, 'conflated': 0}
+        return cycle
+
+    def report(self):
+        with self._lock:
+            ticks = self.totals['ticks']
+            return dict(self.totals, conflated_ratio=round(self.totals['conflated'] / ticks, 3) if ticks else 0.0)
@@ -0,0 +1,214 @@
+import random
+import threading
+import time
+
+
+class RateLimited(Exception):
+    """Upstream said 429 / Too Many Requests"""
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, bursts up to `capacity`
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1.0):
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1.0, timeout=None):
+        """Block until `tokens` are available; returns False on timeout"""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None and self.clock() + wait > deadline:
+                return False
+            self.sleep(wait)
+
+
+class Backoff:
+    """Exponential backoff with jitter: uniform(c/2, c) where c = min(cap, base * 2^attempt)"""
+
+    def __init__(self, base=5.0, cap=600.0, rng=None):
+        self.base = base
+        self.cap = cap
+        self.attempt = 0
+        self.rng = rng or random.Random()
+
+    def next_delay(self):
+        ceiling = min(self.cap, self.base * (2 ** self.attempt))
+        self.attempt += 1
+        return self.rng.uniform(ceiling / 2, ceiling)
+
+    def reset(self):
+        self.attempt = 0
+
+
+class SourceStats:
+    """Per-source outcome counters"""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.latency_total = 0.0
+
+    @property
+    def success_rate(self):
+        return self.successes / self.attempts if self.attempts else 0.0
+
+    def as_dict(self):
+        return {
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'errors': self.errors,
+            'rate_limited': self.rate_limited,
+            'timeouts': self.timeouts,
+            'skipped': self.skipped,
+            'success_rate': round(self.success_rate, 3),
+            'avg_latency_ms': round(self.latency_total / self.successes * 1000, 1) if self.successes else None,
+        }
+
+
+def is_rate_limit_error(error):
+    text = str(error).lower()
+    return isinstance(error, RateLimited) or '429' in text or 'too many requests' in text or 'rate limit' in text
+
+
+def is_timeout_error(error):
+    text = str(error).lower()
+    return isinstance(error, TimeoutError) or 'timed out' in text or 'timeout' in text
+
+
+class FetchScheduler:
+    """
+    Rate-limit-aware gate in front of an upstream quote source
+
+    - every call waits for a token from the bucket (sized to the upstream limit)
+    - a 429 or timeout opens a backoff window (exponential, jittered); while it
+      is open calls are skipped so the caller serves its fallback instead
+    - when the window expires exactly one probe request is let through; success
+      closes the window, failure doubles it
+    - the token rate adapts AIMD-style: halved on every 429, then creeping back
+      up to the configured `rate` by 5% of it per success
+    - stats are kept per source name and only touched under the scheduler lock,
+      since fetch workers share them
+    """
+
+    def __init__(self, rate=1.0, burst=5, backoff_base=5.0, backoff_cap=600.0,
+                 min_rate=None, clock=time.monotonic, sleep=time.sleep, rng=None):
+        self.clock = clock
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate or rate / 16)
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.backoff = Backoff(backoff_base, backoff_cap, rng)
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._probing = False
+
+    @property
+    def limited(self):
+        return self.backoff.attempt > 0
+
+    def source(self, name):
+        with self._lock:
+            return self.stats.setdefault(name, SourceStats())
+
+    def allow(self):
+        """True if a request may be sent now (claims the probe slot when recovering)"""
+        with self._lock:
+            if not self.limited:
+                return True
+            if self._probing or self.clock() < self._blocked_until:
+                return False
+            self._probing = True
+            return True
+
+    def call(self, source, fn, *args, **kwargs):
+        """
+        Run fn(*args) through the scheduler.
+        Returns (ok, result_or_error); ok is None when the call was skipped.
+        """
+        stats = self.source(source)
+        if not self.allow():
+            with self._lock:
+                stats.skipped += 1
+            return None, None
+
+        self.bucket.acquire()
+        with self._lock:
+            stats.attempts += 1
+        started = self.clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._on_failure(stats, e)
+            return False, e
+        self._on_success(stats, self.clock() - started)
+        return True, result
+
+    def _on_success(self, stats, latency):
+        with self._lock:
+            stats.successes += 1
+            stats.latency_total += latency
+            if self.limited:
+                print(f"✅ Upstream recovered from rate limiting ({self.bucket.rate:.2f} req/s)")
+            self.backoff.reset()
+            self._probing = False
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate * 0.05)
+
+    def _on_failure(self, stats, error):
+        rate_limited = is_rate_limit_error(error)
+        timeout = not rate_limited and is_timeout_error(error)
+        with self._lock:
+            if rate_limited:
+                stats.rate_limited += 1
+            elif timeout:
+                stats.timeouts += 1
+            else:
+                stats.errors += 1
+            was_probe = self._probing
+            self._probing = False
+            if rate_limited:
+                self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+            if rate_limited or timeout or was_probe:
+                delay = self.backoff.next_delay()
+                self._blocked_until = self.clock() + delay
+                print(f"⏳ Upstream {'rate limited' if rate_limited else 'unhealthy'}, "
+                      f"backing off {delay:.0f}s (attempt {self.backoff.attempt})")
+
+    def report(self):
+        with self._lock:
+            return {
+                'limited': self.limited,
+                'rate': round(self.bucket.rate, 3),
+                'retry_in_s': max(0.0, round(self._blocked_until - self.clock(), 1)) if self.limited else 0.0,
+                'sources': {name: s.as_dict() for name, s in self.stats.items()},
+            }
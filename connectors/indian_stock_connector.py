@@ -4,6 +4,13 @@ import time
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from connectors.change_detector import ChangeDetector
+from connectors.market_calendar import MarketCalendar
+from connectors.replay import TickReplayer
+from connectors.simulator import MarketSimulator
+from connectors.tick_bus import bus_from_env
+from connectors.universe import Universe
+from observability import instruments
 
 load_dotenv()
 
@@ -13,17 +20,34 @@ class IndianStockConnector(pw.io.python.ConnectorSubject):
     Streams NSE/BSE data continuously
     """
     
-    def __init__(self, symbols, interval=60):
+    def __init__(self, symbols, interval=60, calendar=None, heartbeat=1800, detector=None, bus=None, universe=None):
         super().__init__()
         self.symbols = symbols
         self.interval = interval
         self.base_url = os.getenv('STOCK_API_URL')
+        self.calendar = calendar or MarketCalendar.from_env()
+        self.heartbeat = heartbeat
+        self.bus = bus
+        self.universe = universe
+        self.detector = detector or ChangeDetector(
+            price_tolerance=float(os.getenv('CONFLATE_PRICE_TOL', 0.0)),
+            volume_tolerance=float(os.getenv('CONFLATE_VOLUME_TOL', 0.01))
+        )
         
     def run(self):
         print(f"🚀 Starting stock stream for: {', '.join(self.symbols)}")
+        last_fetch = None
         
         while True:
+            # Outside NSE hours emit one closing snapshot, then stay idle
+            if not self.calendar.should_fetch(last_fetch):
+                time.sleep(self.calendar.sleep_seconds(self.interval, self.heartbeat))
+                continue
+            last_fetch = datetime.now(self.calendar.tz)
+            
             for symbol in self.symbols:
+                started = time.perf_counter()
+                outcome = 'error'
                 try:
                     # Fetch real-time data
                     response = requests.get(
@@ -35,34 +59,83 @@ class IndianStockConnector(pw.io.python.ConnectorSubject):
                         data = response.json()
                         
                         if data.get('status') == 'success':
-                            stock_data = data['data']
-                            
-                            # Create rich text for RAG
-                            text_content = self._create_rich_text(symbol, stock_data)
-                            
-                            # Emit to Pathway pipeline
-                            self.next(
-                                symbol=symbol,
-                                price=float(stock_data.get('current_price', 0)),
-                                change=float(stock_data.get('change', 0)),
-                                change_percent=float(stock_data.get('change_percent', 0)),
-                                open=float(stock_data.get('open', 0)),
-                                high=float(stock_data.get('high', 0)),
-                                low=float(stock_data.get('low', 0)),
-                                volume=int(stock_data.get('volume', 0)),
-                                timestamp=datetime.now().isoformat(),
-                                text=text_content
-                            )
-                            
-                            print(f"✅ {symbol}: ₹{stock_data.get('current_price')} ({stock_data.get('change_percent')}%)")
+                            outcome = 'http'
+                            if self._emit(symbol, data['data']):
+                                print(f"✅ {symbol}: ₹{data['data'].get('current_price')} ({data['data'].get('change_percent')}%)")
                         
                 except Exception as e:
                     print(f"❌ Error fetching {symbol}: {e}")
+                finally:
+                    instruments.record_fetch(symbol, outcome, time.perf_counter() - started)
+            
+            cycle = self.detector.end_cycle()
+            if cycle['conflated']:
+                print(f"♻️  {cycle['conflated']}/{cycle['ticks']} unchanged quotes skipped")
                     
-            time.sleep(self.interval)
+            time.sleep(self.calendar.sleep_seconds(self.interval, self.heartbeat))
+    
+    def _emit(self, symbol, stock_data):
+        """Conflate, then emit one quote (STOCK_API_URL `data` shape); False if unchanged"""
+        tick = {
+            'price': stock_data.get('current_price'),
+            'change_percent': stock_data.get('change_percent'),
+            'volume': stock_data.get('volume'),
+            'high': stock_data.get('high'),
+            'low': stock_data.get('low'),
+        }
+        
+        # Unchanged quote: nothing new to emit or embed
+        if self.detector.is_duplicate(symbol, tick):
+            return False
+        
+        # Create rich text for RAG
+        text_content = self._create_rich_text(symbol, stock_data)
+        
+        # Emit to Pathway pipeline
+        self.next(
+            symbol=symbol,
+            price=float(stock_data.get('current_price', 0)),
+            change=float(stock_data.get('change', 0)),
+            change_percent=float(stock_data.get('change_percent', 0)),
+            open=float(stock_data.get('open', 0)),
+            high=float(stock_data.get('high', 0)),
+            low=float(stock_data.get('low', 0)),
+            volume=int(stock_data.get('volume', 0)),
+            timestamp=datetime.now().isoformat(),
+            text=text_content
+        )
+        
+        if self.bus is not None:
+            self.bus.publish(self._bus_tick(symbol, stock_data))
+        return True
+    
+    def _bus_tick(self, symbol, data):
+        """Tick in the backend's schema, for serving nodes subscribed to the tick bus"""
+        instrument = self.universe.by_symbol.get(symbol) if self.universe else None
+        name = instrument.name if instrument else symbol
+        price = float(data.get('current_price', 0))
+        change_percent = float(data.get('change_percent', 0))
+        return {
+            'symbol': symbol,
+            'name': name,
+            'sector': instrument.sector if instrument else 'Unknown',
+            'price': round(price, 2),
+            'change': round(float(data.get('change', 0)), 2),
+            'change_percent': round(change_percent, 2),
+            'high': round(float(data.get('high', 0)), 2),
+            'low': round(float(data.get('low', 0)), 2),
+            'volume': int(data.get('volume', 0)),
+            'timestamp': datetime.now().isoformat(),
+            'text': f"{symbol}.NS {name} at ₹{price:.2f} ({change_percent:+.2f}%)",
+            'source': 'stock_api'
+        }
     
     def _create_rich_text(self, symbol, data):
-        """Create detailed text for RAG context"""
+        """
+        Create detailed text for RAG context
+        The fetch time lives in the timestamp column, not the text, so an
+        unchanged quote renders identically and its embedding comes from cache
+        """
         return f"""
 Stock: {symbol}
 Current Price: ₹{data.get('current_price', 'N/A')}
@@ -70,31 +143,101 @@ Change: {data.get('change', 'N/A')} ({data.get('change_percent', 'N/A')}%)
 Day Range: ₹{data.get('low', 'N/A')} - ₹{data.get('high', 'N/A')}
 Open: ₹{data.get('open', 'N/A')}
 Volume: {data.get('volume', 'N/A')}
-Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """.strip()
 
 
+class ReplayStockConnector(IndianStockConnector):
+    """
+    Replays a recording (connectors.replay) instead of polling STOCK_API_URL
+    Ticks take the live path from conflation onwards, stamped with replay time
+    """
+    
+    def __init__(self, replayer, **kwargs):
+        super().__init__(**kwargs)
+        self.replayer = replayer
+    
+    def run(self):
+        print(f"⏯️  Replaying {self.replayer.path} at {self.replayer.speed_label}")
+        for record in self.replayer:
+            symbol = str(record['symbol']).replace('.NS', '')
+            price = float(record['price'])
+            change = float(record.get('change') or 0)
+            self._emit(symbol, {
+                'current_price': price,
+                'change': change,
+                'change_percent': record.get('change_percent', 0),
+                'open': record.get('open') or price - change,
+                'high': record.get('high') or price,
+                'low': record.get('low') or price,
+                'volume': record.get('volume') or 0,
+            })
+        stats = self.replayer.stats()
+        print(f"⏹️  Replay done: {stats['replayed']} ticks in {stats['elapsed_s']}s ({stats['ticks_per_s']} ticks/s)")
+
+
+class SimStockConnector(IndianStockConnector):
+    """
+    Streams the synthetic market (connectors.simulator) instead of polling
+    Every symbol ticks once per step, SIM_HZ steps a second
+    """
+    
+    def __init__(self, simulator, hz=1.0, **kwargs):
+        if not hz > 0:
+            raise ValueError(f"SIM_HZ must be > 0 (steps per second), got {hz}")
+        super().__init__(**kwargs)
+        self.simulator = simulator
+        self.hz = hz
+    
+    def run(self):
+        print(f"🎲 Simulating {len(self.simulator)} symbols at {self.hz:g} steps/s")
+        suffix = self.universe.suffix
+        period = 1.0 / self.hz
+        due = time.perf_counter()
+        while True:
+            self.simulator.step()
+            for ticker, quote in self.simulator.quotes():
+                price, prev_close = quote['price'], quote['prev_close']
+                change = price - prev_close
+                self._emit(ticker.replace(suffix, ''), {
+                    'current_price': round(price, 2),
+                    'change': round(change, 2),
+                    'change_percent': round(change / prev_close * 100, 2),
+                    'open': round(prev_close, 2),
+                    'high': round(quote['high'], 2),
+                    'low': round(quote['low'], 2),
+                    'volume': quote['volume'],
+                })
+            due += period
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            else:
+                due -= wait
+
+
 def create_stock_stream():
-    """Initialize stock streaming table"""
+    """Initialize stock streaming table (TICK_REPLAY replays a recording, QUOTE_SOURCE=sim simulates)"""
     
-    # Top Indian stocks to monitor
-    stocks = [
-        'RELIANCE',    # Reliance Industries
-        'TCS',         # Tata Consultancy Services
-        'HDFCBANK',    # HDFC Bank
-        'INFY',        # Infosys
-        'ICICIBANK',   # ICICI Bank
-        'HINDUNILVR',  # Hindustan Unilever
-        'BHARTIARTL',  # Bharti Airtel
-        'ITC',         # ITC Limited
-        'SBIN',        # State Bank of India
-        'LT'           # Larsen & Toubro
-    ]
+    # Same universe as the backend (config/universe.csv or UNIVERSE_FILE)
+    universe = Universe.from_env()
+    stocks = universe.symbols
     
-    connector = IndianStockConnector(
+    options = dict(
         symbols=stocks,
-        interval=int(os.getenv('UPDATE_INTERVAL', 60))
+        interval=int(os.getenv('UPDATE_INTERVAL', 60)),
+        heartbeat=int(os.getenv('MARKET_HEARTBEAT', 1800)),
+        # With TICK_BUS set, ticks are also published for the Flask serving tier
+        bus=bus_from_env() if os.getenv('TICK_BUS') else None,
+        universe=universe
     )
+    replayer = TickReplayer.from_env()
+    if replayer:
+        connector = ReplayStockConnector(replayer, **options)
+    elif os.getenv('QUOTE_SOURCE') == 'sim':
+        connector = SimStockConnector(MarketSimulator.from_env(universe),
+                                      hz=float(os.getenv('SIM_HZ', 1)), **options)
+    else:
+        connector = IndianStockConnector(**options)
     
     # Create Pathway streaming table
     stock_table = pw.io.python.read(
@@ -0,0 +1,136 @@
+import os
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+# India has no DST, so a fixed offset is exact
+IST = timezone(timedelta(hours=5, minutes=30), 'IST')
+
+PRE_OPEN = 'pre_open'
+OPEN = 'open'
+CLOSED = 'closed'
+
+
+def parse_holidays(spec):
+    """Parse 'YYYY-MM-DD' dates separated by commas, whitespace or newlines ('#' starts a comment)"""
+    holidays = set()
+    for line in (spec or '').splitlines():
+        line = line.split('#', 1)[0]
+        for token in line.replace(',', ' ').split():
+            holidays.add(date.fromisoformat(token))
+    return holidays
+
+
+def load_holidays(path=None, spec=None):
+    """Holidays from a file (one date per line) and/or an inline spec"""
+    holidays = parse_holidays(spec)
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            holidays |= parse_holidays(f.read())
+    return holidays
+
+
+class MarketCalendar:
+    """
+    NSE trading session calendar (IST)
+
+    - pre-open 09:00-09:15, regular session 09:15-15:30, Monday to Friday
+    - exchange holidays are configured, not built in (the list changes every year)
+    - fetch loops call sleep_seconds() to run at their normal interval during the
+      session and to sleep until the next pre-open, or wake on a slow heartbeat,
+      while the market is closed
+    """
+
+    def __init__(self, holidays=(), pre_open=dtime(9, 0), open_time=dtime(9, 15),
+                 close_time=dtime(15, 30), tz=IST, clock=None):
+        self.holidays = set(holidays)
+        self.pre_open = pre_open
+        self.open_time = open_time
+        self.close_time = close_time
+        self.tz = tz
+        self.clock = clock or (lambda: datetime.now(tz))
+
+    @classmethod
+    def from_env(cls):
+        """NSE_HOLIDAYS='2025-10-21,2025-11-05' and/or NSE_HOLIDAYS_FILE=path"""
+        return cls(holidays=load_holidays(os.getenv('NSE_HOLIDAYS_FILE'), os.getenv('NSE_HOLIDAYS')))
+
+    def _local(self, now):
+        now = now or self.clock()
+        if now.tzinfo is None:
+            return now.replace(tzinfo=self.tz)
+        return now.astimezone(self.tz)
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, now=None):
+        """'pre_open', 'open' or 'closed'"""
+        now = self._local(now)
+        if not self.is_trading_day(now.date()):
+            return CLOSED
+        t = now.time()
+        if self.pre_open <= t < self.open_time:
+            return PRE_OPEN
+        if self.open_time <= t < self.close_time:
+            return OPEN
+        return CLOSED
+
+    def is_open(self, now=None):
+        return self.session(now) != CLOSED
+
+    def next_session(self, now=None):
+        """Start (pre-open) of the next session, or now if one is in progress"""
+        now = self._local(now)
+        if self.is_open(now):
+            return now
+        day = now.date()
+        if now.time() >= self.pre_open:
+            day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return datetime.combine(day, self.pre_open, tzinfo=self.tz)
+
+    def last_close(self, now=None):
+        """End of the most recent completed session"""
+        now = self._local(now)
+        day = now.date()
+        if now.time() < self.close_time:
+            day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return datetime.combine(day, self.close_time, tzinfo=self.tz)
+
+    def should_fetch(self, last_fetch=None, now=None):
+        """
+        True during a session; while closed, only until one snapshot has been
+        taken after the last close (so after-hours quotes aren't re-fetched
+        and re-embedded all night)
+        """
+        now = self._local(now)
+        if self.is_open(now) or last_fetch is None:
+            return True
+        return self._local(last_fetch) < self.last_close(now)
+
+    def sleep_seconds(self, interval, heartbeat=None, now=None):
+        """
+        How long a fetch loop should sleep
+        `interval` during a session; otherwise until the next pre-open, capped
+        at `heartbeat` seconds if given (so the loop still wakes up periodically).
+        """
+        now = self._local(now)
+        if self.is_open(now):
+            return interval
+        until_open = (self.next_session(now) - now).total_seconds()
+        if heartbeat:
+            until_open = min(heartbeat, until_open)
+        return max(1.0, until_open)
+
+    def status(self, now=None):
+        now = self._local(now)
+        session = self.session(now)
+        return {
+            'session': session,
+            'now': now.isoformat(timespec='seconds'),
+            'next_session': None if session != CLOSED else self.next_session(now).isoformat(timespec='seconds'),
+            'last_close': self.last_close(now).isoformat(timespec='seconds'),
+            'holidays_configured': len(self.holidays),
+        }
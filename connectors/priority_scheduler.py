@@ -0,0 +1,192 @@
+import math
+import threading
+import time
+
+
+class SymbolState:
+    """Refresh bookkeeping for one symbol"""
+
+    __slots__ = ('last_fetch', 'change_percent', 'interest', 'interest_at', 'fetches')
+
+    def __init__(self):
+        self.last_fetch = None
+        self.change_percent = 0.0
+        self.interest = 0.0
+        self.interest_at = 0.0
+        self.fetches = 0
+
+
+class PriorityPoller:
+    """
+    Per-symbol refresh cadence under a global request budget
+
+    Each symbol gets a target interval derived from
+    - volatility: |change%| at or above `alert_threshold` refreshes 4x as often
+    - watchlist membership: 2x as often
+    - query interest: every /query that cites a symbol adds a hit (decaying with
+      `interest_half_life`); up to 2 extra refreshes per base interval
+    - flat, uninteresting symbols (|change%| < `cold_threshold`) stretch to
+      `base_interval * cold_factor`
+
+    next_batch() is called once per polling round and returns the most overdue
+    symbols (staleness / target interval) that fit the budget of
+    `budget_per_minute` requests. Symbols never fetched are always included.
+    A symbol's clock restarts when it is picked, so a batch still queued (or
+    failing) is not picked again, and charged again, before its interval.
+    """
+
+    def __init__(self, symbols, base_interval=60.0, budget_per_minute=None, round_seconds=10.0,
+                 min_interval=15.0, alert_threshold=3.0, cold_threshold=0.5, cold_factor=3.0,
+                 interest_half_life=900.0, watchlist=(), clock=time.monotonic):
+        self.base_interval = float(base_interval)
+        self.budget_per_minute = float(budget_per_minute or len(symbols))
+        self.round_seconds = float(round_seconds)
+        self.min_interval = float(min_interval)
+        self.alert_threshold = alert_threshold
+        self.cold_threshold = cold_threshold
+        self.cold_factor = cold_factor
+        self.interest_half_life = interest_half_life
+        self.clock = clock
+        self.symbols = {symbol: SymbolState() for symbol in symbols}
+        self.watchlist = {s for s in watchlist if s in self.symbols}
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def per_round(self):
+        return self.budget_per_minute * self.round_seconds / 60.0
+
+    def set_watchlist(self, symbols):
+        with self._lock:
+            self.watchlist = {s for s in symbols if s in self.symbols}
+
+    def touch(self, symbols, weight=1.0):
+        """Record query interest in `symbols` (e.g. /query sources)"""
+        now = self.clock()
+        with self._lock:
+            for symbol in set(symbols):
+                state = self.symbols.get(symbol)
+                if state is not None:
+                    state.interest = self._decayed(state, now) + weight
+                    state.interest_at = now
+
+    def observe(self, symbol, change_percent):
+        """Record a completed fetch of `symbol` (its clock restarts from completion)"""
+        with self._lock:
+            state = self.symbols.get(symbol)
+            if state is None:
+                return
+            state.last_fetch = self.clock()
+            state.change_percent = float(change_percent or 0.0)
+            state.fetches += 1
+
+    def _decayed(self, state, now):
+        if not state.interest:
+            return 0.0
+        return state.interest * 0.5 ** ((now - state.interest_at) / self.interest_half_life)
+
+    def interval(self, symbol, now=None):
+        """Target refresh interval (seconds) for a symbol"""
+        state = self.symbols[symbol]
+        now = self.clock() if now is None else now
+        moving = abs(state.change_percent)
+        boost = 0.0
+        if moving >= self.alert_threshold:
+            boost += 3.0
+        if symbol in self.watchlist:
+            boost += 1.0
+        boost += min(2.0, self._decayed(state, now))
+        if boost == 0 and moving < self.cold_threshold:
+            return self.base_interval * self.cold_factor
+        return max(self.min_interval, self.base_interval / (1.0 + boost))
+
+    def next_batch(self):
+        """Symbols to fetch this round, most overdue first"""
+        now = self.clock()
+        with self._lock:
+            self._credit = min(self._credit + self.per_round, 2 * self.per_round)
+            fresh, due = [], []
+            for symbol, state in self.symbols.items():
+                if state.last_fetch is None:
+                    fresh.append(symbol)
+                    continue
+                overdue = (now - state.last_fetch) / self.interval(symbol, now)
+                if overdue >= 1.0:
+                    due.append((overdue, symbol))
+            due.sort(reverse=True)
+            take = int(math.floor(self._credit))
+            batch = fresh + [symbol for _, symbol in due[:take]]
+            self._credit -= min(take, len(due))
+            for symbol in batch:
+                self.symbols[symbol].last_fetch = now
+            return batch
+
+    def report(self):
+        now = self.clock()
+        with self._lock:
+            intervals = {symbol: self.interval(symbol, now) for symbol in self.symbols}
+            hot = sorted((s for s, i in intervals.items() if i < self.base_interval), key=intervals.get)
+            cold = sum(1 for i in intervals.values() if i > self.base_interval)
+            return {
+                'budget_per_minute': self.budget_per_minute,
+                'round_seconds': self.round_seconds,
+                'hot': [{'symbol': s, 'interval_s': round(intervals[s], 1)} for s in hot],
+                'cold': cold,
+                'watchlist': sorted(self.watchlist),
+                'demand_per_minute': round(sum(60.0 / i for i in intervals.values()), 1),
+            }
+
+
+class PollerGroup:
+    """
+    One PriorityPoller per fetch shard
+
+    Shard i uses base interval `intervals[i]` (the last one repeats). The
+    global budget is split in proportion to each shard's baseline demand
+    (symbols / interval), so slower shards don't starve faster ones.
+    Query interest and watchlist updates are routed to the owning shard.
+    """
+
+    def __init__(self, shards, intervals=(60.0,), budget_per_minute=None, **kwargs):
+        shards = [list(symbols) for symbols in shards if symbols]
+        intervals = [float(intervals[min(i, len(intervals) - 1)]) for i in range(len(shards))]
+        demand = [len(symbols) * 60.0 / interval for symbols, interval in zip(shards, intervals)]
+        budget = float(budget_per_minute or sum(len(symbols) for symbols in shards))
+        self.budget_per_minute = budget
+        self.shards = [
+            PriorityPoller(symbols, base_interval=interval,
+                           budget_per_minute=budget * share / sum(demand), **kwargs)
+            for symbols, interval, share in zip(shards, intervals, demand)
+        ]
+        self._owner = {symbol: poller for poller in self.shards for symbol in poller.symbols}
+
+    @property
+    def watchlist(self):
+        return set().union(*(poller.watchlist for poller in self.shards))
+
+    def set_watchlist(self, symbols):
+        symbols = list(symbols)
+        for poller in self.shards:
+            poller.set_watchlist(symbols)
+
+    def touch(self, symbols, weight=1.0):
+        symbols = list(symbols)
+        for poller in self.shards:
+            poller.touch(symbols, weight)
+
+    def observe(self, symbol, change_percent):
+        poller = self._owner.get(symbol)
+        if poller is not None:
+            poller.observe(symbol, change_percent)
+
+    def report(self):
+        shards = []
+        for i, poller in enumerate(self.shards):
+            report = poller.report()
+            report.pop('watchlist')
+            shards.append(dict(report, shard=i, symbols=len(poller.symbols), base_interval_s=poller.base_interval))
+        return {
+            'budget_per_minute': self.budget_per_minute,
+            'watchlist': sorted(self.watchlist),
+            'shards': shards,
+        }
@@ -0,0 +1,159 @@
+"""
+Record ticks to jsonlines and replay them through the live ingest path
+
+Replay reads either format we write:
+- the pipeline's output/stock_data.jsonl (Pathway rows; retractions with
+  diff == -1 are skipped, embeddings are ignored)
+- the backend's TICK_RECORD file (ticks as published on the tick bus)
+
+Ticks are emitted in file order, spaced by their recorded timestamps divided
+by `speed` (1 = real time, 10 = ten times faster, 0 = as fast as the consumer
+takes them). The market calendar is not consulted.
+
+    TICK_REPLAY=recorded.jsonl REPLAY_SPEED=max python backend_server.py
+    TICK_REPLAY=output/stock_data.jsonl python pipeline/groq_pathway_rag.py
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Pathway bookkeeping columns and fields replay never forwards
+SKIP_FIELDS = ('time', 'diff', 'embedding')
+
+
+def parse_speed(value):
+    """'1', '10', '10x' or 'max' -> float (0 = unthrottled)"""
+    value = str(value or '1').strip().lower()
+    if value in ('max', 'inf', '0'):
+        return 0.0
+    return float(value[:-1] if value.endswith('x') else value)
+
+
+def read_ticks(path):
+    """Yield recorded ticks (dicts) in file order"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('diff', 1) < 0 or not record.get('symbol'):
+                continue
+            yield {k: v for k, v in record.items() if k not in SKIP_FIELDS}
+
+
+def _epoch(timestamp):
+    try:
+        return datetime.fromisoformat(str(timestamp)).timestamp()
+    except ValueError:
+        return None
+
+
+class TickReplayer:
+    """
+    Paced iteration over a recording
+
+    Pacing follows the recorded timestamps: a tick recorded 30 s after the
+    previous one is emitted 30/speed s later. Gaps longer than `max_gap`
+    (market closed, recorder restarted) are cut to `max_gap` before scaling.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, max_gap=60.0, clock=time.monotonic, sleep=time.sleep):
+        self.path = path
+        self.speed = float(speed)
+        self.loop = loop
+        self.max_gap = max_gap
+        self.clock = clock
+        self.sleep = sleep
+        self.replayed = 0
+        self.passes = 0
+        self.started = None
+        self.finished = None
+
+    @classmethod
+    def from_env(cls):
+        """TICK_REPLAY (path), REPLAY_SPEED (1, 10, max), REPLAY_LOOP=1; None without TICK_REPLAY"""
+        path = os.getenv('TICK_REPLAY')
+        if not path:
+            return None
+        return cls(path, speed=parse_speed(os.getenv('REPLAY_SPEED', '1')),
+                   loop=os.getenv('REPLAY_LOOP', '0') == '1')
+
+    def __iter__(self):
+        self.started = self.clock()
+        while True:
+            previous = None
+            due = self.clock()
+            for tick in read_ticks(self.path):
+                recorded = _epoch(tick.get('timestamp'))
+                if self.speed and recorded is not None and previous is not None:
+                    gap = min(max(recorded - previous, 0.0), self.max_gap)
+                    due += gap / self.speed
+                    wait = due - self.clock()
+                    if wait > 0:
+                        self.sleep(wait)
+                if recorded is not None:
+                    previous = recorded
+                self.replayed += 1
+                yield tick
+            self.passes += 1
+            if not self.loop:
+                break
+        self.finished = self.clock()
+
+    @property
+    def speed_label(self):
+        return f"{self.speed:g}x" if self.speed else 'max speed'
+
+    def run(self, emit):
+        """Feed every tick to emit(tick); returns the stats"""
+        for tick in self:
+            emit(tick)
+        return self.stats()
+
+    def stats(self):
+        end = self.finished if self.finished is not None else self.clock()
+        elapsed = (end - self.started) if self.started is not None else 0.0
+        return {
+            'file': self.path,
+            'speed': self.speed or 'max',
+            'replayed': self.replayed,
+            'passes': self.passes,
+            'elapsed_s': round(elapsed, 2),
+            'ticks_per_s': round(self.replayed / elapsed, 1) if elapsed else None,
+            'done': self.finished is not None,
+        }
+
+
+class TickRecorder:
+    """Append ticks as jsonlines (thread-safe, flushed per tick)"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    @classmethod
+    def from_env(cls):
+        """TICK_RECORD (path); None when unset"""
+        path = os.getenv('TICK_RECORD')
+        return cls(path) if path else None
+
+    def write(self, tick):
+        line = json.dumps(tick, separators=(',', ':'), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
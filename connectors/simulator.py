@@ -0,0 +1,199 @@
+"""
+Vectorised synthetic market: correlated GBM per sector
+
+Every symbol follows geometric Brownian motion whose shocks mix a market
+factor, a factor for its sector and its own noise:
+
+    z = sqrt(w_m) * market + sqrt(w_s) * sector + sqrt(1 - w_m - w_s) * own
+
+so names in one sector move together and the whole tape shares a beta.
+Prices start from the universe's fallback prices (as the previous close) with
+a small opening gap. High/low track the simulated path and volume arrives at
+a per-symbol rate that rises with the size of the move. All symbols advance
+in one numpy step, so thousands of symbols x ticks/s cost a few ms.
+
+    QUOTE_SOURCE=sim python backend_server.py        # backend data source
+    QUOTE_SOURCE=sim python pipeline/groq_pathway_rag.py
+    python -m connectors.simulator --symbols 2000 --seconds 5    # raw rate
+    python -m connectors.simulator --steps 600 --record sim.jsonl   # TICK_REPLAY file
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# NSE: 252 sessions of 6h15m
+TRADING_SECONDS_PER_YEAR = 252 * 6.25 * 3600
+
+
+class MarketSimulator:
+    """
+    Correlated GBM over a Universe
+
+    `seconds_per_step` is simulated market time per step. quote() advances
+    the whole market lazily by wall clock; step(k) advances k steps at once.
+    """
+
+    def __init__(self, universe, annual_vol=0.25, market_weight=0.3, sector_weight=0.4,
+                 drift=0.0, seconds_per_step=1.0, open_gap=0.01, volume_per_step=2_000,
+                 seed=None, clock=time.monotonic):
+        if market_weight + sector_weight > 1:
+            raise ValueError("market_weight + sector_weight must be <= 1")
+        self.universe = universe
+        self.tickers = [universe.ticker(s) for s in universe.symbols]
+        self.position = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.position.update({symbol: i for i, symbol in enumerate(universe.symbols)})
+        sectors = sorted({i.sector for i in universe.instruments})
+        self.sector_of = np.array([sectors.index(i.sector) for i in universe.instruments])
+        self.n_sectors = len(sectors)
+        self.weights = (math.sqrt(market_weight), math.sqrt(sector_weight),
+                        math.sqrt(1 - market_weight - sector_weight))
+        self.drift = drift
+        self.dt = seconds_per_step / TRADING_SECONDS_PER_YEAR
+        self.seconds_per_step = seconds_per_step
+        self.rng = np.random.default_rng(seed)
+        self.clock = clock
+
+        n = len(self.tickers)
+        self.sigma = annual_vol * self.rng.uniform(0.6, 1.6, size=n)
+        self.prev_close = np.array([i.fallback_price for i in universe.instruments], dtype=np.float64)
+        self.price = self.prev_close * np.exp(self.rng.normal(0, open_gap, size=n))
+        self.high = np.maximum(self.price, self.prev_close * (1 + open_gap / 4))
+        self.low = np.minimum(self.price, self.prev_close * (1 - open_gap / 4))
+        self.volume_rate = volume_per_step * self.rng.lognormal(0, 1, size=n)
+        self.volume = self.rng.poisson(self.volume_rate * 50).astype(np.int64)
+        self.steps = 0
+        self._lock = threading.Lock()
+        self._last = clock()
+
+    @classmethod
+    def from_env(cls, universe):
+        """SIM_VOL (annual), SIM_MARKET_WEIGHT, SIM_SECTOR_WEIGHT, SIM_STEP_SECONDS, SIM_SEED"""
+        seed = os.getenv('SIM_SEED')
+        return cls(
+            universe,
+            annual_vol=float(os.getenv('SIM_VOL', 0.25)),
+            market_weight=float(os.getenv('SIM_MARKET_WEIGHT', 0.3)),
+            sector_weight=float(os.getenv('SIM_SECTOR_WEIGHT', 0.4)),
+            seconds_per_step=float(os.getenv('SIM_STEP_SECONDS', 1.0)),
+            seed=int(seed) if seed else None,
+        )
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def step(self, steps=1):
+        """Advance every symbol `steps` steps (one vectorised draw)"""
+        with self._lock:
+            self._step(steps)
+
+    def _step(self, steps):
+        n = len(self.tickers)
+        w_market, w_sector, w_own = self.weights
+        market = self.rng.standard_normal((steps, 1))
+        sector = self.rng.standard_normal((steps, self.n_sectors))[:, self.sector_of]
+        own = self.rng.standard_normal((steps, n))
+        z = w_market * market + w_sector * sector + w_own * own
+        log_returns = (self.drift - 0.5 * self.sigma ** 2) * self.dt + self.sigma * math.sqrt(self.dt) * z
+        path = self.price * np.exp(np.cumsum(log_returns, axis=0))
+        self.price = path[-1]
+        np.maximum(self.high, path.max(axis=0), out=self.high)
+        np.minimum(self.low, path.min(axis=0), out=self.low)
+        # busier on bigger moves: intensity scales with |z|
+        self.volume += self.rng.poisson(self.volume_rate * (0.5 + np.abs(z).sum(axis=0)))
+        self.steps += steps
+
+    def advance(self, max_steps=3_600):
+        """Catch up with the wall clock (one step per seconds_per_step elapsed)"""
+        with self._lock:
+            self._advance(max_steps)
+
+    def _advance(self, max_steps):
+        # under the lock: concurrent callers must not each apply the same due steps
+        due = int((self.clock() - self._last) / self.seconds_per_step)
+        if due > 0:
+            self._last += due * self.seconds_per_step
+            self._step(min(due, max_steps))
+
+    def quote(self, ticker):
+        """Current quote for one symbol, in the fetchers' quote shape"""
+        i = self.position[ticker]
+        with self._lock:
+            self._advance(3_600)
+            return {
+                'price': float(self.price[i]),
+                'prev_close': float(self.prev_close[i]),
+                'high': float(self.high[i]),
+                'low': float(self.low[i]),
+                'volume': int(self.volume[i]),
+            }
+
+    def quotes(self):
+        """(ticker, quote) for every symbol at the current step"""
+        with self._lock:
+            price, prev, high, low, volume = (self.price.tolist(), self.prev_close.tolist(),
+                                              self.high.tolist(), self.low.tolist(), self.volume.tolist())
+        for i, ticker in enumerate(self.tickers):
+            yield ticker, {'price': price[i], 'prev_close': prev[i], 'high': high[i],
+                           'low': low[i], 'volume': volume[i]}
+
+
+def main():
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from connectors.universe import Instrument, Universe
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=None, help='synthetic universe size (default: config universe)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='measure the raw tick rate for this long')
+    parser.add_argument('--batch', type=int, default=1, help='steps per vectorised draw')
+    parser.add_argument('--steps', type=int, default=None, help='record this many steps instead of timing')
+    parser.add_argument('--record', help='write ticks as jsonlines (replayable with TICK_REPLAY)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    universe = Universe.from_env()
+    if args.symbols:
+        sectors = sorted({i.sector for i in universe.instruments})
+        universe = Universe([Instrument(f"SIM{i:05d}", f"Simulated {i}", sectors[i % len(sectors)], 100 + (i * 37) % 5000)
+                             for i in range(args.symbols)])
+    sim = MarketSimulator(universe, seed=args.seed)
+
+    if args.record:
+        steps = args.steps or 600
+        start = datetime.now() - timedelta(seconds=steps * sim.seconds_per_step)
+        with open(args.record, 'w', encoding='utf-8') as f:
+            for k in range(steps):
+                sim.step()
+                timestamp = (start + timedelta(seconds=k * sim.seconds_per_step)).isoformat()
+                for ticker, q in sim.quotes():
+                    symbol = ticker.replace(universe.suffix, '')
+                    change = q['price'] - q['prev_close']
+                    f.write(json.dumps({
+                        'symbol': symbol, 'price': round(q['price'], 2), 'change': round(change, 2),
+                        'change_percent': round(change / q['prev_close'] * 100, 2),
+                        'high': round(q['high'], 2), 'low': round(q['low'], 2), 'volume': q['volume'],
+                        'timestamp': timestamp,
+                    }) + '\n')
+        print(f"📼 {steps} steps x {len(sim)} symbols -> {args.record}")
+        return
+
+    started = time.perf_counter()
+    ticks = 0
+    while time.perf_counter() - started < args.seconds:
+        sim.step(args.batch)
+        ticks += args.batch * len(sim)
+    elapsed = time.perf_counter() - started
+    moves = (sim.price / sim.prev_close - 1) * 100
+    print(f"🎲 {len(sim)} symbols | {ticks / elapsed:,.0f} ticks/s ({sim.steps / elapsed:,.0f} steps/s) | "
+          f"day change p5/p50/p95 {np.percentile(moves, 5):+.2f}% / {np.percentile(moves, 50):+.2f}% / "
+          f"{np.percentile(moves, 95):+.2f}%")
+
+
+if __name__ == '__main__':
+    main()
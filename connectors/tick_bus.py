@@ -0,0 +1,306 @@
+"""
+Tick bus: ingest nodes publish ticks, the serving tier subscribes
+
+    TICK_BUS=local                  in-process queue (default)
+    TICK_BUS=tcp://host:7070        TCP broker (run one with `python -m connectors.tick_bus`)
+
+The TCP protocol is newline-delimited JSON, one message per line:
+    {"op": "sub"}                        subscribe this connection to all ticks
+    {"op": "pub", "tick": {...}}         publish a tick to every subscriber
+
+The broker queues ticks per subscriber (`--queue` deep, each drained by its
+own writer), so a slow subscriber loses its oldest ticks instead of stalling
+publishers and the other subscribers.
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import uuid
+
+
+class LocalTickBus:
+    """In-process bus: bounded queue drained by one dispatcher thread"""
+
+    def __init__(self, maxsize=10_000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._subscribers = []
+        self._thread = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def publish(self, tick):
+        try:
+            self._queue.put_nowait(tick)
+            self.published += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, daemon=True)
+                self._thread.start()
+
+    def _dispatch(self):
+        while True:
+            tick = self._queue.get()
+            for callback in list(self._subscribers):
+                try:
+                    callback(tick)
+                except Exception as e:
+                    print(f"⚠️  Tick subscriber error: {str(e)[:80]}")
+            self.delivered += 1
+
+    def stats(self):
+        return {
+            'bus': 'local',
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'queued': self._queue.qsize(),
+        }
+
+
+class TcpTickBus:
+    """
+    Client of the TCP broker
+
+    Publishes go through a bounded outbox and a sender thread that reconnects
+    with backoff, so a broker restart never blocks a fetcher (ticks beyond the
+    outbox are dropped and counted). Subscriptions reconnect the same way.
+    """
+
+    def __init__(self, host, port, maxsize=10_000, node=None):
+        self.host = host
+        self.port = port
+        self.node = node or os.getenv('INGEST_NODE') or uuid.uuid4().hex[:8]
+        self._outbox = queue.Queue(maxsize=maxsize)
+        self._sender = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    def _connect(self):
+        delay = 0.5
+        while True:
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=5)
+                sock.settimeout(None)
+                return sock
+            except OSError:
+                self.reconnects += 1
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def publish(self, tick):
+        with self._lock:
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._send_loop, daemon=True)
+                self._sender.start()
+        try:
+            self._outbox.put_nowait(dict(tick, node=tick.get('node', self.node)))
+            self.published += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _send_loop(self):
+        sock = None
+        pending = None
+        while True:
+            if pending is None:
+                pending = (json.dumps({'op': 'pub', 'tick': self._outbox.get()}) + '\n').encode('utf-8')
+            if sock is None:
+                sock = self._connect()
+            try:
+                sock.sendall(pending)
+                pending = None
+            except OSError:
+                sock.close()
+                sock = None
+
+    def subscribe(self, callback):
+        threading.Thread(target=self._receive_loop, args=(callback,), daemon=True).start()
+
+    def _receive_loop(self, callback):
+        while True:
+            sock = self._connect()
+            try:
+                sock.sendall(b'{"op": "sub"}\n')
+                for line in sock.makefile('r', encoding='utf-8'):
+                    try:
+                        callback(json.loads(line))
+                        self.delivered += 1
+                    except Exception as e:
+                        print(f"⚠️  Tick subscriber error: {str(e)[:80]}")
+            except OSError:
+                pass
+            finally:
+                sock.close()
+            self.reconnects += 1
+            time.sleep(1)
+
+    def stats(self):
+        return {
+            'bus': f"tcp://{self.host}:{self.port}",
+            'node': self.node,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'queued': self._outbox.qsize(),
+            'reconnects': self.reconnects,
+        }
+
+
+def bus_from_env():
+    """TICK_BUS=local (default) or tcp://host:port"""
+    spec = os.getenv('TICK_BUS', 'local')
+    if spec.startswith('tcp://'):
+        host, _, port = spec[len('tcp://'):].partition(':')
+        return TcpTickBus(host or 'localhost', int(port or 7070))
+    return LocalTickBus()
+
+
+# ----------------------------------------------------------------------
+# Broker
+# ----------------------------------------------------------------------
+
+class _BrokerSubscriber:
+    """
+    One subscribed connection: a bounded queue drained by its own writer thread
+
+    A slow reader only backs up its own queue; when that is full the oldest
+    tick is dropped (and counted) so publishers and other subscribers never wait.
+    """
+
+    def __init__(self, sock, maxsize):
+        self.sock = sock
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def offer(self, line):
+        while True:
+            try:
+                self.queue.put_nowait(line)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def close(self):
+        self.closed = True
+        self.offer(None)
+
+    def _write_loop(self):
+        while True:
+            line = self.queue.get()
+            if line is None or self.closed:
+                return
+            try:
+                # sendall: a partial send continues from where it stopped, never repeats the line
+                self.sock.sendall(line)
+                self.sent += 1
+            except OSError:
+                self.closed = True
+                return
+
+
+class TickBroker(socketserver.ThreadingTCPServer):
+    """Fan-out broker: every published tick goes to every subscribed connection"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, queue_size=10_000):
+        super().__init__(address, _BrokerHandler)
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, sock):
+        subscriber = _BrokerSubscriber(sock, self.queue_size)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+        subscriber.close()
+
+    def broadcast(self, line):
+        with self.lock:
+            self.published += 1
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            if subscriber.closed:
+                self.unsubscribe(subscriber)
+            else:
+                subscriber.offer(line)
+
+    def stats(self):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        return {
+            'published': self.published,
+            'subscribers': len(subscribers),
+            'sent': sum(s.sent for s in subscribers),
+            'dropped': sum(s.dropped for s in subscribers),
+            'queued': sum(s.queue.qsize() for s in subscribers),
+        }
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        subscriber = None
+        try:
+            for raw in self.rfile:
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    continue
+                if message.get('op') == 'pub':
+                    self.server.broadcast((json.dumps(message['tick']) + '\n').encode('utf-8'))
+                elif message.get('op') == 'sub' and subscriber is None:
+                    subscriber = self.server.subscribe(self.request)
+        finally:
+            if subscriber is not None:
+                self.server.unsubscribe(subscriber)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=7070)
+    parser.add_argument('--queue', type=int, default=10_000, help='ticks buffered per subscriber before dropping the oldest')
+    args = parser.parse_args()
+
+    broker = TickBroker((args.host, args.port), queue_size=args.queue)
+    print(f"🚌 Tick broker on tcp://{args.host}:{args.port}")
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import csv
+import os
+from dataclasses import dataclass
+
+DEFAULT_UNIVERSE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     'config', 'universe.csv')
+
+
+@dataclass
+class Instrument:
+    symbol: str             # NSE symbol, e.g. HDFCBANK
+    name: str
+    sector: str
+    fallback_price: float
+    shard: int = None       # optional explicit fetch shard
+
+
+class Universe:
+    """
+    The tracked symbol universe, loaded from a CSV
+
+    Columns: symbol, name, sector, fallback_price and optionally shard.
+    Exposes the same shapes the fetchers have always used (yfinance ticker ->
+    name, ticker -> fallback price, sector -> tickers) plus shard assignment.
+    """
+
+    def __init__(self, instruments, suffix='.NS'):
+        self.instruments = list(instruments)
+        self.suffix = suffix
+        self.by_symbol = {i.symbol: i for i in self.instruments}
+
+    @classmethod
+    def from_csv(cls, path=None, suffix='.NS'):
+        path = path or DEFAULT_UNIVERSE_FILE
+        instruments = []
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                symbol = (row.get('symbol') or '').strip().upper()
+                if not symbol or symbol.startswith('#'):
+                    continue
+                shard = (row.get('shard') or '').strip()
+                instruments.append(Instrument(
+                    symbol=symbol.replace(suffix, ''),
+                    name=(row.get('name') or symbol).strip(),
+                    sector=(row.get('sector') or 'Unknown').strip(),
+                    fallback_price=float(row.get('fallback_price') or 1000),
+                    shard=int(shard) if shard else None,
+                ))
+        return cls(instruments, suffix)
+
+    @classmethod
+    def from_env(cls):
+        """UNIVERSE_FILE (default config/universe.csv)"""
+        return cls.from_csv(os.getenv('UNIVERSE_FILE') or None)
+
+    def __len__(self):
+        return len(self.instruments)
+
+    def ticker(self, symbol):
+        return symbol + self.suffix
+
+    @property
+    def symbols(self):
+        return [i.symbol for i in self.instruments]
+
+    @property
+    def stocks(self):
+        """yfinance ticker -> company name"""
+        return {self.ticker(i.symbol): i.name for i in self.instruments}
+
+    @property
+    def fallback_prices(self):
+        return {self.ticker(i.symbol): i.fallback_price for i in self.instruments}
+
+    @property
+    def sector_groups(self):
+        groups = {}
+        for i in self.instruments:
+            groups.setdefault(i.sector, []).append(self.ticker(i.symbol))
+        return groups
+
+    def shards(self, count):
+        """
+        Split symbols into `count` shards: an explicit `shard` column wins
+        (taken modulo count), the rest are dealt round-robin
+        """
+        count = max(1, int(count))
+        shards = [[] for _ in range(count)]
+        position = 0
+        for i in self.instruments:
+            if i.shard is not None:
+                shards[i.shard % count].append(i.symbol)
+            else:
+                shards[position % count].append(i.symbol)
+                position += 1
+        return shards
@@ -0,0 +1,88 @@
+"""
+The app's metric families, shared by the Flask backend and the Pathway pipeline
+
+Fetch latency histograms are labelled by outcome only; the per-symbol view is
+a counter and a last-latency gauge, so a large universe adds one series per
+symbol instead of one per symbol and bucket.
+"""
+import os
+import sys
+import time
+
+from observability.metrics import REGISTRY
+
+# Fetching
+FETCH_TOTAL = REGISTRY.counter(
+    'stock_fetch_total', 'Quote fetches by symbol and outcome (yfinance/http/fallback/error)',
+    ('symbol', 'outcome'))
+FETCH_SECONDS = REGISTRY.histogram(
+    'stock_fetch_seconds', 'Quote fetch latency by outcome', ('outcome',))
+FETCH_LAST_SECONDS = REGISTRY.gauge(
+    'stock_fetch_last_seconds', 'Latency of the latest fetch per symbol', ('symbol',))
+CYCLE_SECONDS = REGISTRY.histogram(
+    'fetch_cycle_seconds', 'Time from queuing a polling round until every symbol in it was fetched',
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+
+# Embedding and retrieval
+EMBED_SECONDS = REGISTRY.histogram(
+    'embed_seconds', 'Text embedding latency (cache lookup included)', ('component',))
+VECTOR_SEARCH_SECONDS = REGISTRY.histogram(
+    'vector_search_seconds', 'ANN vector search latency', ('component',))
+
+# LLM
+GROQ_SECONDS = REGISTRY.histogram(
+    'groq_request_seconds', 'Groq chat completion latency', ('purpose',))
+GROQ_TOKENS = REGISTRY.counter(
+    'groq_tokens_total', 'Groq tokens by kind (prompt/completion)', ('purpose', 'kind'))
+GROQ_ERRORS = REGISTRY.counter(
+    'groq_errors_total', 'Failed Groq requests', ('purpose',))
+
+# Serving
+QUERY_TOTAL = REGISTRY.counter(
+    'query_total', 'Answered /query requests by mode (direct/groq_ai/offline_analysis/error)', ('mode',))
+HTTP_SECONDS = REGISTRY.histogram(
+    'http_request_seconds', 'HTTP request latency by endpoint', ('endpoint', 'method', 'status'))
+
+# State sizes (function-backed, evaluated on scrape)
+TICKS_RETAINED = REGISTRY.gauge('ticks_retained', 'Ticks in the rolling window')
+VECTORS_INDEXED = REGISTRY.gauge('vectors_indexed', 'Vectors in the ANN index')
+SYMBOLS_TRACKED = REGISTRY.gauge('symbols_tracked', 'Symbols with a latest quote')
+STREAM_CLIENTS = REGISTRY.gauge('stream_clients', 'Connected /stream (SSE) clients')
+PROCESS_RSS = REGISTRY.gauge('process_resident_memory_bytes', 'Resident set size of this process')
+
+
+def resident_memory_bytes():
+    """Current RSS from /proc, or the peak RSS where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+PROCESS_RSS.set_function(resident_memory_bytes)
+
+
+def record_fetch(symbol, outcome, seconds):
+    FETCH_TOTAL.labels(symbol, outcome).inc()
+    FETCH_SECONDS.labels(outcome).observe(seconds)
+    FETCH_LAST_SECONDS.labels(symbol).set(seconds)
+
+
+def groq_completion(client, purpose, **kwargs):
+    """client.chat.completions.create(**kwargs), recording latency, token usage and errors"""
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(**kwargs)
+    except Exception:
+        GROQ_ERRORS.labels(purpose).inc()
+        raise
+    finally:
+        GROQ_SECONDS.labels(purpose).observe(time.perf_counter() - started)
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        GROQ_TOKENS.labels(purpose, 'prompt').inc(getattr(usage, 'prompt_tokens', 0) or 0)
+        GROQ_TOKENS.labels(purpose, 'completion').inc(getattr(usage, 'completion_tokens', 0) or 0)
+    return response
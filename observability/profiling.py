@@ -0,0 +1,199 @@
+"""
+On-demand CPU and memory profiles of a live process
+
+    cpu:    sample every thread's stack for N seconds -> collapsed stacks
+            ("thread;outer;...;inner count" lines, for flamegraph.pl / speedscope)
+    memory: tracemalloc snapshots grouped by line or file, diffed against a
+            baseline taken when tracing started (or the last rebase)
+
+ProfilingAdmin is framework-agnostic: each handler takes the query parameters
+and returns (status, content_type, body), so the Flask backend and the
+stand-alone metrics server in the Pathway process expose the same endpoints.
+Every call must present PROFILING_TOKEN (X-Admin-Token or a Bearer token);
+without one configured the endpoints stay disabled.
+"""
+import collections
+import hmac
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+MAX_CPU_SECONDS = 120
+
+
+class BadParameter(ValueError):
+    """A query parameter that isn't a usable number (answered with 400)"""
+
+
+def _number(params, name, default, cast=float, minimum=None):
+    """params[name] as a finite number >= minimum, `default` when absent"""
+    raw = params.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        raise BadParameter(f"{name} must be {'an integer' if cast is int else 'a number'}, got {raw!r}")
+    if not math.isfinite(value) or (minimum is not None and value < minimum):
+        raise BadParameter(f"{name} must be a finite number >= {minimum}, got {raw!r}")
+    return value
+
+
+def collapse_stack(frame, thread_name):
+    """One collapsed-stack line (without the count), outermost frame first"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name.replace(';', ':'))
+    return ';'.join(reversed([n.replace(';', ':') for n in names]))
+
+
+def sample_stacks(seconds, interval=0.005, thread_filter=None):
+    """
+    Sample the stacks of all other threads every `interval` seconds
+
+    Returns a Counter of collapsed stack -> samples. `thread_filter` keeps only
+    threads whose name contains it (e.g. 'stage-fetch').
+    """
+    own = threading.get_ident()
+    counts = collections.Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            name = names.get(ident, f"thread-{ident}")
+            if thread_filter and thread_filter not in name:
+                continue
+            counts[collapse_stack(frame, name)] += 1
+        time.sleep(interval)
+    return counts
+
+
+def _entry(stat):
+    frame = stat.traceback[0]
+    return {
+        'location': f"{frame.filename}:{frame.lineno}",
+        'size_kb': round(stat.size / 1024, 1),
+        'count': stat.count,
+    }
+
+
+def _diff_entry(stat):
+    frame = stat.traceback[0]
+    return {
+        'location': f"{frame.filename}:{frame.lineno}",
+        'size_diff_kb': round(stat.size_diff / 1024, 1),
+        'count_diff': stat.count_diff,
+        'size_kb': round(stat.size / 1024, 1),
+    }
+
+
+class ProfilingAdmin:
+    """Token-guarded CPU/memory profiling handlers"""
+
+    def __init__(self, token=None):
+        self.token = token
+        self._cpu_lock = threading.Lock()
+        self._memory_lock = threading.Lock()
+        self._baseline = None
+
+    @classmethod
+    def from_env(cls):
+        """PROFILING_TOKEN (unset disables the endpoints)"""
+        return cls(os.getenv('PROFILING_TOKEN') or None)
+
+    @property
+    def enabled(self):
+        return bool(self.token)
+
+    def check(self, headers):
+        """None if `headers` carry the admin token, else an error (status, content_type, body)"""
+        if not self.enabled:
+            return _json(404, {'error': 'profiling disabled (set PROFILING_TOKEN)'})
+        supplied = headers.get('X-Admin-Token') or ''
+        auth = headers.get('Authorization') or ''
+        if not supplied and auth.startswith('Bearer '):
+            supplied = auth[len('Bearer '):]
+        if not hmac.compare_digest(supplied.encode('utf-8'), self.token.encode('utf-8')):
+            return _json(403, {'error': 'invalid admin token'})
+        return None
+
+    def cpu(self, params):
+        """?seconds=10&interval_ms=5&thread=<name substring> -> collapsed stacks"""
+        try:
+            seconds = min(_number(params, 'seconds', 10.0, minimum=0), MAX_CPU_SECONDS)
+            interval = max(_number(params, 'interval_ms', 5.0, minimum=0), 1.0) / 1000.0
+        except BadParameter as e:
+            return _json(400, {'error': str(e)})
+        if not self._cpu_lock.acquire(blocking=False):
+            return _json(409, {'error': 'a CPU profile is already running'})
+        try:
+            counts = sample_stacks(seconds, interval, params.get('thread') or None)
+        finally:
+            self._cpu_lock.release()
+        body = ''.join(f"{stack} {n}\n" for stack, n in counts.most_common())
+        return 200, 'text/plain; charset=utf-8', body
+
+    def memory(self, params):
+        """
+        ?action=start[&frames=1] | snapshot[&group=lineno|filename&limit=25&rebase=1] | stop
+        snapshot returns the top allocations and the growth since the baseline
+        """
+        action = params.get('action', 'snapshot')
+        try:
+            frames = _number(params, 'frames', 1, int, minimum=1)
+            limit = _number(params, 'limit', 25, int, minimum=0)
+        except BadParameter as e:
+            return _json(400, {'error': str(e)})
+        with self._memory_lock:
+            if action == 'start':
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(frames)
+                self._baseline = self._snapshot()
+                return _json(200, {'tracing': True, 'baseline': time.time()})
+            if action == 'stop':
+                tracemalloc.stop()
+                self._baseline = None
+                return _json(200, {'tracing': False})
+            if action != 'snapshot':
+                return _json(400, {'error': f"unknown action {action!r}"})
+            if not tracemalloc.is_tracing():
+                return _json(409, {'error': 'tracemalloc is not tracing (action=start first)'})
+
+            group = params.get('group', 'lineno')
+            if group not in ('lineno', 'filename'):
+                return _json(400, {'error': 'group must be lineno or filename'})
+            snapshot = self._snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            result = {
+                'group': group,
+                'traced_kb': round(current / 1024, 1),
+                'peak_kb': round(peak / 1024, 1),
+                'top': [_entry(s) for s in snapshot.statistics(group)[:limit]],
+            }
+            if self._baseline is not None:
+                diff = snapshot.compare_to(self._baseline, group)
+                result['growth'] = [_diff_entry(s) for s in diff[:limit] if s.size_diff > 0]
+            if params.get('rebase') in ('1', 'true'):
+                self._baseline = snapshot
+            return _json(200, result)
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+
+def _json(status, payload):
+    return status, 'application/json', json.dumps(payload)
@@ -0,0 +1,190 @@
+"""
+Per-request stage timings
+
+    with tracing.trace('query') as t:
+        with tracing.span('embed'):
+            ...
+    response.headers['Server-Timing'] = t.server_timing()
+
+span() is a no-op outside a trace, so library code can be instrumented
+unconditionally. The active trace lives in a ContextVar (one per request
+thread). Finished traces can be logged as one JSON line and offered to a
+TraceSampler, which keeps a bounded sample for the opt-in trace dump.
+"""
+import collections
+import contextlib
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+_current = contextvars.ContextVar('trace', default=None)
+
+
+class Trace:
+    """Spans of one request: (name, offset ms, duration ms) in start order"""
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.id = uuid.uuid4().hex[:16]
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.spans = []
+        self.total_ms = None
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((name, (start - self._t0) * 1000, (end - start) * 1000))
+
+    def finish(self):
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self._t0) * 1000
+        return self.total_ms
+
+    def durations(self):
+        """Milliseconds per span name (repeated spans are summed)"""
+        totals = collections.OrderedDict()
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def server_timing(self):
+        """Server-Timing header value: one metric per span, plus total"""
+        parts = [f"{name};dur={ms:.1f}" for name, ms in self.durations().items()]
+        parts.append(f"total;dur={self.finish():.1f}")
+        return ', '.join(parts)
+
+    def as_dict(self):
+        return {
+            'trace': self.name,
+            'id': self.id,
+            'started_at': self.started_at,
+            'total_ms': round(self.finish(), 2),
+            'spans': [{'name': n, 'offset_ms': round(o, 2), 'ms': round(d, 2)} for n, o, d in self.spans],
+            **self.attrs,
+        }
+
+
+def current():
+    return _current.get()
+
+
+def start(name, **attrs):
+    """Begin a trace in this context; returns (trace, token) for finish()"""
+    t = Trace(name, **attrs)
+    return t, _current.set(t)
+
+
+def finish(token):
+    t = _current.get()
+    _current.reset(token)
+    if t is not None:
+        t.finish()
+    return t
+
+
+@contextlib.contextmanager
+def trace(name, **attrs):
+    t, token = start(name, **attrs)
+    try:
+        yield t
+    finally:
+        finish(token)
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time a stage of the current trace (no-op without one)"""
+    t = _current.get()
+    if t is None:
+        yield
+        return
+    with t.span(name):
+        yield
+
+
+def log_trace(t):
+    """One structured line per finished trace"""
+    print(f"🧭 {json.dumps(t.as_dict(), separators=(',', ':'))}")
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    i = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return round(sorted_values[i], 2)
+
+
+class TraceSampler:
+    """
+    Bounded sample of finished traces
+
+    A trace is kept with probability `sample_rate`, and always when it took at
+    least `slow_ms`. dump() returns the recent sample with per-span
+    p50/p99 so tail latency can be attributed to a stage.
+    """
+
+    def __init__(self, sample_rate=0.0, slow_ms=None, capacity=500, rng=None):
+        self.sample_rate = float(sample_rate)
+        self.slow_ms = slow_ms
+        self._traces = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._rng = rng or random.Random()
+        self.seen = 0
+
+    @classmethod
+    def from_env(cls):
+        """TRACE_SAMPLE_RATE (0 disables), TRACE_SLOW_MS, TRACE_BUFFER"""
+        slow = os.getenv('TRACE_SLOW_MS')
+        return cls(
+            sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', 0)),
+            slow_ms=float(slow) if slow else None,
+            capacity=int(os.getenv('TRACE_BUFFER', 500)),
+        )
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or self.slow_ms is not None
+
+    def offer(self, t):
+        self.seen += 1
+        slow = self.slow_ms is not None and t.finish() >= self.slow_ms
+        if slow or (self.sample_rate > 0 and self._rng.random() < self.sample_rate):
+            with self._lock:
+                self._traces.append(t.as_dict())
+
+    def dump(self, limit=50):
+        with self._lock:
+            traces = list(self._traces)
+        by_span = collections.defaultdict(list)
+        for t in traces:
+            by_span['total'].append(t['total_ms'])
+            for s in t['spans']:
+                by_span[s['name']].append(s['ms'])
+        spans = {}
+        for name, values in by_span.items():
+            values.sort()
+            spans[name] = {
+                'count': len(values),
+                'p50_ms': _percentile(values, 0.5),
+                'p99_ms': _percentile(values, 0.99),
+                'max_ms': round(values[-1], 2),
+            }
+        return {
+            'sample_rate': self.sample_rate,
+            'slow_ms': self.slow_ms,
+            'seen': self.seen,
+            'sampled': len(traces),
+            'spans': spans,
+            'slowest': sorted(traces, key=lambda t: t['total_ms'], reverse=True)[:10],
+            'recent': traces[-limit:] if limit else [],
+        }
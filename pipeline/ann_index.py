@@ -0,0 +1,328 @@
+import threading
+import time
+
+import numpy as np
+
+
+class ANNIndex:
+    """
+    Approximate nearest-neighbour index (IVF, pure NumPy)
+
+    Vectors are L2-normalised on insert so inner product == cosine similarity.
+    Below `exact_threshold` live vectors (or before the coarse quantizer has
+    been trained) every search is an exact scan, so small corpora behave
+    exactly like the old brute-force loop.
+
+    k-means runs on a snapshot outside the lock, so searches and inserts keep
+    going (against the previous clusters, or exactly) while it trains.
+
+    Recall/latency knobs:
+        nlist    - number of coarse clusters (default ~4*sqrt(n) at train time)
+        nprobe   - clusters scanned per query (higher = better recall, slower)
+        exact_threshold - size below which search is always exact
+    """
+
+    def __init__(self, dim=384, nlist=None, nprobe=8, exact_threshold=4096,
+                 train_sample=50_000, kmeans_iters=10, retrain_growth=4.0, seed=0):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.exact_threshold = exact_threshold
+        self.train_sample = train_sample
+        self.kmeans_iters = kmeans_iters
+        self.retrain_growth = retrain_growth
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+
+        capacity = 1024
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._assign = np.full(capacity, -1, dtype=np.int32)
+        self._size = 0          # rows used (live + tombstoned)
+        self._live = 0
+        self._pos_by_id = {}
+
+        self._centroids = None
+        self._lists = []        # per-cluster python lists of row positions
+        self._list_cache = {}   # cluster -> np.ndarray, invalidated on insert
+        self._trained_at = 0
+        self._training = False  # a k-means run is in flight (one at a time)
+        self._generation = 0    # bumped whenever compaction moves rows
+
+    def __len__(self):
+        return self._live
+
+    @property
+    def trained(self):
+        return self._centroids is not None
+
+    # ------------------------------------------------------------------
+    # Inserts
+    # ------------------------------------------------------------------
+
+    def add(self, doc_id, vector, timestamp=None):
+        """Insert (or replace) a single vector"""
+        self.add_batch([doc_id], np.asarray(vector, dtype=np.float32).reshape(1, -1),
+                       None if timestamp is None else [timestamp])
+
+    def add_batch(self, doc_ids, vectors, timestamps=None):
+        """Insert a batch of vectors with integer ids and optional epoch timestamps"""
+        vectors = self._normalise(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        n = len(vectors)
+        if n == 0:
+            return
+        if timestamps is None:
+            timestamps = np.full(n, time.time())
+
+        with self._lock:
+            stale = [d for d in doc_ids if d in self._pos_by_id]
+            if stale:
+                self.remove(stale)
+
+            self._reserve(self._size + n)
+            start, end = self._size, self._size + n
+            self._vectors[start:end] = vectors
+            self._ids[start:end] = doc_ids
+            self._timestamps[start:end] = timestamps
+            self._alive[start:end] = True
+            for offset, doc_id in enumerate(doc_ids):
+                self._pos_by_id[int(doc_id)] = start + offset
+            self._size = end
+            self._live += n
+
+            if self._centroids is not None:
+                clusters = self._nearest_centroid(vectors, self._centroids)
+                self._assign[start:end] = clusters
+                for offset, cluster in enumerate(clusters):
+                    self._lists[cluster].append(start + offset)
+                    self._list_cache.pop(int(cluster), None)
+
+            job = self._train_job()
+        if job is not None:
+            self._train(*job)
+
+    # ------------------------------------------------------------------
+    # Deletion / expiry
+    # ------------------------------------------------------------------
+
+    def remove(self, doc_ids):
+        """Tombstone vectors by id; storage is reclaimed on compaction"""
+        with self._lock:
+            removed = 0
+            for doc_id in doc_ids:
+                pos = self._pos_by_id.pop(int(doc_id), None)
+                if pos is not None and self._alive[pos]:
+                    self._alive[pos] = False
+                    removed += 1
+            self._live -= removed
+            self._maybe_compact()
+            return removed
+
+    def expire(self, older_than):
+        """Drop every vector whose timestamp is strictly older than `older_than` (epoch seconds)"""
+        with self._lock:
+            mask = self._alive[:self._size] & (self._timestamps[:self._size] < older_than)
+            expired = self._ids[:self._size][mask]
+            return self.remove(expired.tolist())
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query, k=10, nprobe=None, allowed_ids=None):
+        """
+        Return up to k (doc_id, score) pairs ordered by descending cosine similarity.
+        `allowed_ids` restricts the search to a subset of ids (always exact).
+        """
+        query = self._normalise(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+
+        with self._lock:
+            if self._live == 0:
+                return []
+
+            if allowed_ids is not None:
+                positions = [self._pos_by_id[d] for d in allowed_ids if d in self._pos_by_id]
+                candidates = np.asarray(positions, dtype=np.int64)
+            elif self._centroids is None or self._live < self.exact_threshold:
+                candidates = np.flatnonzero(self._alive[:self._size])
+            else:
+                probe = nprobe or self.nprobe
+                centroid_scores = self._centroids @ query
+                probe = min(probe, len(centroid_scores))
+                top_lists = np.argpartition(-centroid_scores, probe - 1)[:probe]
+                parts = [self._list_array(int(c)) for c in top_lists]
+                candidates = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+                candidates = candidates[self._alive[candidates]]
+
+            if len(candidates) == 0:
+                return []
+
+            scores = self._vectors[candidates] @ query
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self._ids[candidates[i]]), float(scores[i])) for i in top]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'vectors': self._live,
+                'tombstoned': self._size - self._live,
+                'trained': self._centroids is not None,
+                'nlist': 0 if self._centroids is None else len(self._centroids),
+                'nprobe': self.nprobe,
+                'exact_threshold': self.exact_threshold,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalise(vectors):
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / (norms + 1e-10)
+
+    def _reserve(self, needed):
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._vectors = self._grow(self._vectors, capacity)
+        self._ids = self._grow(self._ids, capacity)
+        self._timestamps = self._grow(self._timestamps, capacity)
+        self._alive = self._grow(self._alive, capacity)
+        assign = np.full(capacity, -1, dtype=np.int32)
+        assign[:self._size] = self._assign[:self._size]
+        self._assign = assign
+
+    @staticmethod
+    def _grow(array, capacity):
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _list_array(self, cluster):
+        cached = self._list_cache.get(cluster)
+        if cached is None:
+            cached = np.asarray(self._lists[cluster], dtype=np.int64)
+            self._list_cache[cluster] = cached
+        return cached
+
+    @staticmethod
+    def _nearest_centroid(vectors, centroids, positions=None, chunk=65_536):
+        """Cluster of each vector (or of vectors[positions], gathered chunk by chunk)"""
+        n = len(vectors) if positions is None else len(positions)
+        out = np.empty(n, dtype=np.int32)
+        for start in range(0, n, chunk):
+            block = vectors[start:start + chunk] if positions is None else vectors[positions[start:start + chunk]]
+            out[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+        return out
+
+    def _train_job(self):
+        """Under the lock: claim a training run and snapshot what it needs, or None"""
+        if self._training or self._live < self.exact_threshold:
+            return None
+        if self._centroids is not None and self._live < self._trained_at * self.retrain_growth:
+            return None
+        live = np.flatnonzero(self._alive[:self._size])
+        nlist = self.nlist or int(np.clip(4 * np.sqrt(len(live)), 16, 4096))
+        # never more clusters than vectors (small exact_threshold or explicit nlist)
+        nlist = min(nlist, len(live))
+        sample_size = min(len(live), max(self.train_sample, nlist * 32, nlist))
+        sample = self._vectors[self._rng.choice(live, size=sample_size, replace=False)]
+        self._training = True
+        return sample, nlist, live, self._vectors, self._generation
+
+    def _train(self, sample, nlist, live, vectors, generation):
+        """
+        Spherical k-means on the sampled vectors, then assign the snapshot's rows,
+        all without the lock; only installing the result takes it
+        """
+        try:
+            centroids = self._kmeans(sample, nlist)
+            labels = self._nearest_centroid(vectors, centroids, live)
+            with self._lock:
+                if self._live < self.exact_threshold:
+                    return
+                self._centroids = centroids
+                if generation != self._generation:
+                    # compaction moved rows while training: assign afresh
+                    self._reassign(np.flatnonzero(self._alive[:self._size]))
+                else:
+                    self._install(live, labels)
+                self._trained_at = self._live
+        finally:
+            with self._lock:
+                self._training = False
+
+    def _install(self, live, labels):
+        """Lists from the snapshot's labels, plus rows inserted or removed since"""
+        # rows only die between compactions, so anything alive past the snapshot is new
+        start = int(live[-1]) + 1 if len(live) else 0
+        still = self._alive[live]
+        live, labels = live[still], labels[still]
+        added = start + np.flatnonzero(self._alive[start:self._size])
+        if len(added):
+            live = np.concatenate([live, added])
+            labels = np.concatenate([labels, self._nearest_centroid(self._vectors, self._centroids, added)])
+        self._assign[:self._size] = -1
+        self._build_lists(live, labels)
+
+    def _kmeans(self, sample, nlist):
+        centroids = sample[self._rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iters):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty clusters from random sample points
+                sums[empty] = sample[self._rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = self._normalise(sums)
+        return centroids
+
+    def _reassign(self, live):
+        self._assign[:self._size] = -1
+        self._build_lists(live, self._nearest_centroid(self._vectors, self._centroids, live))
+
+    def _build_lists(self, live, labels):
+        self._lists = [[] for _ in range(len(self._centroids))]
+        self._list_cache = {}
+        if len(live) == 0:
+            return
+        self._assign[live] = labels
+        order = np.argsort(labels, kind='stable')
+        bounds = np.searchsorted(labels[order], np.arange(len(self._centroids) + 1))
+        for cluster in range(len(self._centroids)):
+            self._lists[cluster] = live[order[bounds[cluster]:bounds[cluster + 1]]].tolist()
+
+    def _maybe_compact(self):
+        dead = self._size - self._live
+        if dead < 1024 or dead < self._size // 2:
+            return
+        live = np.flatnonzero(self._alive[:self._size])
+        n = len(live)
+        self._vectors[:n] = self._vectors[live]
+        self._ids[:n] = self._ids[live]
+        self._timestamps[:n] = self._timestamps[live]
+        self._assign[:n] = self._assign[live]
+        self._alive[:n] = True
+        self._alive[n:self._size] = False
+        self._size = n
+        self._generation += 1
+        self._pos_by_id = {int(doc_id): pos for pos, doc_id in enumerate(self._ids[:n])}
+
+        if self._centroids is not None:
+            if n < self.exact_threshold:
+                self._centroids = None
+                self._lists = []
+                self._list_cache = {}
+                self._trained_at = 0
+            else:
+                self._reassign(np.arange(n))
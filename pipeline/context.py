@@ -0,0 +1,136 @@
+import math
+import re
+import time
+from datetime import datetime
+
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate (no tokenizer download)
+
+    Llama-style BPE averages ~4 chars per token on English and about one
+    token per word/punctuation mark on terse tabular text; take the larger.
+    """
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / 4), len(_TOKEN_RE.findall(text)))
+
+
+def _epoch(timestamp):
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def select_context(candidates, token_budget=600, max_rows=10, half_life=300.0,
+                   recency_weight=0.3, now=None, row_tokens=None):
+    """
+    Pick prompt rows from retrieval candidates
+
+    candidates: iterable of (doc, similarity) where doc is a tick dict
+    Each candidate is scored as similarity + recency_weight * 2^(-age/half_life);
+    only the freshest row per symbol is kept, and rows are packed in score
+    order until the token budget (or max_rows) is spent. `row_tokens(doc)`
+    prices a row; by default the estimate of its `text`.
+
+    Returns (docs, tokens_used).
+    """
+    now = now or time.time()
+    row_tokens = row_tokens or (lambda doc: estimate_tokens(doc['text']) + 1)
+
+    freshest = {}
+    for doc, similarity in candidates:
+        ts = _epoch(doc.get('timestamp'))
+        key = doc.get('symbol', id(doc))
+        current = freshest.get(key)
+        if current is None or ts > current[1]:
+            freshest[key] = (doc, ts, similarity)
+        elif ts == current[1] and similarity > current[2]:
+            freshest[key] = (doc, ts, similarity)
+
+    scored = []
+    for doc, ts, similarity in freshest.values():
+        age = max(0.0, now - ts)
+        decay = 0.5 ** (age / half_life) if half_life > 0 else 0.0
+        scored.append((similarity + recency_weight * decay, doc))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    selected = []
+    used = 0
+    for _, doc in scored:
+        if len(selected) >= max_rows:
+            break
+        cost = row_tokens(doc)
+        if used + cost > token_budget:
+            continue
+        selected.append(doc)
+        used += cost
+    return selected, used
+
+
+# Column key -> (header, formatter) for build_table_context
+TABLE_COLUMNS = {
+    'symbol': ('symbol', lambda r: r['symbol']),
+    'price': ('₹price', lambda r: _compact_number(r['price'])),
+    'change_percent': ('chg%', lambda r: f"{r['change_percent']:+.2f}"),
+    'volume': ('vol(lakh)', lambda r: f"{(r.get('volume') or 0) / 1e5:.0f}"),
+    'high': ('₹high', lambda r: _compact_number(r.get('high', 0))),
+    'low': ('₹low', lambda r: _compact_number(r.get('low', 0))),
+}
+DEFAULT_COLUMNS = ('symbol', 'price', 'change_percent', 'volume')
+
+
+def _compact_number(value):
+    return f"{value:.2f}".rstrip('0').rstrip('.')
+
+
+def latest_per_symbol(records):
+    """Keep the newest record per symbol (input order = arrival order)"""
+    latest = {}
+    for record in records:
+        current = latest.get(record['symbol'])
+        if current is None or _epoch(record.get('timestamp')) >= _epoch(current.get('timestamp')):
+            latest[record['symbol']] = record
+    return list(latest.values())
+
+
+def render_row(record, columns=DEFAULT_COLUMNS):
+    return ' '.join(TABLE_COLUMNS[c][1](record) for c in columns)
+
+
+def table_row_tokens(record, columns=DEFAULT_COLUMNS):
+    """Token cost of one table row, for select_context(row_tokens=...)"""
+    return estimate_tokens(render_row(record, columns)) + 1
+
+
+def build_table_context(records, columns=DEFAULT_COLUMNS, group_by_sector=True):
+    """
+    Render tick records as a compact, deduplicated table for the LLM
+
+    One header line, then one space-separated row per symbol grouped under
+    sector headings, e.g.
+        symbol ₹price chg% vol(lakh)
+        [IT]
+        TCS 3945.75 +1.20 124
+    """
+    rows = latest_per_symbol(records)
+    if not rows:
+        return ''
+    lines = [' '.join(TABLE_COLUMNS[c][0] for c in columns)]
+    if not group_by_sector:
+        lines.extend(render_row(r, columns) for r in rows)
+        return "\n".join(lines)
+
+    groups = {}
+    for r in rows:
+        groups.setdefault(r.get('sector') or 'Other', []).append(r)
+    for sector, members in groups.items():
+        lines.append(f"[{sector}]")
+        lines.extend(render_row(r, columns) for r in members)
+    return "\n".join(lines)
@@ -0,0 +1,196 @@
+"""
+Per-cycle deltas of changed symbols, pushed to streaming clients (SSE)
+
+The serving tier marks every stored tick; once per `interval` the rows that
+changed since the previous cycle go out as one frame, JSON-encoded once and
+shared by every subscriber. A subscriber that hasn't drained its last frame
+gets the next one merged into it by symbol, so a slow client holds at most
+one row per symbol and catches up straight to the latest quotes instead of
+replaying every cycle it missed.
+
+Wire format (text/event-stream):
+
+    id: 41
+    event: snapshot          # first event: every symbol
+    data: {"seq": 41, "stocks": [...]}
+
+    id: 42
+    event: delta             # then: only the symbols that changed
+    data: {"seq": 42, "stocks": [...]}
+
+    : keepalive              # every `heartbeat` seconds without a delta
+"""
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+# Internal fields of a stored tick that clients never see
+PRIVATE_FIELDS = ('id', 'text')
+
+Frame = namedtuple('Frame', 'seq rows data')
+
+
+def public_row(entry):
+    return {k: v for k, v in entry.items() if k not in PRIVATE_FIELDS}
+
+
+def encode(seq, rows):
+    return json.dumps({'seq': seq, 'stocks': list(rows.values())}, ensure_ascii=False, separators=(',', ':'))
+
+
+def sse(event, seq, data):
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n"
+
+
+class Subscriber:
+    """One client's mailbox: the shared pending frame, or rows merged from several"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._merged = None
+        self._seq = 0
+        self.delivered = 0
+        self.conflated = 0
+
+    def push(self, frame):
+        with self._cond:
+            if self._frame is None and self._merged is None:
+                self._frame = frame
+            else:
+                # still undrained: conflate by symbol into a private copy
+                if self._merged is None:
+                    self._merged, self._frame = dict(self._frame.rows), None
+                self._merged.update(frame.rows)
+                self.conflated += 1
+            self._seq = frame.seq
+            self._cond.notify()
+
+    def next(self, timeout):
+        """(seq, encoded payload) of everything pending, or None after `timeout` idle seconds"""
+        with self._cond:
+            if self._frame is None and self._merged is None:
+                self._cond.wait(timeout)
+            if self._frame is not None:
+                frame, self._frame = self._frame, None
+                self.delivered += 1
+                return frame.seq, frame.data
+            if self._merged is not None:
+                rows, self._merged = self._merged, None
+                self.delivered += 1
+                return self._seq, encode(self._seq, rows)
+            return None
+
+
+class DeltaBroadcaster:
+    """
+    Collects changed rows and fans them out to subscribers once per cycle
+
+    `snapshot` returns {symbol: entry} for the full state a new client starts
+    from. Subscribing before the snapshot is read means no change can fall
+    between the two; a row sent twice is harmless since rows are whole quotes.
+    """
+
+    def __init__(self, snapshot, interval=1.0, max_subscribers=100, heartbeat=15.0):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self.seq = 0
+        self._pending = {}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.frames = 0
+        self.rows_sent = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, snapshot):
+        """STREAM_INTERVAL (s), STREAM_MAX_CLIENTS, STREAM_HEARTBEAT (s)"""
+        return cls(
+            snapshot,
+            interval=float(os.getenv('STREAM_INTERVAL', 1.0)),
+            max_subscribers=int(os.getenv('STREAM_MAX_CLIENTS', 100)),
+            heartbeat=float(os.getenv('STREAM_HEARTBEAT', 15.0)),
+        )
+
+    def mark(self, entry):
+        """Record a changed tick (the newest per symbol wins within a cycle)"""
+        with self._lock:
+            self._pending[entry['symbol']] = entry
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='delta-stream', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Send the rows changed since the last cycle; returns the frame (None if nothing changed)"""
+        with self._lock:
+            if not self._pending:
+                return None
+            pending, self._pending = self._pending, {}
+            self.seq += 1
+            seq = self.seq
+            subscribers = list(self._subscribers)
+        rows = {symbol: public_row(entry) for symbol, entry in pending.items()}
+        frame = Frame(seq, rows, encode(seq, rows))
+        for subscriber in subscribers:
+            subscriber.push(frame)
+        self.frames += 1
+        self.rows_sent += len(rows) * len(subscribers)
+        return frame
+
+    def subscribe(self):
+        """A new Subscriber, or None at max_subscribers"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                return None
+            subscriber = Subscriber()
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def events(self, subscriber):
+        """SSE text for one client: snapshot, then deltas and keepalives until it disconnects"""
+        try:
+            with self._lock:
+                seq = self.seq
+            rows = {symbol: public_row(entry) for symbol, entry in self.snapshot().items()}
+            yield sse('snapshot', seq, encode(seq, rows))
+            while True:
+                item = subscriber.next(self.heartbeat)
+                if item is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield sse('delta', *item)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def stats(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            'clients': len(subscribers),
+            'seq': self.seq,
+            'frames': self.frames,
+            'rows_sent': self.rows_sent,
+            'conflated': sum(s.conflated for s in subscribers),
+            'rejected': self.rejected,
+            'interval_s': self.interval,
+        }
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def content_key(model_name: str, text: str) -> bytes:
+    """20-byte SHA-1 of (model name, text)"""
+    return hashlib.sha1(f"{model_name}\0{text}".encode('utf-8')).digest()
+
+
+class DiskTier:
+    """
+    Memory-mapped ring of embeddings that survives restarts
+
+    Two .npy memmaps under `directory`: vectors (capacity x dim, float32) and
+    their keys (capacity x 20 uint8; an all-zero row is an empty slot). Keys
+    are raw bytes rather than a numpy string type, which would drop trailing
+    NULs from digests that end in one. The write cursor is kept in meta.json;
+    once full, the oldest slot is overwritten. One writer per directory.
+    """
+
+    KEY_BYTES = 20
+
+    def __init__(self, directory, dim, capacity=100_000, flush_every=64):
+        os.makedirs(directory, exist_ok=True)
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self._meta_path = os.path.join(directory, 'meta.json')
+        vectors_path = os.path.join(directory, 'vectors.npy')
+        keys_path = os.path.join(directory, 'keys.npy')
+
+        self.vectors, fresh = self._open(vectors_path, np.float32, (capacity, dim))
+        self.keys, _ = self._open(keys_path, np.uint8, (capacity, self.KEY_BYTES))
+        if fresh:
+            # keys without their vectors are worthless
+            self.keys[:] = 0
+        used = np.flatnonzero(self.keys.any(axis=1))
+        self.slots = {self.keys[i].tobytes(): int(i) for i in used}
+        self.cursor = len(self.slots) % capacity
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.cursor = json.load(f).get('cursor', self.cursor) % capacity
+        self._dirty = 0
+
+    @staticmethod
+    def _open(path, dtype, shape):
+        """(memmap, created): the existing file if it matches, else a new zeroed one"""
+        if os.path.exists(path):
+            try:
+                array = np.lib.format.open_memmap(path, mode='r+')
+                if array.shape == shape and array.dtype == np.dtype(dtype):
+                    return array, False
+            except ValueError:
+                pass
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape), True
+
+    def __len__(self):
+        return len(self.slots)
+
+    def get(self, key):
+        slot = self.slots.get(key)
+        return None if slot is None else np.array(self.vectors[slot])
+
+    def put(self, key, vector):
+        if len(key) != self.KEY_BYTES:
+            raise ValueError(f"keys are {self.KEY_BYTES}-byte digests, got {len(key)} bytes")
+        if key in self.slots:
+            return
+        slot = self.cursor
+        old = self.keys[slot].tobytes()
+        if self.slots.get(old) == slot:
+            del self.slots[old]
+        self.vectors[slot] = vector
+        self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+        self.slots[key] = slot
+        self.cursor = (slot + 1) % self.capacity
+        self._dirty += 1
+        if self._dirty >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self.vectors.flush()
+        self.keys.flush()
+        with open(self._meta_path, 'w') as f:
+            json.dump({'cursor': self.cursor}, f)
+        self._dirty = 0
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache: in-memory LRU over an optional disk tier
+
+    Keys are SHA-1(model name, text), so repeated tick templates, fallback
+    quotes and repeated questions reuse their vectors. Lookups go memory LRU
+    (`max_entries`) -> memory-mapped DiskTier under `disk_dir` (if set, one
+    subdirectory per model) -> the model. Drop-in for `embedder.encode(text)`.
+    """
+
+    def __init__(self, embedder, model_name='all-MiniLM-L6-v2', max_entries=10_000,
+                 disk_dir=None, disk_capacity=100_000):
+        self.embedder = embedder
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_capacity = disk_capacity
+        self.disk = None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._open_disk()
+
+    @classmethod
+    def from_env(cls, embedder, model_name='all-MiniLM-L6-v2', max_entries=10_000):
+        """EMBEDDING_CACHE_SIZE entries in memory; EMBEDDING_CACHE_DIR enables the disk tier"""
+        return cls(
+            embedder,
+            model_name,
+            max_entries=int(os.getenv('EMBEDDING_CACHE_SIZE', max_entries)),
+            disk_dir=os.getenv('EMBEDDING_CACHE_DIR') or None,
+            disk_capacity=int(os.getenv('EMBEDDING_CACHE_DISK_SIZE', 100_000)),
+        )
+
+    def encode(self, text: str, **kwargs):
+        key = content_key(self.model_name, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+            vector = self.disk.get(key) if self.disk is not None else None
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+            self.misses += 1
+
+        vector = np.asarray(self.embedder.encode(text, convert_to_numpy=True), dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+            if self._open_disk(vector.shape[-1]) is not None:
+                self.disk.put(key, vector)
+        return vector
+
+    def _open_disk(self, dim=None):
+        """Open the disk tier (existing files give the dimension; otherwise on the first vector)"""
+        if self.disk is None and self.disk_dir:
+            directory = os.path.join(self.disk_dir, re.sub(r'[^\w.-]+', '_', self.model_name))
+            existing = os.path.join(directory, 'vectors.npy')
+            if dim is None and os.path.exists(existing):
+                dim = np.load(existing, mmap_mode='r').shape[-1]
+            if dim is not None:
+                self.disk = DiskTier(directory, dim, self.disk_capacity)
+        return self.disk
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def flush(self):
+        with self._lock:
+            if self.disk is not None:
+                self.disk.flush()
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                'model': self.model_name,
+                'entries': len(self._memory),
+                'disk_entries': len(self.disk) if self.disk is not None else None,
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(hits / total, 3) if total else 0.0,
+            }
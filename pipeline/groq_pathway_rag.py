@@ -4,18 +4,29 @@ from sentence_transformers import SentenceTransformer
 import numpy as np
 from datetime import datetime
 import os
+import atexit
 from dotenv import load_dotenv
 import sys
 sys.path.append('..')
 from connectors.indian_stock_connector import create_stock_stream
+from connectors.universe import Universe
+from pipeline.ann_index import ANNIndex
+from pipeline.context import build_table_context
+from pipeline.embedding_cache import EmbeddingCache
+import json
+from observability import instruments, tracing
+from observability.metrics import start_http_server
+from observability.profiling import ProfilingAdmin
 
 load_dotenv()
 
 # Initialize Groq client (FREE)
-groq_client = Groq(api_key=os.getenv('groqapi'))
+groq_client = Groq(api_key=os.getenv('groqapi'), base_url=os.getenv('GROQ_BASE_URL') or None)
 
 # Initialize local embedder (runs on your machine, 100% free)
 embedder = SentenceTransformer('all-MiniLM-L6-v2')  # Small, fast, free
+embedding_cache = EmbeddingCache.from_env(embedder, 'all-MiniLM-L6-v2')
+atexit.register(embedding_cache.flush)
 
 print("🚀 Initializing Groq + Pathway RAG Pipeline...")
 
@@ -26,7 +37,8 @@ stock_stream = create_stock_stream()
 def generate_embedding(text: str):
     """Generate embeddings using free local model"""
     try:
-        embedding = embedder.encode(text, convert_to_numpy=True)
+        with instruments.EMBED_SECONDS.labels('pipeline').time():
+            embedding = embedding_cache.encode(text)
         return embedding.tolist()
     except Exception as e:
         print(f"Embedding error: {e}")
@@ -85,51 +97,72 @@ stock_analytics = stock_with_embeddings.windowby(
 
 # Step 5: Vector search for RAG
 class VectorStore:
-    """Simple in-memory vector store"""
+    """In-memory vector store backed by the ANN index"""
     
-    def __init__(self):
-        self.documents = []
-        self.embeddings = []
+    def __init__(self, max_docs=None):
+        self.max_docs = max_docs or int(os.getenv('MAX_DOCS', max(500, 10 * len(Universe.from_env()))))
+        self.index = ANNIndex(
+            dim=384,
+            nprobe=int(os.getenv('ANN_NPROBE', 8)),
+            exact_threshold=int(os.getenv('ANN_EXACT_THRESHOLD', 4096))
+        )
+        self.documents = {}
+        self._next_id = 0
         
     def add(self, doc, embedding):
-        self.documents.append(doc)
-        self.embeddings.append(embedding)
+        doc_id = self._next_id
+        self._next_id += 1
+        self.documents[doc_id] = doc
+        self.index.add(doc_id, embedding)
         
-        # Keep only last 500 entries (memory efficient)
-        if len(self.documents) > 500:
-            self.documents = self.documents[-500:]
-            self.embeddings = self.embeddings[-500:]
+        # Keep only the newest max_docs entries: ids are consecutive, so each
+        # insert past the cap evicts exactly the id max_docs behind it
+        if len(self.documents) > self.max_docs:
+            oldest = doc_id - self.max_docs
+            self.index.remove([oldest])
+            self.documents.pop(oldest, None)
     
     def search(self, query_embedding, k=5):
         """Find k most similar documents"""
-        if not self.embeddings:
-            return []
-        
-        # Cosine similarity
-        similarities = [
-            np.dot(query_embedding, emb) / (np.linalg.norm(query_embedding) * np.linalg.norm(emb))
-            for emb in self.embeddings
-        ]
-        
-        # Get top k indices
-        top_k_idx = np.argsort(similarities)[-k:][::-1]
-        
-        return [self.documents[i] for i in top_k_idx]
+        with instruments.VECTOR_SEARCH_SECONDS.labels('pipeline').time():
+            hits = self.index.search(query_embedding, k=k)
+        return [self.documents[i] for i, _ in hits if i in self.documents]
 
 vector_store = VectorStore()
+instruments.TICKS_RETAINED.set_function(lambda: len(vector_store.documents))
+instruments.VECTORS_INDEXED.set_function(lambda: len(vector_store.index))
+
+# Structured fields kept per document; the LLM sees them as a table, not prose
+RECORD_FIELDS = ('symbol', 'price', 'change', 'change_percent', 'open', 'high', 'low', 'volume', 'timestamp')
+CONTEXT_COLUMNS = ('symbol', 'price', 'change_percent', 'high', 'low', 'volume')
 
 # Step 6: RAG Query Function with Groq
+# Per-query stage timings: logged, returned as `timings` (Pathway's REST
+# endpoints can't set a Server-Timing header) and sampled for /debug/traces
+trace_sampler = tracing.TraceSampler.from_env()
+
 def query_market_with_groq(question: str, k=5):
     """
     RAG query using Groq (FREE, fast)
     """
+    with tracing.trace('pipeline_query') as trace:
+        result = _query_market_with_groq(question, k)
+    result['timings'] = {name: round(ms, 1) for name, ms in trace.durations().items()}
+    result['timings']['total'] = round(trace.total_ms, 1)
+    tracing.log_trace(trace)
+    trace_sampler.offer(trace)
+    return result
+
+def _query_market_with_groq(question, k):
     print(f"💭 Processing query: {question}")
     
     # Generate query embedding
-    query_embedding = embedder.encode(question, convert_to_numpy=True)
+    with tracing.span('embed'):
+        query_embedding = embedding_cache.encode(question)
     
     # Retrieve relevant context
-    relevant_docs = vector_store.search(query_embedding, k=k)
+    with tracing.span('search'):
+        relevant_docs = vector_store.search(query_embedding, k=k)
     
     if not relevant_docs:
         return {
@@ -138,18 +171,21 @@ def query_market_with_groq(question: str, k=5):
             'timestamp': datetime.now().isoformat()
         }
     
-    # Build context
-    context = "\n\n".join(relevant_docs)
+    # Build context (compact table, one row per symbol)
+    with tracing.span('prompt'):
+        context = build_table_context(relevant_docs, columns=CONTEXT_COLUMNS, group_by_sector=False)
     
     # Query Groq (FREE, unlimited)
     try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # RECOMMENDED - Best quality
+        with tracing.span('groq'):
+            response = instruments.groq_completion(
+                groq_client, 'query',
+                model="llama-3.3-70b-versatile",  # RECOMMENDED - Best quality
 
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert Indian stock market analyst with real-time data access.
+                messages=[
+                    {
+                        "role": "system",
+                        "content": """You are an expert Indian stock market analyst with real-time data access.
                     
 Provide insights based on:
 - Current prices and trends
@@ -158,31 +194,27 @@ Provide insights based on:
 - Historical context
 
 Be specific, data-driven, and actionable. Focus on Indian market context (NSE/BSE)."""
-                },
-                {
-                    "role": "user",
-                    "content": f"""Real-time Stock Data:
+                    },
+                    {
+                        "role": "user",
+                        "content": f"""Real-time Stock Data:
 {context}
 
 Question: {question}
 
 Provide detailed analysis based on the data above."""
-                }
-            ],
-            temperature=0.7,
-            max_tokens=1024,
-            top_p=1,
-            stream=False
-        )
+                    }
+                ],
+                temperature=0.7,
+                max_tokens=1024,
+                top_p=1,
+                stream=False
+            )
         
         answer = response.choices[0].message.content
+        instruments.QUERY_TOTAL.labels('groq_ai').inc()
         
-        # Extract symbols from context
-        sources = list(set([
-            line.split(':')[1].strip() 
-            for line in context.split('\n') 
-            if line.startswith('Stock:')
-        ]))
+        sources = sorted({doc['symbol'] for doc in relevant_docs})
         
         return {
             'answer': answer,
@@ -193,6 +225,7 @@ Provide detailed analysis based on the data above."""
         
     except Exception as e:
         print(f"❌ Groq error: {e}")
+        instruments.QUERY_TOTAL.labels('error').inc()
         return {
             'answer': f"Error querying Groq: {str(e)}",
             'sources': [],
@@ -203,7 +236,8 @@ Provide detailed analysis based on the data above."""
 def update_vector_store(table):
     """Background task to update vector store"""
     for row in table:
-        vector_store.add(row['text'], row['embedding'])
+        record = {k: row[k] for k in RECORD_FIELDS}
+        vector_store.add(record, row['embedding'])
 
 # Apply updates
 pw.io.subscribe(stock_with_embeddings, update_vector_store)
@@ -249,6 +283,15 @@ print("✅ Pipeline ready! Starting server on http://localhost:8080")
 
 # Step 10: Run the pipeline
 if __name__ == "__main__":
+    # Prometheus metrics on a side port; Pathway's REST endpoints return JSON only
+    routes = {}
+    if trace_sampler.enabled:
+        routes['/debug/traces'] = lambda params, headers: (200, 'application/json', json.dumps(trace_sampler.dump()))
+    # Token-guarded CPU / memory profiles of this process (PROFILING_TOKEN)
+    profiler = ProfilingAdmin.from_env()
+    routes['/admin/profile/cpu'] = lambda params, headers: profiler.check(headers) or profiler.cpu(params)
+    routes['/admin/profile/memory'] = lambda params, headers: profiler.check(headers) or profiler.memory(params)
+    start_http_server(int(os.getenv('METRICS_PORT', 9108)), routes=routes)
     pw.run(
         monitoring_level=pw.MonitoringLevel.INFO,
         host="0.0.0.0",
@@ -0,0 +1,167 @@
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from pipeline.offline_engine import (
+    render_gainers, render_losers, render_sectors, render_summary, render_symbols, render_volatile
+)
+from pipeline.retrieval import QueryPlan
+
+
+# Questions that need reasoning/opinion rather than numbers go to the LLM
+OPEN_ENDED = re.compile(
+    r"\b(why|should|recommend|advice|advise|outlook|predict|prediction|forecast|"
+    r"expect|explain|news|reason|future|long[- ]term|invest|buy|sell|hold|target)\b"
+)
+GAINERS = re.compile(r"\b(gain|gains|gainers?|gained|winners?|up the most|top performers?|best perform\w*|rall\w*)\b")
+LOSERS = re.compile(r"\b(los(e|er|ers|ing)|lost|decliners?|declin\w*|fell|falling|worst perform\w*|down the most|drops?)\b")
+VOLATILE = re.compile(r"\b(volatil\w*|movers?|moving|swings?|big moves?|fluctuat\w*)\b")
+SECTOR = re.compile(r"\b(sectors?|sectoral|vs\.?|versus|compare|comparison)\b")
+SUMMARY = re.compile(r"\b(summary|summari[sz]e|overview|snapshot|market today|how is the market|breadth)\b")
+PRICE = re.compile(r"\b(price|prices|quote|trading at|how much|worth|value|doing|performing|up or down)\b")
+TOP_N = re.compile(r"\btop\s+(\d{1,2})\b")
+
+# Exemplars for the embedding nearest-intent fallback
+INTENT_EXAMPLES = {
+    'price': [
+        "what is the price of reliance", "current price of tcs", "how much is infosys trading at",
+        "quote for hdfc bank", "how is itc doing today",
+    ],
+    'top_gainers': [
+        "top gainers today", "which stocks gained the most", "best performing stocks", "biggest winners today",
+    ],
+    'top_losers': [
+        "top losers today", "which stocks fell the most", "worst performing stocks", "biggest decliners",
+    ],
+    'volatile': [
+        "which stocks are volatile", "biggest movers today", "high volatility stocks", "stocks with large swings",
+    ],
+    'sector_compare': [
+        "compare banking vs it", "sector performance", "how are the sectors doing", "which sector is best today",
+    ],
+    'market_summary': [
+        "market summary", "how is the market today", "market overview", "summary of today's market",
+    ],
+    'open': [
+        "why did the stock fall", "should i buy this stock", "what is the long term outlook",
+        "explain the impact of the news", "what will happen tomorrow",
+    ],
+}
+
+
+@dataclass
+class Intent:
+    name: str
+    plan: QueryPlan
+    source: str = 'rules'
+    top_n: int = None
+    embedding: object = field(default=None, repr=False)
+
+
+class IntentRouter:
+    """
+    Routes structured questions to computed answers without calling the LLM
+
+    Rules run first; if they don't decide, the question embedding is compared
+    with a handful of exemplar phrasings per intent. Anything open-ended
+    (or below `threshold` similarity) is classified 'open' and goes to Groq.
+    """
+
+    def __init__(self, planner, embedder=None, threshold=0.6):
+        self.planner = planner
+        self.embedder = embedder
+        self.threshold = threshold
+        self._example_matrix = None
+        self._example_labels = []
+
+    def classify(self, question: str) -> Intent:
+        """
+        Classify a question; name == 'open' means it should go to the LLM.
+        If the embedding fallback ran, the question embedding is kept on the
+        Intent so retrieval can reuse it.
+        """
+        text = question.lower()
+        plan = self._scope(self.planner.plan(question))
+        match = TOP_N.search(text)
+        top_n = int(match.group(1)) if match else None
+
+        if OPEN_ENDED.search(text):
+            return Intent('open', plan, 'rules', top_n)
+
+        name = self._rules(text, plan)
+        if name:
+            return Intent(name, plan, 'rules', top_n)
+        if self.embedder is None:
+            return Intent('open', plan, 'rules', top_n)
+
+        embedding = self.embedder.encode(question)
+        name = self._nearest(embedding) or 'open'
+        if name == 'price' and not plan.symbols:
+            name = 'open'
+        return Intent(name, plan, 'embedding', top_n, embedding)
+
+    def answer(self, intent: Intent, stats):
+        """Compute (answer, sources) for a routed intent from the snapshot's MarketStats"""
+        if len(stats) == 0:
+            return None
+        sectors = intent.plan.sectors
+        if intent.name == 'price':
+            answer, sources = render_symbols(stats, intent.plan.symbols)
+            return (answer, sources) if sources else None
+        if intent.name == 'top_gainers':
+            return render_gainers(stats, intent.top_n or 5, sectors)
+        if intent.name == 'top_losers':
+            return render_losers(stats, intent.top_n or 5, sectors)
+        if intent.name == 'volatile':
+            return render_volatile(stats, intent.top_n or 5, sectors)
+        if intent.name == 'sector_compare':
+            return render_sectors(stats, sectors)
+        if intent.name == 'market_summary':
+            return render_summary(stats, intent.top_n or 3)
+        return None
+
+    @staticmethod
+    def _scope(plan):
+        """A symbol named only by a sector word ("infra") means the sector, not a price card"""
+        if not plan.sector_words:
+            return plan
+        return QueryPlan(symbols=plan.symbols - plan.sector_words.keys(),
+                         sectors=plan.sectors | set(plan.sector_words.values()))
+
+    def _rules(self, text, plan):
+        gainers = bool(GAINERS.search(text))
+        losers = bool(LOSERS.search(text))
+        if SUMMARY.search(text) or (gainers and losers):
+            return 'market_summary'
+        if plan.symbols and PRICE.search(text) and not (gainers or losers):
+            return 'price'
+        if gainers:
+            return 'top_gainers'
+        if losers:
+            return 'top_losers'
+        if VOLATILE.search(text):
+            return 'volatile'
+        if len(plan.sectors) >= 2 or (SECTOR.search(text) and not plan.symbols):
+            return 'sector_compare'
+        if plan.sectors and not plan.symbols and PRICE.search(text):
+            return 'sector_compare'
+        if plan.symbols and len(text.split()) <= 3:
+            return 'price'
+        return None
+
+    def _nearest(self, embedding):
+        if self._example_matrix is None:
+            labels, phrases = [], []
+            for label, examples in INTENT_EXAMPLES.items():
+                labels.extend([label] * len(examples))
+                phrases.extend(examples)
+            matrix = np.asarray([self.embedder.encode(p) for p in phrases], dtype=np.float32)
+            self._example_matrix = matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-10)
+            self._example_labels = labels
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = self._example_matrix @ (query / (np.linalg.norm(query) + 1e-10))
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._example_labels[best]
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from pipeline.offline_engine import (
+    render_summary, render_volatile, render_volume_leaders, top_gainers, top_losers
+)
+
+
+# Report fields that change on every rebuild whatever the market did
+REBUILD_FIELDS = ('generated_at', 'cycle')
+
+
+def _movers(stats, indices):
+    return [
+        {
+            'symbol': str(stats.symbols[i]),
+            'name': stats.rows[i].get('name'),
+            'sector': stats.rows[i].get('sector'),
+            'price': float(stats.price[i]),
+            'change_percent': float(stats.change_percent[i]),
+            'volume': int(stats.volume[i]),
+        }
+        for i in indices
+    ]
+
+
+def build_report(stats, cycle=None, top_n=3):
+    """Structured market summary (JSON-ready dict) plus a text rendering"""
+    if len(stats) == 0:
+        return None
+    sectors = [
+        {
+            'sector': str(stats.sector_names[s]),
+            'stocks': int(stats.sector_count[s]),
+            'advancers': int(stats.sector_up[s]),
+            'avg_change_percent': round(float(stats.sector_avg[s]), 2),
+        }
+        for s in np.argsort(-stats.sector_avg, kind='stable')
+    ]
+    summary_text, _ = render_summary(stats, top_n)
+    volatile_text, _ = render_volatile(stats, 5)
+    volume_text, _ = render_volume_leaders(stats, 5)
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'cycle': cycle,
+        'stocks': len(stats),
+        'breadth': {
+            'advancers': stats.advancers,
+            'decliners': stats.decliners,
+            'unchanged': stats.unchanged,
+            'avg_change_percent': round(stats.avg_change, 2),
+        },
+        'sectors': sectors,
+        'top_gainers': _movers(stats, top_gainers(stats, top_n)),
+        'top_losers': _movers(stats, top_losers(stats, top_n)),
+        'most_volatile': _movers(stats, stats.by_volatility[:5]),
+        'volume_leaders': _movers(stats, stats.by_volume[:5]),
+        'text': "\n\n".join([summary_text, volatile_text, volume_text]),
+        'polished_text': None,
+    }
+
+
+class ReportPublisher:
+    """
+    Holds the latest per-cycle report and its ETag
+
+    publish() is called once per fetch cycle. If a `polish` callable is given
+    (e.g. a Groq rewrite of the text), it runs in a background thread and the
+    report is republished with `polished_text` once it returns; a newer cycle
+    always wins over a late polish.
+    """
+
+    def __init__(self, polish=None):
+        self.polish = polish
+        self._lock = threading.Lock()
+        self._report = None
+        self._body = None
+        self._etag = None
+
+    def publish(self, report):
+        if report is None:
+            return
+        with self._lock:
+            self._set(report)
+        if self.polish:
+            threading.Thread(target=self._polish, args=(report,), daemon=True).start()
+
+    def latest(self):
+        """(report, json_body, etag) - all None before the first cycle"""
+        with self._lock:
+            return self._report, self._body, self._etag
+
+    def _set(self, report):
+        body = json.dumps(report, ensure_ascii=False, separators=(',', ':'))
+        # the ETag covers the market content only, so an unchanged market revalidates with a 304
+        content = {k: v for k, v in report.items() if k not in REBUILD_FIELDS}
+        digest = hashlib.sha1(json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        self._report = report
+        self._body = body
+        self._etag = '"' + digest.hexdigest()[:20] + '"'
+
+    def _polish(self, report):
+        try:
+            polished = self.polish(report)
+        except Exception as e:
+            print(f"⚠️  Report polish failed: {str(e)[:80]}")
+            return
+        with self._lock:
+            if self._report is report and polished:
+                self._set(dict(report, polished_text=polished))
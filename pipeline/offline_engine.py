@@ -0,0 +1,241 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+
+ALERT_THRESHOLD = 3.0
+
+
+@dataclass
+class MarketStats:
+    """Vectorised view of one snapshot (one row per symbol)"""
+    rows: list
+    symbols: np.ndarray
+    price: np.ndarray
+    change_percent: np.ndarray
+    volume: np.ndarray
+    day_range: np.ndarray       # (high - low) / price, in %
+    sector_names: np.ndarray
+    sector_codes: np.ndarray
+    sector_count: np.ndarray
+    sector_avg: np.ndarray
+    sector_up: np.ndarray
+    advancers: int
+    decliners: int
+    unchanged: int
+    avg_change: float
+    by_change: np.ndarray       # indices, descending change_percent
+    by_volume: np.ndarray       # indices, descending volume
+    by_volatility: np.ndarray   # indices, descending |change| + day range
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def compute_stats(rows):
+    """Breadth, sector averages, volume/volatility ranks and movers in one NumPy pass"""
+    rows = list(rows)
+    n = len(rows)
+    price = np.fromiter((r['price'] for r in rows), dtype=np.float64, count=n)
+    change = np.fromiter((r['change_percent'] for r in rows), dtype=np.float64, count=n)
+    volume = np.fromiter((r.get('volume', 0) for r in rows), dtype=np.float64, count=n)
+    high = np.fromiter((r.get('high', r['price']) for r in rows), dtype=np.float64, count=n)
+    low = np.fromiter((r.get('low', r['price']) for r in rows), dtype=np.float64, count=n)
+    sectors = np.array([r.get('sector') or 'Unknown' for r in rows])
+
+    day_range = np.divide(high - low, price, out=np.zeros(n), where=price > 0) * 100
+    sector_names, codes = np.unique(sectors, return_inverse=True)
+    sector_count = np.bincount(codes, minlength=len(sector_names))
+    sector_avg = np.bincount(codes, weights=change, minlength=len(sector_names)) / np.maximum(sector_count, 1)
+    sector_up = np.bincount(codes, weights=(change > 0), minlength=len(sector_names)).astype(int)
+
+    return MarketStats(
+        rows=rows,
+        symbols=np.array([r['symbol'] for r in rows]),
+        price=price,
+        change_percent=change,
+        volume=volume,
+        day_range=day_range,
+        sector_names=sector_names,
+        sector_codes=codes,
+        sector_count=sector_count,
+        sector_avg=sector_avg,
+        sector_up=sector_up,
+        advancers=int((change > 0).sum()),
+        decliners=int((change < 0).sum()),
+        unchanged=int((change == 0).sum()),
+        avg_change=float(change.mean()) if n else 0.0,
+        by_change=np.argsort(-change, kind='stable'),
+        by_volume=np.argsort(-volume, kind='stable'),
+        by_volatility=np.argsort(-(np.abs(change) + day_range), kind='stable'),
+    )
+
+
+# ----------------------------------------------------------------------
+# Templates
+# ----------------------------------------------------------------------
+
+def _line(stats, i):
+    return f"**{stats.symbols[i]}** ₹{stats.price[i]:.2f} ({stats.change_percent[i]:+.2f}%)"
+
+
+def _numbered(stats, indices):
+    return "\n".join(f"{rank}. {_line(stats, i)}" for rank, i in enumerate(indices, 1))
+
+
+def _subset(stats, indices, sectors=None):
+    """Restrict a ranking to the given sectors (if any match)"""
+    if not sectors:
+        return indices
+    wanted = np.isin(stats.sector_names[stats.sector_codes[indices]], list(sectors))
+    return indices[wanted] if wanted.any() else indices
+
+
+def render_breadth(stats):
+    return (f"- Breadth: {stats.advancers} advancing, {stats.decliners} declining, "
+            f"{stats.unchanged} unchanged | average change {stats.avg_change:+.2f}%")
+
+
+def top_gainers(stats, n=5, sectors=None):
+    """Indices of the n biggest advancers; fewer when fewer are up, never a flat or falling stock"""
+    ranked = _subset(stats, stats.by_change, sectors)
+    return ranked[stats.change_percent[ranked] > 0][:n]
+
+
+def top_losers(stats, n=5, sectors=None):
+    """Indices of the n biggest decliners; fewer when fewer are down, never a flat or rising stock"""
+    ranked = _subset(stats, stats.by_change[::-1], sectors)
+    return ranked[stats.change_percent[ranked] < 0][:n]
+
+
+def render_gainers(stats, n=5, sectors=None):
+    top = top_gainers(stats, n, sectors)
+    body = _numbered(stats, top) if len(top) else "No advancing stocks."
+    return "**Top Gainers:**\n" + body, stats.symbols[top].tolist()
+
+
+def render_losers(stats, n=5, sectors=None):
+    top = top_losers(stats, n, sectors)
+    body = _numbered(stats, top) if len(top) else "No declining stocks."
+    return "**Top Losers:**\n" + body, stats.symbols[top].tolist()
+
+
+def render_volume_leaders(stats, n=5, sectors=None):
+    top = _subset(stats, stats.by_volume, sectors)[:n]
+    lines = [f"{rank}. {_line(stats, i)} | volume {stats.volume[i]:,.0f}" for rank, i in enumerate(top, 1)]
+    return "**Volume Leaders:**\n" + "\n".join(lines), stats.symbols[top].tolist()
+
+
+def render_volatile(stats, n=5, sectors=None):
+    top = _subset(stats, stats.by_volatility, sectors)[:n]
+    alerts = int((np.abs(stats.change_percent) > ALERT_THRESHOLD).sum())
+    lines = [
+        f"{rank}. {_line(stats, i)} | day range {stats.day_range[i]:.2f}%"
+        + (' ⚠️' if abs(stats.change_percent[i]) > ALERT_THRESHOLD else '')
+        for rank, i in enumerate(top, 1)
+    ]
+    header = f"**Most Volatile Stocks:** ({alerts} above the {ALERT_THRESHOLD:.0f}% alert threshold)\n"
+    return header + "\n".join(lines), stats.symbols[top].tolist()
+
+
+def render_sectors(stats, sectors=None):
+    order = np.argsort(-stats.sector_avg, kind='stable')
+    if sectors:
+        order = [s for s in order if stats.sector_names[s] in sectors] or order
+    lines, sources = [], []
+    for s in order:
+        members = np.flatnonzero(stats.sector_codes == s)
+        best = members[np.argmax(stats.change_percent[members])]
+        worst = members[np.argmin(stats.change_percent[members])]
+        lines.append(
+            f"- **{stats.sector_names[s]}**: avg {stats.sector_avg[s]:+.2f}% | "
+            f"{stats.sector_up[s]}/{stats.sector_count[s]} up | "
+            f"best {stats.symbols[best]} ({stats.change_percent[best]:+.2f}%) | "
+            f"worst {stats.symbols[worst]} ({stats.change_percent[worst]:+.2f}%)"
+        )
+        sources.append(str(stats.symbols[best]))
+    return "**Sector Performance:**\n" + "\n".join(lines), sources
+
+
+def render_summary(stats, n=3):
+    gainers, gainer_syms = render_gainers(stats, n)
+    losers, loser_syms = render_losers(stats, n)
+    best = int(np.argmax(stats.sector_avg))
+    worst = int(np.argmin(stats.sector_avg))
+    text = (
+        f"**Market Summary** ({len(stats)} stocks)\n"
+        f"{render_breadth(stats)}\n"
+        f"- Strongest sector: {stats.sector_names[best]} ({stats.sector_avg[best]:+.2f}%) | "
+        f"weakest: {stats.sector_names[worst]} ({stats.sector_avg[worst]:+.2f}%)\n\n"
+        f"{gainers.replace('**Top Gainers:**', f'**Top {n} Gainers:**')}\n\n"
+        f"{losers.replace('**Top Losers:**', f'**Top {n} Losers:**')}"
+    )
+    return text, gainer_syms + loser_syms
+
+
+def render_symbols(stats, symbols):
+    index = {s: i for i, s in enumerate(stats.symbols.tolist())}
+    lines, sources = [], []
+    for symbol in sorted(symbols):
+        i = index.get(symbol)
+        if i is None:
+            continue
+        r = stats.rows[i]
+        rank = int(np.flatnonzero(stats.by_change == i)[0]) + 1
+        lines.append(
+            f"{_line(stats, i)} — {r.get('name', symbol)}, {r.get('sector', 'Unknown')}\n"
+            f"  Day range ₹{r.get('low', 0):.2f} - ₹{r.get('high', 0):.2f} ({stats.day_range[i]:.2f}%) | "
+            f"Volume {stats.volume[i]:,.0f} | #{rank} of {len(stats)} by change"
+        )
+        sources.append(symbol)
+    return "\n".join(lines), sources
+
+
+# ----------------------------------------------------------------------
+# Offline responder
+# ----------------------------------------------------------------------
+
+_GAIN = re.compile(r"\b(gain\w*|up|increase\w*|rise|rising|best|top perform\w*|winners?)\b")
+_LOSE = re.compile(r"\b(los\w*|down|fall\w*|fell|declin\w*|drop\w*|worst)\b")
+_VOLATILE = re.compile(r"\b(volatil\w*|movers?|swings?|risk\w*)\b")
+_VOLUME = re.compile(r"\b(volume|active|traded|liquid\w*)\b")
+_SECTOR = re.compile(r"\b(sectors?|compare|vs\.?|versus|industr\w*)\b")
+
+
+def offline_answer(question: str, stats: MarketStats, symbols=(), sectors=()):
+    """
+    Data-driven answer when Groq is unavailable
+    Picks the sections the question asks about and renders them from `stats`.
+    Returns (answer, sources).
+    """
+    if len(stats) == 0:
+        return "No market data available yet.", []
+
+    text = question.lower()
+    sections, sources = [], []
+
+    def add(rendered):
+        body, syms = rendered
+        if body:
+            sections.append(body)
+            sources.extend(s for s in syms if s not in sources)
+
+    if symbols:
+        add(render_symbols(stats, symbols))
+    if _GAIN.search(text):
+        add(render_gainers(stats, sectors=sectors))
+    if _LOSE.search(text):
+        add(render_losers(stats, sectors=sectors))
+    if _VOLATILE.search(text):
+        add(render_volatile(stats, sectors=sectors))
+    if _VOLUME.search(text):
+        add(render_volume_leaders(stats, sectors=sectors))
+    if sectors or _SECTOR.search(text):
+        add(render_sectors(stats, sectors))
+    if not sections:
+        add(render_summary(stats))
+    else:
+        sections.insert(0, f"**Market:** {len(stats)} stocks\n{render_breadth(stats)}")
+
+    return "Based on the latest market data:\n\n" + "\n\n".join(sections), sources
@@ -0,0 +1,189 @@
+import re
+import threading
+from dataclasses import dataclass, field
+
+
+# Words in company names that say nothing about which company is meant
+GENERIC_NAME_WORDS = {
+    'india', 'indian', 'limited', 'ltd', 'industries', 'bank', 'company', 'corporation',
+    'services', 'financial', 'finance', 'life', 'insurance', 'general', 'systems',
+    'technologies', 'products', 'motors', 'motor', 'laboratories', 'hospitals', 'consumer',
+    'state', 'of', 'and', 'the', 'natural', 'gas', 'oil', 'power', 'grid', 'coal',
+    'group', 'tata', 'tech', 'bajaj', 'hdfc', 'icici', 'sbi', 'infotech', 'paints',
+}
+
+# Trailing words of a registered name that people leave out ("Power Grid Corporation" -> "power grid")
+CORPORATE_SUFFIXES = {'limited', 'ltd', 'corporation', 'corp', 'company', 'co', 'of', 'india'}
+
+# Sector keywords -> canonical sector name used in the universe metadata
+SECTOR_KEYWORDS = {
+    'Banking': ['banking', 'bank', 'banks', 'financial', 'financials', 'finance', 'insurance', 'nbfc'],
+    'IT': ['tech', 'technology', 'software', 'it sector', 'it stocks', 'it companies', 'it services'],
+    'Energy': ['energy', 'oil', 'gas', 'power', 'coal', 'utilities'],
+    'FMCG': ['fmcg', 'consumer goods', 'staples'],
+    'Auto': ['auto', 'autos', 'automobile', 'automobiles', 'automotive', 'car', 'cars', 'two-wheeler'],
+    'Pharma': ['pharma', 'pharmaceutical', 'pharmaceuticals', 'healthcare', 'hospital', 'hospitals', 'drug'],
+    'Consumer': ['consumer durables', 'paints', 'jewellery', 'retail'],
+    'Telecom': ['telecom', 'telecommunication', 'mobile operator'],
+    'Aviation': ['aviation', 'airline', 'airlines'],
+    'Infrastructure': ['infrastructure', 'infra', 'construction', 'engineering', 'capital goods'],
+}
+
+
+# Every sector keyword, for telling a company name apart from a sector word
+SECTOR_WORDS = {kw for kws in SECTOR_KEYWORDS.values() for kw in kws}
+
+
+@dataclass
+class QueryPlan:
+    """What a question is about, as extracted by RetrievalPlanner"""
+    symbols: set = field(default_factory=set)
+    sectors: set = field(default_factory=set)
+    # symbol -> sector, for symbols named only by a sector word ("infra" for a stock INFRA)
+    sector_words: dict = field(default_factory=dict)
+
+    @property
+    def filtered(self):
+        return bool(self.symbols or self.sectors)
+
+
+class SymbolIndex:
+    """Inverted index: symbol -> doc ids and sector -> doc ids, maintained at ingest"""
+
+    def __init__(self):
+        self._by_symbol = {}
+        self._by_sector = {}
+        self._docs = {}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id, symbol, sector=None):
+        with self._lock:
+            self._docs[doc_id] = (symbol, sector)
+            self._by_symbol.setdefault(symbol, set()).add(doc_id)
+            if sector:
+                self._by_sector.setdefault(sector, set()).add(doc_id)
+
+    def remove(self, doc_ids):
+        with self._lock:
+            for doc_id in doc_ids:
+                entry = self._docs.pop(doc_id, None)
+                if entry is None:
+                    continue
+                symbol, sector = entry
+                self._by_symbol.get(symbol, set()).discard(doc_id)
+                if sector:
+                    self._by_sector.get(sector, set()).discard(doc_id)
+
+    def lookup(self, plan):
+        """Return the doc ids matching a plan, or None when the plan has no filter"""
+        if not plan.filtered:
+            return None
+        with self._lock:
+            ids = set()
+            for symbol in plan.symbols:
+                ids |= self._by_symbol.get(symbol, set())
+            for sector in plan.sectors:
+                ids |= self._by_sector.get(sector, set())
+            return ids
+
+    def __len__(self):
+        return len(self._docs)
+
+
+class RetrievalPlanner:
+    """
+    Extracts symbols, company names and sectors from a question
+
+    `stocks` maps symbol -> company name and `sectors` maps symbol -> sector,
+    using the same bare symbols stored on ticks (no `.NS` suffix).
+    """
+
+    def __init__(self, stocks, sectors=None):
+        self.symbols = set(stocks)
+        self.sectors = sectors or {}
+        self._aliases = self._build_aliases(stocks)
+        self._alias_pattern = self._compile(self._aliases)
+        self._sector_pattern = self._compile(
+            {kw: sector for sector, kws in SECTOR_KEYWORDS.items() for kw in kws}
+        )
+        self._symbol_tokens = {s.upper(): s for s in self.symbols}
+
+    def plan(self, question: str) -> QueryPlan:
+        plan = QueryPlan()
+        text = question.lower()
+
+        # Company names first, then blank them out so "HDFC Bank" doesn't also hit Banking
+        for match in self._alias_pattern.finditer(text):
+            symbols = self._aliases[match.group(0)]
+            plan.symbols |= symbols
+            self._note_sector_word(plan, symbols, match.group(0))
+        text = self._alias_pattern.sub(' ', text)
+
+        for token in re.findall(r"[A-Za-z0-9&\-]+", question):
+            symbol = self._symbol_tokens.get(token.upper())
+            # Two-letter symbols (LT) must be written in caps to avoid matching plain words
+            if symbol and (len(symbol) > 2 or token.isupper()):
+                plan.symbols.add(symbol)
+                self._note_sector_word(plan, {symbol}, token.lower())
+
+        for match in self._sector_pattern.finditer(text):
+            plan.sectors.add(self._sector_keyword(match.group(0)))
+        # Bare "IT" is only a sector when written in caps ("it" is a pronoun)
+        if re.search(r"\bIT\b", question):
+            plan.sectors.add('IT')
+
+        known_sectors = set(self.sectors.values())
+        if known_sectors:
+            plan.sectors &= known_sectors
+        return plan
+
+    def _note_sector_word(self, plan, symbols, words):
+        if self._sector_pattern.fullmatch(words):
+            for symbol in symbols:
+                plan.sector_words[symbol] = self._sector_keyword(words)
+
+    @staticmethod
+    def _sector_keyword(keyword):
+        for sector, kws in SECTOR_KEYWORDS.items():
+            if keyword in kws:
+                return sector
+        return keyword
+
+    @staticmethod
+    def _build_aliases(stocks):
+        aliases = {}
+        for symbol, name in stocks.items():
+            name = name.lower().replace('é', 'e').replace("'s", '')
+            words = re.findall(r"[a-z0-9&']+", name)
+            candidates = {name, ' '.join(words)}
+            # the symbol spelled out over the name ("sun pharma" for SUNPHARMA, Sun Pharmaceutical)
+            key = re.sub(r"[^a-z0-9]", '', symbol.lower())
+            if len(words) >= 2 and key.startswith(words[0]):
+                rest = key[len(words[0]):]
+                if len(rest) >= 3 and words[1].startswith(rest):
+                    candidates.add(f"{words[0]} {rest}")
+            # the name as said, each legal suffix dropped in turn, while it still names one company
+            short = list(words)
+            while len(short) > 1 and short[-1] in CORPORATE_SUFFIXES:
+                short.pop()
+                if len(short) > 1 or (len(short[0]) >= 3 and short[0] not in GENERIC_NAME_WORDS):
+                    candidates.add(' '.join(short))
+            distinctive = [w for w in words if w not in GENERIC_NAME_WORDS]
+            if distinctive and len(' '.join(distinctive)) >= 4:
+                candidates.add(' '.join(distinctive))
+                if len(distinctive[0]) >= 4:
+                    candidates.add(distinctive[0])
+            for alias in candidates:
+                if alias:
+                    aliases.setdefault(alias, set()).add(symbol)
+        # A single word must name exactly one company and never a sector ("auto" is the Auto
+        # sector, not Bajaj Auto; "mahindra" is both M&M and Tech Mahindra)
+        return {alias: symbols for alias, symbols in aliases.items()
+                if ' ' in alias or (alias not in SECTOR_WORDS and len(symbols) == 1)}
+
+    @staticmethod
+    def _compile(keywords):
+        if not keywords:
+            return re.compile(r'(?!x)x')
+        ordered = sorted(keywords, key=len, reverse=True)
+        return re.compile(r"(?<![a-z0-9])(?:" + '|'.join(re.escape(k) for k in ordered) + r")(?![a-z0-9])")
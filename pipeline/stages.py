@@ -0,0 +1,166 @@
+import collections
+import threading
+import time
+
+BLOCK = 'block'             # producer waits for space (backpressure)
+DROP_OLDEST = 'drop_oldest' # oldest queued item is discarded
+CONFLATE = 'conflate'       # a queued item with the same key is replaced in place
+
+
+class StageQueue:
+    """
+    Bounded queue with a full/duplicate policy
+
+    With CONFLATE, items are keyed by `key(item)`: putting an item whose key
+    is already queued replaces it (latest wins, position kept), so a backlog
+    never holds two ticks for the same symbol. New keys block when full.
+    """
+
+    def __init__(self, maxsize=256, policy=BLOCK, key=None):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key
+        self._items = collections.deque()
+        self._pending = {}
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.conflated = 0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item):
+        with self._cond:
+            if self.policy == CONFLATE:
+                k = self.key(item)
+                if k in self._pending:
+                    self._pending[k] = item
+                    self.conflated += 1
+                    return
+                while len(self._items) >= self.maxsize:
+                    self._cond.wait()
+                self._pending[k] = item
+                self._items.append(k)
+            elif self.policy == DROP_OLDEST:
+                if len(self._items) >= self.maxsize:
+                    self._items.popleft()
+                    self.dropped += 1
+                self._items.append(item)
+            else:
+                while len(self._items) >= self.maxsize:
+                    self._cond.wait()
+                self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self):
+        with self._cond:
+            while not self._items:
+                self._cond.wait()
+            item = self._items.popleft()
+            if self.policy == CONFLATE:
+                item = self._pending.pop(item)
+            self._cond.notify_all()
+            return item
+
+
+class Stage:
+    """
+    One pipeline stage: a bounded input queue drained by `workers` threads
+
+    fn(item) returns the item for the next stage, None to stop it here, or a
+    list to emit several. `min_interval` paces each worker (items arriving
+    meanwhile queue up, and conflate under CONFLATE). Metrics: processed/
+    emitted/errors, queue depth, drops/conflations, busy time and recent
+    throughput.
+    """
+
+    def __init__(self, name, fn, workers=1, maxsize=256, policy=BLOCK, key=None, min_interval=0.0):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.min_interval = min_interval
+        self.queue = StageQueue(maxsize, policy, key)
+        self.downstream = None
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+        self._recent = collections.deque(maxlen=10_000)   # completion times
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._run, name=f"stage-{self.name}-{i}", daemon=True).start()
+        return self
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            started = time.perf_counter()
+            try:
+                result = self.fn(item)
+            except Exception as e:
+                result = None
+                with self._lock:
+                    self.errors += 1
+                print(f"⚠️  Stage {self.name} error: {str(e)[:80]}")
+            elapsed = time.perf_counter() - started
+
+            results = result if isinstance(result, list) else ([] if result is None else [result])
+            with self._lock:
+                self.processed += 1
+                self.emitted += len(results)
+                self.busy += elapsed
+                self._recent.append(time.monotonic())
+            if self.downstream is not None:
+                for r in results:
+                    self.downstream.put(r)
+            if self.min_interval > elapsed:
+                time.sleep(self.min_interval - elapsed)
+
+    def throughput(self, window=10.0):
+        """Items/s completed over the last `window` seconds"""
+        cutoff = time.monotonic() - window
+        with self._lock:
+            return sum(1 for t in self._recent if t >= cutoff) / window
+
+    def stats(self):
+        rate = self.throughput()
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'policy': self.queue.policy,
+                'queue': len(self.queue),
+                'capacity': self.queue.maxsize,
+                'processed': self.processed,
+                'emitted': self.emitted,
+                'errors': self.errors,
+                'dropped': self.queue.dropped,
+                'conflated': self.queue.conflated,
+                'per_s': round(rate, 2),
+                'avg_ms': round(self.busy / self.processed * 1000, 2) if self.processed else None,
+            }
+
+
+class StagePipeline:
+    """Stages chained in order; put() feeds the first one"""
+
+    def __init__(self, *stages):
+        self.stages = list(stages)
+        for upstream, downstream in zip(self.stages, self.stages[1:]):
+            upstream.downstream = downstream
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def put(self, item):
+        self.stages[0].put(item)
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
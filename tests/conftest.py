@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The repo runs from its root (namespace packages, no install step)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+import pytest
+
+from pipeline.ann_index import ANNIndex
+
+
+def unit_vectors(n, dim=8, seed=0):
+    v = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'exact_threshold': 4},            # trains with fewer live vectors than the 16-cluster floor
+    {'exact_threshold': 4, 'nlist': 64},  # explicit nlist above the live count
+])
+def test_training_on_few_vectors(kwargs):
+    index = ANNIndex(dim=8, nprobe=4, **kwargs)
+    vectors = unit_vectors(10)
+    for i, v in enumerate(vectors):
+        index.add(i, v)
+    assert len(index) == 10
+
+    hits = index.search(vectors[3], k=1)
+    assert hits[0][0] == 3
+
+
+def clustered_vectors(n, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim))
+    v = centres[rng.integers(clusters, size=n)] + 0.3 * rng.standard_normal((n, dim))
+    v = v.astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def trained_index(vectors, **kwargs):
+    index = ANNIndex(dim=vectors.shape[1], exact_threshold=500, **kwargs)
+    index.add_batch(list(range(len(vectors))), vectors)
+    assert index.trained
+    return index
+
+
+def test_recall_against_brute_force():
+    vectors = clustered_vectors(4_000)
+    index = trained_index(vectors, nprobe=32)
+    queries = clustered_vectors(100, seed=1)
+    k, found = 10, 0
+    for q in queries:
+        exact = set(np.argsort(-(vectors @ q))[:k].tolist())
+        found += len(exact & {doc_id for doc_id, _ in index.search(q, k=k)})
+    assert found / (k * len(queries)) >= 0.95
+
+
+@pytest.mark.parametrize('exact_threshold', [10_000, 500])   # exact scan, then IVF lists
+def test_removed_and_expired_vectors_leave_search(exact_threshold):
+    vectors = clustered_vectors(2_000)
+    index = ANNIndex(dim=32, exact_threshold=exact_threshold, nprobe=64)
+    index.add_batch(list(range(2_000)), vectors, timestamps=np.arange(2_000, dtype=np.float64))
+
+    index.remove([7, 8])
+    assert index.expire(older_than=100) == 98      # ids 0..99, less the two already removed
+    assert len(index) == 1_900
+    for doc_id in (7, 8, 50, 99):
+        hits = index.search(vectors[doc_id], k=5)
+        assert all(hit >= 100 for hit, _ in hits)
+    assert index.search(vectors[100], k=1)[0][0] == 100
+
+
+def test_search_and_insert_do_not_wait_for_training():
+    vectors = clustered_vectors(1_000)
+    index = ANNIndex(dim=32, exact_threshold=500, nprobe=64)
+    index.add_batch(list(range(499)), vectors[:499])
+
+    started, release = threading.Event(), threading.Event()
+    kmeans = index._kmeans
+
+    def slow_kmeans(sample, nlist):
+        started.set()
+        release.wait(5)
+        return kmeans(sample, nlist)
+
+    index._kmeans = slow_kmeans
+    trainer = threading.Thread(target=index.add, args=(499, vectors[499]))
+    trainer.start()
+    assert started.wait(5)
+
+    # training is parked in k-means: the index stays usable meanwhile
+    assert index.search(vectors[3], k=1)[0][0] == 3
+    index.add_batch(list(range(500, 1_000)), vectors[500:])
+    index.remove([10])
+    release.set()
+    trainer.join(5)
+
+    assert index.trained and len(index) == 999
+    for doc_id in (3, 499, 750, 999):
+        assert index.search(vectors[doc_id], k=1)[0][0] == doc_id
+    assert all(hit != 10 for hit, _ in index.search(vectors[10], k=5))
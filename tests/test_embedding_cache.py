@@ -0,0 +1,83 @@
+import numpy as np
+
+from pipeline.embedding_cache import DiskTier, EmbeddingCache, content_key
+
+
+def digest(i, last=1):
+    """20-byte key; last=0 ends it in a NUL byte"""
+    return i.to_bytes(4, 'big') + b'\x07' * 15 + bytes([last])
+
+
+def vector(i, dim=4):
+    return np.full(dim, i, dtype=np.float32)
+
+
+def test_keys_ending_in_nul_survive_reopen(tmp_path):
+    disk = DiskTier(str(tmp_path), dim=4, capacity=8)
+    keys = [digest(i, last=0) for i in range(4)]
+    for i, key in enumerate(keys):
+        disk.put(key, vector(i))
+    disk.flush()
+
+    reopened = DiskTier(str(tmp_path), dim=4, capacity=8)
+    assert len(reopened) == 4
+    for i, key in enumerate(keys):
+        np.testing.assert_array_equal(reopened.get(key), vector(i))
+
+
+def test_ring_wrap_evicts_the_overwritten_key(tmp_path):
+    disk = DiskTier(str(tmp_path), dim=4, capacity=3)
+    keys = [digest(i, last=i % 2) for i in range(5)]
+    for i, key in enumerate(keys):
+        disk.put(key, vector(i))
+
+    # slots 0 and 1 were reused by keys 3 and 4
+    assert disk.get(keys[0]) is None
+    assert disk.get(keys[1]) is None
+    for i in (2, 3, 4):
+        np.testing.assert_array_equal(disk.get(keys[i]), vector(i))
+    assert len(disk) == 3
+
+
+def test_ring_wrap_after_reopen(tmp_path):
+    disk = DiskTier(str(tmp_path), dim=4, capacity=3)
+    keys = [digest(i, last=0) for i in range(5)]
+    for i, key in enumerate(keys[:3]):
+        disk.put(key, vector(i))
+    disk.flush()
+
+    disk = DiskTier(str(tmp_path), dim=4, capacity=3)
+    for i, key in enumerate(keys[3:], start=3):
+        disk.put(key, vector(i))
+    disk.flush()
+
+    disk = DiskTier(str(tmp_path), dim=4, capacity=3)
+    assert disk.get(keys[0]) is None
+    assert disk.get(keys[1]) is None
+    for i in (2, 3, 4):
+        np.testing.assert_array_equal(disk.get(keys[i]), vector(i))
+
+
+def test_nul_terminated_content_keys_hit_after_restart(tmp_path):
+    texts = [f"tick {i}" for i in range(2000)]
+    nul_texts = [t for t in texts if content_key('m', t)[-1] == 0]
+    assert nul_texts   # ~1 in 256 digests end in NUL
+
+    class Embedder:
+        calls = 0
+
+        def encode(self, text, convert_to_numpy=True):
+            Embedder.calls += 1
+            return np.full(4, len(text), dtype=np.float32)
+
+    cache = EmbeddingCache(Embedder(), 'm', disk_dir=str(tmp_path), disk_capacity=64)
+    for text in nul_texts:
+        cache.encode(text)
+    cache.flush()
+
+    restarted = EmbeddingCache(Embedder(), 'm', disk_dir=str(tmp_path), disk_capacity=64)
+    calls = Embedder.calls
+    for text in nul_texts:
+        restarted.encode(text)
+    assert Embedder.calls == calls
+    assert restarted.stats()['disk_hits'] == len(nul_texts)
@@ -0,0 +1,111 @@
+import random
+import threading
+
+import pytest
+import requests
+
+from benchmarks.fake_upstream import FakeUpstream, serve
+from connectors.fetch_scheduler import FetchScheduler, RateLimited
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def upstream():
+    fake = FakeUpstream(seed=0)
+    server = serve(fake, 0)
+    yield fake, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def fetcher(url):
+    def fetch(symbol):
+        response = requests.get(f"{url}/stock", params={'symbol': symbol}, timeout=5)
+        if response.status_code == 429:
+            raise RateLimited("429 Too Many Requests")
+        response.raise_for_status()
+        return response.json()['data']
+    return fetch
+
+
+def scheduler(clock):
+    return FetchScheduler(rate=100.0, burst=10, backoff_base=5.0, backoff_cap=60.0,
+                          clock=clock, sleep=clock.sleep, rng=random.Random(0))
+
+
+def test_429_backs_off_probes_and_recovers(upstream):
+    fake, url = upstream
+    clock = FakeClock()
+    sched = scheduler(clock)
+    fetch = fetcher(url)
+
+    ok, quote = sched.call('http', fetch, 'TCS')
+    assert ok and quote['current_price'] > 0
+
+    # outage: the first 429 opens the backoff window and halves the rate
+    fake.outage = (0, float('inf'))
+    ok, error = sched.call('http', fetch, 'TCS')
+    assert ok is False and isinstance(error, RateLimited)
+    assert sched.limited
+    assert sched.bucket.rate == pytest.approx(50.0)
+
+    # inside the window calls are skipped without touching the upstream
+    requests_before = fake.counts['429']
+    assert sched.call('http', fetch, 'TCS') == (None, None)
+    assert sched.call('http', fetch, 'INFY') == (None, None)
+    assert fake.counts['429'] == requests_before
+
+    # after the window one probe goes out; it fails, so the window doubles
+    window = sched._blocked_until - clock.now
+    clock.now = sched._blocked_until
+    ok, _ = sched.call('http', fetch, 'TCS')
+    assert ok is False
+    assert sched.backoff.attempt == 2
+    assert sched._blocked_until - clock.now > window / 2
+    assert sched.call('http', fetch, 'TCS') == (None, None)
+
+    # upstream back: the next probe succeeds and closes the window
+    fake.outage = None
+    clock.now = sched._blocked_until
+    ok, _ = sched.call('http', fetch, 'TCS')
+    assert ok is True
+    assert not sched.limited
+    for _ in range(5):
+        assert sched.call('http', fetch, 'TCS')[0] is True
+
+    stats = sched.report()['sources']['http']
+    assert stats['rate_limited'] == 2
+    assert stats['skipped'] == 3
+    assert stats['attempts'] == stats['successes'] + stats['rate_limited'] == 9
+    # AIMD: rate creeps back up by 5% of the limit per success
+    assert sched.bucket.rate == pytest.approx(25.0 + 6 * 5.0)
+
+
+def test_counts_are_exact_under_concurrent_workers():
+    clock = FakeClock()
+    sched = FetchScheduler(rate=1e9, burst=1e9, clock=clock, sleep=clock.sleep)
+    workers, calls = 8, 2000
+
+    def work():
+        for _ in range(calls):
+            sched.call('yfinance', lambda: 1)
+
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = sched.source('yfinance')
+    assert stats.attempts == stats.successes == workers * calls
+    assert stats.success_rate == 1.0
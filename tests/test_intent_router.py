@@ -0,0 +1,96 @@
+import pytest
+
+from connectors.universe import Universe
+from pipeline.intent_router import Intent, IntentRouter
+from pipeline.offline_engine import compute_stats
+from pipeline.retrieval import QueryPlan, RetrievalPlanner
+
+
+def row(symbol, sector, change):
+    return {'symbol': symbol, 'sector': sector, 'price': 100.0, 'change_percent': change, 'volume': 1_000}
+
+
+ROWS = [
+    row('ONGC', 'Energy', -1.5),
+    row('NTPC', 'Energy', 0.8),
+    row('POWERGRID', 'Energy', 0.4),
+    row('TCS', 'IT', -2.0),
+    row('INFY', 'IT', -0.5),
+    row('WIPRO', 'IT', 1.2),
+]
+
+
+def answer(name, top_n, sectors=()):
+    router = IntentRouter(planner=None)
+    return router.answer(Intent(name, QueryPlan(sectors=set(sectors)), top_n=top_n), compute_stats(ROWS))
+
+
+def test_sector_losers_are_not_padded_with_advancers():
+    text, sources = answer('top_losers', 3, {'Energy'})
+    assert sources == ['ONGC']
+    assert 'NTPC' not in text and 'POWERGRID' not in text
+
+
+def test_sector_gainers_are_not_padded_with_decliners():
+    _, sources = answer('top_gainers', 3, {'IT'})
+    assert sources == ['WIPRO']
+
+
+def test_losers_across_the_market():
+    _, sources = answer('top_losers', 5)
+    assert sources == ['TCS', 'ONGC', 'INFY']
+
+
+def test_no_decliners_says_so():
+    stats = compute_stats([r for r in ROWS if r['change_percent'] > 0])
+    text, sources = IntentRouter(planner=None).answer(Intent('top_losers', QueryPlan(), top_n=5), stats)
+    assert sources == []
+    assert 'No declining stocks' in text
+
+
+# End to end: the real planner over the real universe, then the router's computed answer
+PLANNED_ROWS = ROWS + [
+    row('MARUTI', 'Auto', -0.7),
+    row('BAJAJ-AUTO', 'Auto', 1.1),
+    row('TATAMOTORS', 'Auto', 0.3),
+    row('SUNPHARMA', 'Pharma', 0.6),
+]
+
+
+@pytest.fixture(scope='module')
+def router():
+    universe = Universe.from_env()
+    return IntentRouter(RetrievalPlanner({i.symbol: i.name for i in universe.instruments},
+                                         {i.symbol: i.sector for i in universe.instruments}))
+
+
+def routed(router, question):
+    intent = router.classify(question)
+    return intent, router.answer(intent, compute_stats(PLANNED_ROWS))
+
+
+def test_auto_sector_question_is_not_a_bajaj_auto_price_card(router):
+    intent, (text, _) = routed(router, "how is the auto sector doing")
+    assert intent.name == 'sector_compare'
+    assert intent.plan.sectors == {'Auto'} and not intent.plan.symbols
+    assert '**Auto**' in text
+
+
+def test_losers_in_auto_stay_in_auto(router):
+    intent, (_, sources) = routed(router, "top 3 losers in auto")
+    assert intent.name == 'top_losers'
+    assert sources == ['MARUTI']
+
+
+def test_company_price_card(router):
+    intent, (_, sources) = routed(router, "sun pharma price")
+    assert intent.name == 'price'
+    assert sources == ['SUNPHARMA']
+
+
+def test_symbol_named_by_a_sector_word_is_scoped_to_the_sector():
+    planner = RetrievalPlanner({'INFRA': 'Infra Holdings', 'LT': 'Larsen & Toubro'},
+                               {'INFRA': 'Infrastructure', 'LT': 'Infrastructure'})
+    intent = IntentRouter(planner).classify("how is infra doing")
+    assert intent.name == 'sector_compare'
+    assert intent.plan.symbols == set() and intent.plan.sectors == {'Infrastructure'}
@@ -0,0 +1,30 @@
+import time
+
+from pipeline.market_report import ReportPublisher, build_report
+from pipeline.offline_engine import compute_stats
+
+
+def row(symbol, change):
+    return {'symbol': symbol, 'sector': 'IT', 'price': 100.0, 'change_percent': change, 'volume': 1_000}
+
+
+UP_DAY = [row('TCS', 1.5), row('INFY', 0.4), row('WIPRO', -0.3), row('HCLTECH', 0.9)]
+
+
+def test_json_movers_match_the_text_on_an_up_day():
+    report = build_report(compute_stats(UP_DAY), top_n=3)
+    assert [m['symbol'] for m in report['top_gainers']] == ['TCS', 'HCLTECH', 'INFY']
+    assert [m['symbol'] for m in report['top_losers']] == ['WIPRO']
+
+
+def test_etag_is_stable_across_rebuilds_of_the_same_market():
+    publisher = ReportPublisher()
+    publisher.publish(build_report(compute_stats(UP_DAY), cycle=1))
+    _, _, first = publisher.latest()
+    time.sleep(0.01)
+    publisher.publish(build_report(compute_stats(UP_DAY), cycle=2))
+    _, _, second = publisher.latest()
+    assert first == second
+
+    publisher.publish(build_report(compute_stats(UP_DAY[:-1] + [row('HCLTECH', -0.9)]), cycle=3))
+    assert publisher.latest()[2] != second
@@ -0,0 +1,41 @@
+from connectors.priority_scheduler import PriorityPoller
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+SYMBOLS = [f"S{i}" for i in range(12)]
+
+
+def poller_after_first_fetch(clock):
+    # 24 requests a minute in 10 s rounds: 4 per round, with up to 8 banked
+    poller = PriorityPoller(SYMBOLS, base_interval=60.0, round_seconds=10.0, budget_per_minute=24, clock=clock)
+    assert poller.next_batch() == SYMBOLS          # never fetched: everything, once
+    for symbol in SYMBOLS:
+        poller.observe(symbol, 1.0)
+    return poller
+
+
+def test_unfinished_batches_are_not_picked_again():
+    clock = FakeClock()
+    poller = poller_after_first_fetch(clock)
+    clock.now = 120.0                               # every symbol overdue
+
+    first = poller.next_batch()
+    clock.now += 10.0
+    second = poller.next_batch()                    # nothing from `first` has completed
+    assert first and second
+    assert not set(first) & set(second)
+
+
+def test_fresh_symbols_are_picked_once_until_fetched():
+    clock = FakeClock()
+    poller = PriorityPoller(SYMBOLS, clock=clock)
+    assert poller.next_batch() == SYMBOLS
+    clock.now += 10.0
+    assert poller.next_batch() == []
@@ -0,0 +1,48 @@
+import pytest
+
+from connectors.universe import Universe
+from pipeline.retrieval import QueryPlan, RetrievalPlanner
+
+
+@pytest.fixture(scope='module')
+def planner():
+    universe = Universe.from_env()
+    return RetrievalPlanner(
+        {i.symbol: i.name for i in universe.instruments},
+        {i.symbol: i.sector for i in universe.instruments},
+    )
+
+
+@pytest.mark.parametrize('question, plan', [
+    ("how is power grid doing today", QueryPlan(symbols={'POWERGRID'})),
+    ("coal india price", QueryPlan(symbols={'COALINDIA'})),
+    ("state bank results", QueryPlan(symbols={'SBIN'})),
+    ("POWERGRID vs NTPC", QueryPlan(symbols={'POWERGRID', 'NTPC'})),
+    ("power stocks today", QueryPlan(sectors={'Energy'})),
+    ("how are banks doing", QueryPlan(sectors={'Banking'})),
+    ("how is the auto sector doing", QueryPlan(sectors={'Auto'})),
+    ("compare auto vs IT", QueryPlan(sectors={'Auto', 'IT'})),
+    ("top 3 losers in auto", QueryPlan(sectors={'Auto'})),
+    ("bajaj auto price", QueryPlan(symbols={'BAJAJ-AUTO'})),
+    ("sun pharma price", QueryPlan(symbols={'SUNPHARMA'})),
+    ("tech mahindra price", QueryPlan(symbols={'TECHM'})),
+    ("mahindra & mahindra price", QueryPlan(symbols={'M&M'})),
+    ("how is mahindra doing", QueryPlan()),     # M&M or Tech Mahindra: not guessed
+])
+def test_company_names_win_over_sector_keywords(planner, question, plan):
+    assert planner.plan(question) == plan
+
+
+def test_single_word_aliases_name_one_company_and_no_sector(planner):
+    for alias, symbols in planner._aliases.items():
+        if ' ' not in alias:
+            assert len(symbols) == 1, alias
+            assert not planner._sector_pattern.fullmatch(alias), alias
+
+
+def test_symbol_spelled_as_a_sector_word_is_noted():
+    planner = RetrievalPlanner({'INFRA': 'Infra Holdings', 'LT': 'Larsen & Toubro'},
+                               {'INFRA': 'Infrastructure', 'LT': 'Infrastructure'})
+    plan = planner.plan("how is infra doing")
+    assert plan.symbols == {'INFRA'}
+    assert plan.sector_words == {'INFRA': 'Infrastructure'}
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from connectors.simulator import MarketSimulator
+from connectors.universe import Universe
+
+
+class Instant(float):
+    """A clock reading that yields the GIL while being subtracted, widening any read-then-write race"""
+
+    def __sub__(self, other):
+        time.sleep(0.0001)
+        return float(self) - other
+
+
+class SteppedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return Instant(self.now)
+
+
+def test_concurrent_quotes_apply_due_steps_once():
+    clock = SteppedClock()
+    sim = MarketSimulator(Universe.from_env(), seed=1, clock=clock)
+    symbol = sim.universe.symbols[0]
+
+    for elapsed in (5, 12, 40):
+        clock.now = elapsed
+        start = threading.Barrier(8)
+
+        def read():
+            start.wait()
+            for _ in range(20):
+                sim.quote(symbol)
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sim.steps == elapsed
@@ -0,0 +1,68 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from connectors.tick_bus import TickBroker
+
+N = 4_000
+
+
+@pytest.fixture
+def broker():
+    broker = TickBroker(('127.0.0.1', 0), queue_size=1_000)
+    thread = threading.Thread(target=broker.serve_forever, daemon=True)
+    thread.start()
+    yield broker
+    broker.shutdown()
+    broker.server_close()
+
+
+def connect(broker, subscribe=False, rcvbuf=None):
+    sock = socket.socket()
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.connect(broker.server_address)
+    if subscribe:
+        sock.sendall(b'{"op": "sub"}\n')
+    return sock
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_slow_subscriber_does_not_block_publishers_or_others(broker):
+    stalled = connect(broker, subscribe=True, rcvbuf=4096)    # never reads
+    reader = connect(broker, subscribe=True)
+    wait_for(lambda: len(broker.subscribers) == 2)
+
+    received = []
+
+    def read():
+        for line in reader.makefile('r', encoding='utf-8'):
+            received.append(json.loads(line)['seq'])
+            if len(received) == N:
+                return
+
+    consumer = threading.Thread(target=read, daemon=True)
+    consumer.start()
+
+    padding = 'x' * 4_000
+    publisher = connect(broker)
+    started = time.monotonic()
+    for seq in range(N):
+        publisher.sendall((json.dumps({'op': 'pub', 'tick': {'seq': seq, 'pad': padding}}) + '\n').encode())
+    consumer.join(timeout=10)
+
+    assert received == list(range(N))     # whole lines, in order, none repeated
+    assert time.monotonic() - started < 10
+    wait_for(lambda: broker.published == N)
+    assert broker.stats()['dropped'] > 0      # the stalled subscriber lost its oldest ticks
+    for sock in (stalled, reader, publisher):
+        sock.close()